@@ -0,0 +1,67 @@
+"""Diff two benchmark result files and flag regressions.
+
+Usage (from backend/):
+
+	python -m benchmark.compare benchmark/results/base.json benchmark/results/head.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: Path) -> dict:
+	return json.loads(path.read_text())
+
+
+def compare(base: dict, head: dict, latency_tolerance: float) -> list[str]:
+	regressions: list[str] = []
+	base_scenarios = base.get("scenarios", {})
+	head_scenarios = head.get("scenarios", {})
+	print(f"{'scenario':<34} {'p50 base':>10} {'p50 head':>10} {'p95 base':>10} {'p95 head':>10} {'queries':>12}")
+	for name in sorted(set(base_scenarios) | set(head_scenarios)):
+		before = base_scenarios.get(name)
+		after = head_scenarios.get(name)
+		if not before or not after:
+			print(f"{name:<34} only in {'head' if after else 'base'}")
+			continue
+
+		queries = f"{before['queries_max']}->{after['queries_max']}"
+		print(
+			f"{name:<34} {before['p50_ms']:>10.2f} {after['p50_ms']:>10.2f} "
+			f"{before['p95_ms']:>10.2f} {after['p95_ms']:>10.2f} {queries:>12}"
+		)
+		if after["queries_max"] > before["queries_max"]:
+			regressions.append(f"{name}: queries {queries}")
+		if before["p95_ms"] and after["p95_ms"] > before["p95_ms"] * (1 + latency_tolerance):
+			regressions.append(f"{name}: p95 {before['p95_ms']:.2f}ms -> {after['p95_ms']:.2f}ms")
+	return regressions
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("base", type=Path)
+	parser.add_argument("head", type=Path)
+	parser.add_argument(
+		"--latency-tolerance",
+		type=float,
+		default=0.2,
+		help="Allowed relative p95 increase before flagging (default 0.2 = 20%%)",
+	)
+	args = parser.parse_args()
+
+	base, head = load(args.base), load(args.head)
+	if base.get("dataset") != head.get("dataset"):
+		print("warning: results were produced from different dataset configurations")
+
+	regressions = compare(base, head, args.latency_tolerance)
+	if regressions:
+		print("\nRegressions:")
+		for line in regressions:
+			print(f"  {line}")
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
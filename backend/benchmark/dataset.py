@@ -0,0 +1,315 @@
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from pydantic import BaseModel
+from sqlalchemy.engine import Connection
+
+from auth.auth import hash_password
+from database.bulk_load import bulk_insert, reset_sequences
+from entity.assessment import AssessmentTable
+from entity.auditor import AuditorTable
+from entity.auditor_score import AuditorScoreTable
+from entity.auditor_submit import AuditorSubmitTable
+from entity.company import CompanyTable
+from entity.company_assessment import CompanyAssessmentTable
+from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.company_submit import CompanySubmitTable
+from entity.evaluation_criteria import EvaluationCriteriaTable
+from entity.evidence import EvidenceTable
+from entity.pillars import PillarsTable
+from entity.point import PointTable
+from entity.role import RoleTable
+from entity.status import StatusTable
+from entity.user import UserTable
+
+BENCHMARK_PASSWORD = "12345678"
+
+PILLARS = [
+	{"key": "pillar-1", "name": "Health Promotion (H1)", "weight": 300},
+	{"key": "pillar-2", "name": "Industrial Safety & Environment (I2)", "weight": 300},
+	{"key": "pillar-3", "name": "Community Engagement (C3)", "weight": 200},
+	{"key": "pillar-4", "name": "Management & Sustainability (M4)", "weight": 200},
+]
+POINT_SCORES = [0.0, 0.25, 0.5, 0.75, 1.0]
+ROLES = ["admin", "company", "audit"]
+STATUSES = ["save_draft", "submit"]
+COMPANY_TYPES = ["manufacturing", "logistics", "services", "construction", "agriculture"]
+
+
+class DatasetConfig(BaseModel):
+	companies: int = 200
+	questions_per_pillar: int = 25
+	auditors: int = 5
+	answer_ratio: float = 1.0
+	submitted_ratio: float = 0.5
+	evidence_per_answer: int = 1
+	seed: int = 2547
+
+
+class Dataset:
+	"""Deterministic synthetic dataset with explicit primary keys.
+
+	Ids are assigned up front so every table can be loaded in bulk without
+	round-tripping generated keys, and so the benchmark can address any
+	company, user or question without querying for it.
+	"""
+
+	def __init__(self, config: DatasetConfig, password_hash: str | None = None) -> None:
+		self.config = config
+		self.created_at = datetime(2025, 1, 1)
+		# Every synthetic user shares one hash so PBKDF2 runs once per load.
+		self.password_hash = password_hash or hash_password(BENCHMARK_PASSWORD)
+
+	@property
+	def admin_user_id(self) -> int:
+		return 1
+
+	def company_user_id(self, index: int) -> int:
+		return 2 + index
+
+	def auditor_user_id(self, index: int) -> int:
+		return 2 + self.config.companies + index
+
+	def company_id(self, index: int) -> int:
+		return 1 + index
+
+	def pillar_id(self, pillar_index: int) -> int:
+		return 1 + pillar_index
+
+	def assessment_id(self, pillar_index: int, question_index: int) -> int:
+		return 1 + pillar_index * self.config.questions_per_pillar + question_index
+
+	def assessment_ids_for_pillar(self, pillar_index: int) -> list[int]:
+		return [
+			self.assessment_id(pillar_index, question_index)
+			for question_index in range(self.config.questions_per_pillar)
+		]
+
+	def criteria_id(self, assessment_id: int, point_index: int) -> int:
+		return (assessment_id - 1) * len(POINT_SCORES) + point_index + 1
+
+	def is_submitted(self, company_index: int) -> bool:
+		return company_index < int(self.config.companies * self.config.submitted_ratio)
+
+	def _timestamps(self, offset_minutes: int = 0) -> dict:
+		stamp = self.created_at + timedelta(minutes=offset_minutes)
+		return {"created_at": stamp, "updated_at": stamp, "delete_at": None}
+
+	def roles(self) -> Iterator[dict]:
+		for index, name in enumerate(ROLES):
+			yield {"id": index + 1, "name": name, **self._timestamps()}
+
+	def statuses(self) -> Iterator[dict]:
+		for index, name in enumerate(STATUSES):
+			yield {"id": index + 1, "name": name, **self._timestamps()}
+
+	def points(self) -> Iterator[dict]:
+		for index, score in enumerate(POINT_SCORES):
+			yield {"id": index + 1, "score": score, **self._timestamps()}
+
+	def pillars(self) -> Iterator[dict]:
+		for index, pillar in enumerate(PILLARS):
+			yield {"id": self.pillar_id(index), **pillar, **self._timestamps()}
+
+	def assessments(self) -> Iterator[dict]:
+		for pillar_index in range(len(PILLARS)):
+			for question_index in range(self.config.questions_per_pillar):
+				yield {
+					"id": self.assessment_id(pillar_index, question_index),
+					"pillar_id": self.pillar_id(pillar_index),
+					"title": f"Question {pillar_index + 1}.{question_index + 1}",
+					"description": f"Synthetic benchmark question {question_index + 1}",
+					**self._timestamps(),
+				}
+
+	def evaluation_criteria(self) -> Iterator[dict]:
+		for pillar_index in range(len(PILLARS)):
+			for assessment_id in self.assessment_ids_for_pillar(pillar_index):
+				for point_index in range(len(POINT_SCORES)):
+					yield {
+						"id": self.criteria_id(assessment_id, point_index),
+						"assessment_id": assessment_id,
+						"name": f"Level {point_index}",
+						"point_id": point_index + 1,
+						**self._timestamps(),
+					}
+
+	def users(self) -> Iterator[dict]:
+		company_role, audit_role = ROLES.index("company") + 1, ROLES.index("audit") + 1
+		yield {
+			"id": self.admin_user_id,
+			"username": "bench_admin",
+			"password": self.password_hash,
+			"roleid": ROLES.index("admin") + 1,
+			**self._timestamps(),
+		}
+		for index in range(self.config.companies):
+			yield {
+				"id": self.company_user_id(index),
+				"username": f"bench_company_{index}",
+				"password": self.password_hash,
+				"roleid": company_role,
+				**self._timestamps(),
+			}
+		for index in range(self.config.auditors):
+			yield {
+				"id": self.auditor_user_id(index),
+				"username": f"bench_auditor_{index}",
+				"password": self.password_hash,
+				"roleid": audit_role,
+				**self._timestamps(),
+			}
+
+	def companies(self) -> Iterator[dict]:
+		rng = random.Random(self.config.seed)
+		for index in range(self.config.companies):
+			yield {
+				"id": self.company_id(index),
+				"user_id": self.company_user_id(index),
+				"company_name": f"Benchmark Company {index}",
+				"type_company": rng.choice(COMPANY_TYPES),
+				"Number_of_employees": rng.randint(10, 5000),
+				"address": f"{index} Benchmark Road",
+				"evaluation": None,
+				"job_position": "Safety officer",
+				"date_assessment": self.created_at,
+				"round_assessment": "1",
+				**self._timestamps(),
+			}
+
+	def auditors(self) -> Iterator[dict]:
+		for index in range(self.config.auditors):
+			yield {"id": index + 1, "user_id": self.auditor_user_id(index), **self._timestamps()}
+
+	def _answers(self) -> Iterator[tuple[int, int, int, int]]:
+		"""Yield (company_index, company_assessment_id, assessment_id, criteria_id)."""
+		rng = random.Random(self.config.seed + 1)
+		company_assessment_id = 0
+		for company_index in range(self.config.companies):
+			for pillar_index in range(len(PILLARS)):
+				for assessment_id in self.assessment_ids_for_pillar(pillar_index):
+					if rng.random() >= self.config.answer_ratio:
+						continue
+					company_assessment_id += 1
+					point_index = rng.randrange(len(POINT_SCORES))
+					yield (
+						company_index,
+						company_assessment_id,
+						assessment_id,
+						self.criteria_id(assessment_id, point_index),
+					)
+
+	def company_assessments(self) -> Iterator[dict]:
+		draft_status, submit_status = 1, 2
+		for company_index, row_id, assessment_id, criteria_id in self._answers():
+			yield {
+				"id": row_id,
+				"company_id": self.company_id(company_index),
+				"assessment_id": assessment_id,
+				"performance_results": "Synthetic performance result",
+				"evaluation_criteria_id": criteria_id,
+				"status_id": submit_status if self.is_submitted(company_index) else draft_status,
+				**self._timestamps(),
+			}
+
+	def evidences(self) -> Iterator[dict]:
+		evidence_id = 0
+		for _, row_id, _, _ in self._answers():
+			for _ in range(self.config.evidence_per_answer):
+				evidence_id += 1
+				yield {
+					"id": evidence_id,
+					"company_assessment_id": row_id,
+					"url": None,
+					"file_path": f"benchmark/evidence_{evidence_id}.pdf",
+					**self._timestamps(),
+				}
+
+	def auditor_scores(self) -> Iterator[dict]:
+		if not self.config.auditors:
+			return
+		rng = random.Random(self.config.seed + 2)
+		score_id = 0
+		for company_index, row_id, assessment_id, _ in self._answers():
+			if not self.is_submitted(company_index):
+				continue
+			score_id += 1
+			yield {
+				"id": score_id,
+				"auditor_id": company_index % self.config.auditors + 1,
+				"company_assessment_id": row_id,
+				"evaluation_criteria_id": self.criteria_id(
+					assessment_id, rng.randrange(len(POINT_SCORES))
+				),
+				**self._timestamps(),
+			}
+
+	def company_submits(self) -> Iterator[dict]:
+		for company_index in range(self.config.companies):
+			if self.is_submitted(company_index):
+				yield {
+					"id": company_index + 1,
+					"company_id": self.company_id(company_index),
+					"status_id": 2,
+					**self._timestamps(company_index),
+				}
+
+	def auditor_submits(self) -> Iterator[dict]:
+		if not self.config.auditors:
+			return
+		for company_index in range(self.config.companies):
+			if self.is_submitted(company_index):
+				yield {
+					"id": company_index + 1,
+					"auditor_id": company_index % self.config.auditors + 1,
+					"company_id": self.company_id(company_index),
+					"status_id": 2,
+					**self._timestamps(company_index),
+				}
+
+	def company_assessment_results(self) -> Iterator[dict]:
+		rng = random.Random(self.config.seed + 3)
+		result_id = 0
+		for company_index in range(self.config.companies):
+			if not self.is_submitted(company_index):
+				continue
+			for pillar_index, pillar in enumerate(PILLARS):
+				result_id += 1
+				yield {
+					"id": result_id,
+					"company_id": self.company_id(company_index),
+					"pillar_id": self.pillar_id(pillar_index),
+					"score": round(rng.uniform(0, pillar["weight"]), 2),
+					**self._timestamps(),
+				}
+
+	def tables(self) -> list[tuple[type, Iterator[dict]]]:
+		"""Tables in foreign-key order, each paired with its row generator."""
+		return [
+			(RoleTable, self.roles()),
+			(StatusTable, self.statuses()),
+			(PointTable, self.points()),
+			(PillarsTable, self.pillars()),
+			(AssessmentTable, self.assessments()),
+			(EvaluationCriteriaTable, self.evaluation_criteria()),
+			(UserTable, self.users()),
+			(CompanyTable, self.companies()),
+			(AuditorTable, self.auditors()),
+			(CompanyAssessmentTable, self.company_assessments()),
+			(EvidenceTable, self.evidences()),
+			(AuditorScoreTable, self.auditor_scores()),
+			(CompanySubmitTable, self.company_submits()),
+			(AuditorSubmitTable, self.auditor_submits()),
+			(CompanyAssessmentResultTable, self.company_assessment_results()),
+		]
+
+
+def load_dataset(connection: Connection, dataset: Dataset, use_copy: bool = True) -> dict[str, int]:
+	"""Bulk-load every table of ``dataset`` and return row counts by table name."""
+	counts = {
+		model.__tablename__: bulk_insert(connection, model.__table__, rows, use_copy=use_copy)
+		for model, rows in dataset.tables()
+	}
+	reset_sequences(connection)
+	return counts
@@ -0,0 +1,165 @@
+"""Compare query plans of the hot lookups with and without the index pack.
+
+Usage (from backend/), after loading a dataset with run_benchmark or
+mocup_data/seed.py synthetic:
+
+	BENCHMARK_DATABASE_URL=postgresql://localhost/hicm_bench python -m benchmark.index_plans
+
+The "without" pass drops the indexes (and the draft unique index, which
+covers the same company_assessments lookups) inside a transaction that is
+rolled back, so the database is left as it was.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
+if BENCHMARK_DATABASE_URL:
+	os.environ["DATABASE_URL"] = BENCHMARK_DATABASE_URL
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database.database import engine
+from database.migrate import DRAFT_UNIQUE_INDEX, HOT_INDEXES, create_draft_unique_index, create_indexes
+
+HOT_QUERIES = {
+	"company_by_user": (
+		"SELECT * FROM companies WHERE user_id = :user_id AND delete_at IS NULL LIMIT 1"
+	),
+	"pillar_by_key": "SELECT * FROM pillars WHERE key = :pillar_key AND delete_at IS NULL LIMIT 1",
+	"user_by_username": (
+		"SELECT * FROM users WHERE username = :username AND delete_at IS NULL LIMIT 1"
+	),
+	"assessments_by_pillar": (
+		"SELECT * FROM assessments WHERE pillar_id = :pillar_id AND delete_at IS NULL ORDER BY id"
+	),
+	"criteria_by_assessment": (
+		"SELECT * FROM evaluation_criteria "
+		"WHERE assessment_id = :assessment_id AND delete_at IS NULL ORDER BY id"
+	),
+	"draft_by_company_pillar": (
+		"SELECT ca.* FROM company_assessments ca "
+		"JOIN assessments a ON a.id = ca.assessment_id "
+		"WHERE ca.company_id = :company_id AND ca.assessment_round = :assessment_round AND ca.delete_at IS NULL "
+		"AND a.pillar_id = :pillar_id AND a.delete_at IS NULL ORDER BY ca.assessment_id"
+	),
+	"answered_count": (
+		"SELECT count(*) FROM company_assessments WHERE company_id = :company_id "
+		"AND assessment_round = :assessment_round AND delete_at IS NULL AND evaluation_criteria_id IS NOT NULL"
+	),
+	"latest_company_submit": (
+		"SELECT * FROM company_submits WHERE company_id = :company_id AND assessment_round = :assessment_round "
+		"AND delete_at IS NULL ORDER BY created_at DESC LIMIT 1"
+	),
+	"evidence_by_company": (
+		"SELECT * FROM evidences WHERE delete_at IS NULL AND assessment_round = :assessment_round "
+		"AND company_assessment_id IN (SELECT id FROM company_assessments WHERE company_id = :company_id "
+		"AND assessment_round = :assessment_round AND delete_at IS NULL) "
+		"ORDER BY created_at"
+	),
+	"auditor_scores_by_company": (
+		"SELECT * FROM auditor_scores WHERE auditor_id = :auditor_id AND delete_at IS NULL "
+		"AND company_assessment_id IN "
+		"(SELECT id FROM company_assessments WHERE company_id = :company_id AND delete_at IS NULL)"
+	),
+	"results_by_company": (
+		"SELECT * FROM company_assessment_results WHERE company_id = :company_id "
+		"AND assessment_round = :assessment_round AND delete_at IS NULL"
+	),
+}
+
+
+def _scan_nodes(plan: dict) -> list[str]:
+	"""Flatten a JSON plan into ``"Seq Scan on evidences"``-style node descriptions."""
+	nodes: list[str] = []
+	node_type = plan.get("Node Type", "")
+	if "Scan" in node_type:
+		target = plan.get("Index Name") or plan.get("Relation Name") or ""
+		nodes.append(f"{node_type} on {target}".strip())
+	for child in plan.get("Plans", []):
+		nodes.extend(_scan_nodes(child))
+	return nodes
+
+
+def explain_all(connection: Connection, params: dict) -> dict[str, dict]:
+	plans: dict[str, dict] = {}
+	for name, sql in HOT_QUERIES.items():
+		result = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+		document = result[0] if isinstance(result, list) else json.loads(result)[0]
+		plans[name] = {
+			"execution_ms": round(document.get("Execution Time", 0.0), 3),
+			"total_cost": document["Plan"].get("Total Cost"),
+			"scans": _scan_nodes(document["Plan"]),
+		}
+	return plans
+
+
+def sample_params(connection: Connection) -> dict:
+	row = connection.execute(
+		text(
+			"SELECT c.id AS company_id, c.user_id, u.username, c.current_round AS assessment_round, "
+			"(SELECT id FROM auditors ORDER BY id LIMIT 1) AS auditor_id, "
+			"(SELECT id FROM pillars WHERE delete_at IS NULL ORDER BY id LIMIT 1) AS pillar_id "
+			"FROM companies c JOIN users u ON u.id = c.user_id "
+			"WHERE c.delete_at IS NULL ORDER BY c.id DESC LIMIT 1"
+		)
+	).mappings().first()
+	if not row:
+		raise SystemExit("No companies found; load a dataset first.")
+	params = dict(row)
+	params["pillar_key"] = connection.execute(
+		text("SELECT key FROM pillars WHERE id = :pillar_id"), params
+	).scalar()
+	params["assessment_id"] = connection.execute(
+		text("SELECT max(id) FROM assessments WHERE pillar_id = :pillar_id"), params
+	).scalar()
+	return params
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--output", type=Path, default=None)
+	args = parser.parse_args()
+	if not BENCHMARK_DATABASE_URL:
+		parser.error("BENCHMARK_DATABASE_URL must point at a dedicated database")
+
+	with engine.begin() as connection:
+		create_indexes(connection)
+		create_draft_unique_index(connection)
+	with engine.connect() as connection:
+		connection.exec_driver_sql("ANALYZE")
+		params = sample_params(connection)
+		connection.rollback()
+
+		with connection.begin() as transaction:
+			# The draft unique index serves the same company_assessments lookups.
+			for name in [name for name, _, _ in HOT_INDEXES] + [DRAFT_UNIQUE_INDEX]:
+				connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+			without_indexes = explain_all(connection, params)
+			transaction.rollback()
+
+		with connection.begin() as transaction:
+			with_indexes = explain_all(connection, params)
+			transaction.rollback()
+
+	report: dict[str, dict] = {}
+	for name in HOT_QUERIES:
+		before, after = without_indexes[name], with_indexes[name]
+		report[name] = {"without_indexes": before, "with_indexes": after}
+		print(f"{name}")
+		print(f"  without: {before['execution_ms']:>9.3f}ms  {', '.join(before['scans'])}")
+		print(f"  with:    {after['execution_ms']:>9.3f}ms  {', '.join(after['scans'])}")
+
+	if args.output:
+		args.output.write_text(json.dumps({"params": params, "queries": report}, indent=2, default=str))
+		print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,328 @@
+"""Endpoint benchmark against a synthetic dataset.
+
+Usage (from backend/):
+
+	BENCHMARK_DATABASE_URL=postgresql://localhost/hicm_bench \\
+		python -m benchmark.run_benchmark --companies 500 --questions-per-pillar 50
+
+The target database is dropped and recreated, so BENCHMARK_DATABASE_URL must
+point at a dedicated database and is never read from DATABASE_URL.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
+if BENCHMARK_DATABASE_URL:
+	os.environ["DATABASE_URL"] = BENCHMARK_DATABASE_URL
+
+from fastapi.testclient import TestClient
+
+from auth.auth import create_access_token
+from benchmark.dataset import Dataset, DatasetConfig, PILLARS, load_dataset
+from database.database import Base, engine
+from database.migrate import migrate
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class Scenario:
+	def __init__(
+		self,
+		name: str,
+		method: str,
+		build: Callable[[int], tuple[str, dict | None]],
+		token: Callable[[int], str],
+	) -> None:
+		self.name = name
+		self.method = method
+		self.build = build
+		self.token = token
+
+
+def percentile(values: list[float], fraction: float) -> float:
+	if not values:
+		return 0.0
+	ordered = sorted(values)
+	index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+	return ordered[index]
+
+
+def build_scenarios(dataset: Dataset) -> list[Scenario]:
+	config = dataset.config
+	submitted = max(1, int(config.companies * config.submitted_ratio))
+
+	def company_token(i: int) -> str:
+		index = i % config.companies
+		return create_access_token({"sub": str(dataset.company_user_id(index)), "roleid": 2})
+
+	def auditor_token(i: int) -> str:
+		index = i % submitted % max(1, config.auditors)
+		return create_access_token({"sub": str(dataset.auditor_user_id(index)), "roleid": 3})
+
+	def admin_token(i: int) -> str:
+		return create_access_token({"sub": str(dataset.admin_user_id), "roleid": 1})
+
+	def pillar_key(i: int) -> str:
+		return PILLARS[i % len(PILLARS)]["key"]
+
+	def auto_save_body(i: int) -> dict:
+		pillar_index = i % len(PILLARS)
+		return {
+			"items": [
+				{
+					"assessment_id": assessment_id,
+					"evaluation_criteria_id": dataset.criteria_id(assessment_id, i % 5),
+					"performance_results": f"Benchmark update {i}",
+				}
+				for assessment_id in dataset.assessment_ids_for_pillar(pillar_index)
+			]
+		}
+
+	def draft_company_token(i: int) -> str:
+		# Auto-save is rejected for submitted pillars, so only draft companies write.
+		index = submitted + i % max(1, config.companies - submitted)
+		return create_access_token({"sub": str(dataset.company_user_id(index % config.companies)), "roleid": 2})
+
+	return [
+		Scenario(
+			"company.assessments_by_pillar",
+			"GET",
+			lambda i: (f"/api/company/assessments/{pillar_key(i)}", None),
+			company_token,
+		),
+		Scenario(
+			"company.draft",
+			"GET",
+			lambda i: (f"/api/company/assessments/{pillar_key(i)}/draft", None),
+			company_token,
+		),
+		Scenario(
+			"company.submit_status",
+			"GET",
+			lambda i: (f"/api/company/assessments/{pillar_key(i)}/submit-status", None),
+			company_token,
+		),
+		Scenario(
+			"company.summary_status",
+			"GET",
+			lambda i: ("/api/company/assessment-summary/status", None),
+			company_token,
+		),
+		Scenario(
+			"company.results",
+			"GET",
+			lambda i: ("/api/company/assessment-summary/results", None),
+			company_token,
+		),
+		Scenario(
+			"company.evidence_list",
+			"GET",
+			lambda i: (f"/api/company/assessments/{dataset.assessment_id(0, i % config.questions_per_pillar)}/evidence", None),
+			company_token,
+		),
+		Scenario(
+			"company.auto_save",
+			"POST",
+			lambda i: (f"/api/company/assessments/{pillar_key(i)}/auto-save", auto_save_body(i)),
+			draft_company_token,
+		),
+		Scenario(
+			"audit.submissions",
+			"GET",
+			lambda i: ("/api/audit/submissions", None),
+			auditor_token,
+		),
+		Scenario(
+			"audit.submission_detail",
+			"GET",
+			lambda i: (f"/api/audit/submissions/{dataset.company_id(i % submitted)}", None),
+			auditor_token,
+		),
+		Scenario(
+			"audit.auditor_scores",
+			"GET",
+			lambda i: (f"/api/audit/submissions/{dataset.company_id(i % submitted)}/auditor-scores", None),
+			auditor_token,
+		),
+		Scenario(
+			"admin.users",
+			"GET",
+			lambda i: ("/api/admin/users", None),
+			admin_token,
+		),
+		Scenario(
+			"admin.builder_get",
+			"GET",
+			lambda i: (f"/api/admin/assessment-builder/{pillar_key(i)}", None),
+			admin_token,
+		),
+		# Builder save adds questions, so it runs last and writes to its own pillar.
+		Scenario(
+			"admin.builder_save",
+			"POST",
+			lambda i: (
+				"/api/admin/assessment-builder/bench-scratch",
+				{
+					"name": "Benchmark scratch pillar",
+					"questions": [
+						{
+							"title": f"Scratch question {i}",
+							"detail": None,
+							"choices": [
+								{"label": f"Level {index}", "score": index * 0.25, "point_id": index + 1}
+								for index in range(5)
+							],
+						}
+					],
+				},
+			),
+			admin_token,
+		),
+	]
+
+
+def run_scenario(
+	client: TestClient,
+	scenario: Scenario,
+	iterations: int,
+	warmup: int,
+) -> dict:
+	latencies: list[float] = []
+	queries: list[int] = []
+	db_times: list[float] = []
+	status_codes: dict[str, int] = {}
+	for i in range(warmup + iterations):
+		path, body = scenario.build(i)
+		headers = {"Authorization": f"Bearer {scenario.token(i)}"}
+		started = time.perf_counter()
+		response = client.request(scenario.method, path, json=body, headers=headers)
+		elapsed_ms = (time.perf_counter() - started) * 1000
+		if i < warmup:
+			continue
+		latencies.append(elapsed_ms)
+		queries.append(int(response.headers.get("x-db-queries", 0)))
+		db_times.append(float(response.headers.get("x-db-time", 0)))
+		key = str(response.status_code)
+		status_codes[key] = status_codes.get(key, 0) + 1
+
+	return {
+		"iterations": iterations,
+		"p50_ms": round(percentile(latencies, 0.50), 3),
+		"p95_ms": round(percentile(latencies, 0.95), 3),
+		"mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+		"max_ms": round(max(latencies), 3) if latencies else 0.0,
+		"queries_p50": percentile([float(q) for q in queries], 0.50),
+		"queries_max": max(queries) if queries else 0,
+		"db_time_p50_ms": round(percentile(db_times, 0.50), 3),
+		"status_codes": status_codes,
+	}
+
+
+def git_revision() -> str | None:
+	try:
+		return subprocess.run(
+			["git", "rev-parse", "--short", "HEAD"],
+			capture_output=True,
+			text=True,
+			check=True,
+			cwd=os.path.dirname(os.path.abspath(__file__)),
+		).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def prepare_database(dataset: Dataset) -> dict[str, int]:
+	Base.metadata.drop_all(bind=engine)
+	migrate()
+	with engine.begin() as connection:
+		counts = load_dataset(connection, dataset)
+	with engine.connect() as connection:
+		connection.exec_driver_sql("ANALYZE")
+	return counts
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--companies", type=int, default=200)
+	parser.add_argument("--questions-per-pillar", type=int, default=25)
+	parser.add_argument("--auditors", type=int, default=5)
+	parser.add_argument("--answer-ratio", type=float, default=1.0)
+	parser.add_argument("--submitted-ratio", type=float, default=0.5)
+	parser.add_argument("--evidence-per-answer", type=int, default=1)
+	parser.add_argument("--seed", type=int, default=2547)
+	parser.add_argument("--iterations", type=int, default=50)
+	parser.add_argument("--warmup", type=int, default=5)
+	parser.add_argument("--only", nargs="*", help="Scenario names to run")
+	parser.add_argument("--skip-load", action="store_true", help="Reuse the loaded dataset")
+	parser.add_argument("--output", type=Path, default=None)
+	args = parser.parse_args()
+
+	if not BENCHMARK_DATABASE_URL:
+		parser.error("BENCHMARK_DATABASE_URL must point at a dedicated database")
+
+	config = DatasetConfig(
+		companies=args.companies,
+		questions_per_pillar=args.questions_per_pillar,
+		auditors=args.auditors,
+		answer_ratio=args.answer_ratio,
+		submitted_ratio=args.submitted_ratio,
+		evidence_per_answer=args.evidence_per_answer,
+		seed=args.seed,
+	)
+	dataset = Dataset(config)
+
+	row_counts: dict[str, int] = {}
+	if not args.skip_load:
+		started = time.perf_counter()
+		row_counts = prepare_database(dataset)
+		print(f"Loaded {sum(row_counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+	from main import app
+
+	scenarios = build_scenarios(dataset)
+	if args.only:
+		scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+
+	results: dict[str, dict] = {}
+	with TestClient(app) as client:
+		for scenario in scenarios:
+			results[scenario.name] = run_scenario(
+				client, scenario, args.iterations, args.warmup
+			)
+			summary = results[scenario.name]
+			print(
+				f"{scenario.name:<34} p50={summary['p50_ms']:>9.2f}ms "
+				f"p95={summary['p95_ms']:>9.2f}ms queries={summary['queries_p50']:>6.0f}"
+			)
+
+	report = {
+		"revision": git_revision(),
+		"created_at": datetime.utcnow().isoformat(),
+		"dataset": config.model_dump(),
+		"row_counts": row_counts,
+		"iterations": args.iterations,
+		"warmup": args.warmup,
+		"scenarios": results,
+	}
+	output = args.output
+	if output is None:
+		RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+		stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+		output = RESULTS_DIR / f"{stamp}-{report['revision'] or 'unknown'}.json"
+	output.write_text(json.dumps(report, indent=2, sort_keys=True))
+	print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,14 +1,27 @@
+import json
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from database.database import SessionLocal
+from database.routing import get_read_db
 from entity.assessment import AssessmentTable
 from entity.evaluation_criteria import EvaluationCriteriaTable
 from entity.pillars import PillarsTable
 from entity.point import PointTable
+from service.progress import refresh_totals
+from service.questionnaire import (
+	QuestionnaireError,
+	apply_plan,
+	csv_to_document,
+	document_to_csv,
+	export_document,
+	parse_document,
+	plan_import,
+)
 
 router = APIRouter(prefix="/api/admin", tags=["assessment"])
 
@@ -147,7 +160,7 @@ def get_pillar_builder(
 
 
 @router.get("/points", response_model=list[PointResponse])
-def list_points(db: Session = Depends(get_db)):
+def list_points(db: Session = Depends(get_read_db)):
 	points = (
 		db.query(PointTable)
 		.filter(PointTable.delete_at.is_(None))
@@ -172,8 +185,7 @@ def save_pillar_builder(
 			description=question.detail,
 		)
 		db.add(assessment)
-		db.commit()
-		db.refresh(assessment)
+		db.flush()
 
 		for choice in question.choices:
 			point = (
@@ -190,9 +202,11 @@ def save_pillar_builder(
 			)
 			db.add(criteria)
 
-		db.commit()
+	# Once per save, not per question: it rewrites every company's progress row.
+	refresh_totals(db)
+	db.commit()
 
-	return get_pillar_builder(pillar_key, db)
+	return get_pillar_builder(pillar_key, db=db)
 
 
 @router.put("/assessment-builder/{pillar_key}/{assessment_id}", response_model=QuestionResponse)
@@ -295,5 +309,56 @@ def delete_assessment_builder(
 		criteria.delete_at = datetime.utcnow()
 		db.add(criteria)
 
+	refresh_totals(db)
 	db.commit()
 	return {"status": "deleted"}
+
+
+@router.get("/questionnaire/export")
+def export_questionnaire(
+	file_format: Literal["json", "csv"] = Query("json", alias="format"),
+	db: Session = Depends(get_read_db),
+):
+	document = export_document(db)
+	if file_format == "csv":
+		return Response(
+			document_to_csv(document),
+			media_type="text/csv; charset=utf-8",
+			headers={"Content-Disposition": 'attachment; filename="questionnaire.csv"'},
+		)
+	return document
+
+
+@router.post("/questionnaire/import")
+def import_questionnaire(
+	file: UploadFile = File(...),
+	file_format: Literal["json", "csv"] | None = Query(None, alias="format"),
+	dry_run: bool = True,
+	replace: bool = False,
+	db: Session = Depends(get_db),
+):
+	"""Validate a whole questionnaire and apply it in one transaction.
+
+	Defaults to a dry run that only returns the diff; pass ``dry_run=false``
+	to write. With ``replace=true`` questions missing from an imported
+	pillar are deleted.
+	"""
+	file_format = file_format or ("csv" if (file.filename or "").lower().endswith(".csv") else "json")
+	raw = file.file.read()
+	try:
+		text = raw.decode("utf-8-sig")
+		document = parse_document(csv_to_document(text) if file_format == "csv" else json.loads(text))
+		plan = plan_import(db, document, replace=replace)
+	except UnicodeDecodeError:
+		raise HTTPException(status_code=400, detail="File must be UTF-8")
+	except json.JSONDecodeError as error:
+		raise HTTPException(status_code=400, detail=f"Invalid JSON: {error}")
+	except QuestionnaireError as error:
+		raise HTTPException(status_code=422, detail=error.errors)
+
+	summary = plan.summary()
+	if not dry_run:
+		apply_plan(db, plan)
+		refresh_totals(db)
+		db.commit()
+	return {"dry_run": dry_run, "summary": summary, "changes": plan.changes}
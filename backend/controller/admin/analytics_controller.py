@@ -0,0 +1,49 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from database.routing import get_read_db
+from midlewere.midlewere import require_auth
+from service.analytics import benchmark_summary, rebuild_snapshots
+
+router = APIRouter(prefix="/api/admin/analytics", tags=["admin-analytics"])
+
+
+def get_db():
+	db = SessionLocal()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+@router.get("/benchmark")
+def get_benchmark(
+	type_company: str | None = None,
+	employee_band: str | None = None,
+	round_assessment: str | None = None,
+	group_by: Literal["type_company", "employee_band", "round_assessment"] | None = None,
+	db: Session = Depends(get_read_db),
+	user: dict = Depends(require_auth),
+):
+	return benchmark_summary(
+		db,
+		{
+			"type_company": type_company,
+			"employee_band": employee_band,
+			"round_assessment": round_assessment,
+		},
+		group_by=group_by,
+	)
+
+
+@router.post("/rebuild")
+def rebuild_benchmark(
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	count = rebuild_snapshots(db)
+	db.commit()
+	return {"companies": count}
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from midlewere.midlewere import require_auth
+from service import jobs
+from service.archival import ARCHIVE_BATCH_SIZE, ARCHIVE_RETENTION_DAYS, archive_deleted
+
+router = APIRouter(prefix="/api/admin/archive", tags=["admin-archive"])
+
+
+def get_db():
+	db = SessionLocal()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+@router.get("/preview")
+def preview_archive(
+	retention_days: int = ARCHIVE_RETENTION_DAYS,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	"""Rows and bytes eligible now; a real run also moves parents freed by archiving their children."""
+	report = archive_deleted(db, retention_days=retention_days, dry_run=True)
+	db.rollback()
+	return report
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+def run_archive(
+	retention_days: int = ARCHIVE_RETENTION_DAYS,
+	batch_size: int = ARCHIVE_BATCH_SIZE,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	payload = {"retention_days": retention_days, "batch_size": max(1, batch_size)}
+	job = jobs.find_pending(db, "archive_deleted", payload) or jobs.enqueue(
+		db,
+		"archive_deleted",
+		payload,
+		max_attempts=1,
+		created_by=int(user["sub"]) if user.get("sub") else None,
+	)
+	db.commit()
+	return {"job_id": job.id, "status": job.status}
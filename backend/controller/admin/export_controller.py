@@ -0,0 +1,41 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from midlewere.midlewere import require_auth
+from service.export import export_filename, iter_export_rows, stream_csv, stream_xlsx
+
+router = APIRouter(prefix="/api/admin", tags=["admin-export"])
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@router.get("/export/results")
+def export_results(
+	file_format: Literal["csv", "xlsx"] = Query("csv", alias="format"),
+	round_assessment: str | None = None,
+	pillar_key: str | None = None,
+	submitted_only: bool = True,
+	assessment_round: int | None = None,
+	user: dict = Depends(require_auth),
+):
+	"""Every company answer with the latest auditor score and the pillar score.
+
+	Each company exports its latest submitted round, or ``assessment_round``.
+	"""
+	rows = iter_export_rows(
+		round_assessment=round_assessment,
+		pillar_key=pillar_key,
+		submitted_only=submitted_only,
+		assessment_round=assessment_round,
+	)
+	if file_format == "xlsx":
+		body, media_type = stream_xlsx(rows), XLSX_MEDIA_TYPE
+	else:
+		body, media_type = stream_csv(rows), "text/csv; charset=utf-8"
+	return StreamingResponse(
+		body,
+		media_type=media_type,
+		headers={"Content-Disposition": f'attachment; filename="{export_filename(file_format)}"'},
+	)
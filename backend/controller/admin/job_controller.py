@@ -0,0 +1,136 @@
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from entity.job import JobTable
+from midlewere.midlewere import require_auth
+from service import jobs
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+ADMIN_ROLE_ID = 1
+
+
+def get_db():
+	db = SessionLocal()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+class JobResponse(BaseModel):
+	id: int
+	kind: str
+	status: str
+	attempts: int
+	max_attempts: int
+	run_after: datetime
+	last_error: str | None = None
+	result: Any = None
+	created_at: datetime
+	finished_at: datetime | None = None
+
+
+class EnqueueJobRequest(BaseModel):
+	kind: str
+	payload: dict[str, Any] = {}
+	max_attempts: int = 3
+
+
+def to_job_response(job: JobTable) -> JobResponse:
+	return JobResponse(
+		id=job.id,
+		kind=job.kind,
+		status=job.status,
+		attempts=job.attempts,
+		max_attempts=job.max_attempts,
+		run_after=job.run_after,
+		last_error=job.last_error,
+		result=job.result,
+		created_at=job.created_at,
+		finished_at=job.finished_at,
+	)
+
+
+def is_admin(user: dict) -> bool:
+	return int(user.get("roleid") or 0) == ADMIN_ROLE_ID
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(
+	job_id: int,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	job = db.get(JobTable, job_id)
+	# Users may poll jobs they started; admins see every job.
+	if not job or (not is_admin(user) and str(job.created_by) != str(user.get("sub"))):
+		raise HTTPException(status_code=404, detail="Job not found")
+	return to_job_response(job)
+
+
+@router.get("/admin/jobs", response_model=list[JobResponse])
+def list_jobs(
+	job_status: str | None = None,
+	kind: str | None = None,
+	limit: int = 50,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	query = db.query(JobTable)
+	if job_status:
+		query = query.filter(JobTable.status == job_status)
+	if kind:
+		query = query.filter(JobTable.kind == kind)
+	rows = query.order_by(JobTable.id.desc()).limit(min(max(limit, 1), 500)).all()
+	return [to_job_response(job) for job in rows]
+
+
+@router.get("/admin/jobs-summary")
+def jobs_summary(
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	return {"kinds": jobs.registered_kinds(), "by_status": jobs.queue_depth(db)}
+
+
+@router.post("/admin/jobs", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
+def enqueue_job(
+	payload: EnqueueJobRequest,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	if payload.kind not in jobs.registered_kinds():
+		raise HTTPException(status_code=400, detail=f"Unknown job kind: {payload.kind}")
+	job = jobs.enqueue(
+		db,
+		payload.kind,
+		payload.payload,
+		max_attempts=max(1, payload.max_attempts),
+		created_by=int(user["sub"]) if user.get("sub") else None,
+	)
+	db.commit()
+	db.refresh(job)
+	return to_job_response(job)
+
+
+@router.post("/admin/jobs/{job_id}/retry", response_model=JobResponse)
+def retry_job(
+	job_id: int,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	job = db.get(JobTable, job_id)
+	if not job:
+		raise HTTPException(status_code=404, detail="Job not found")
+	if job.status != "failed":
+		raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+	jobs.retry(db, job)
+	db.commit()
+	db.refresh(job)
+	return to_job_response(job)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from entity.company import CompanyTable
+from midlewere.midlewere import require_auth
+from service.rounds import round_history, start_next_round
+
+router = APIRouter(prefix="/api/admin/companies", tags=["admin-rounds"])
+
+
+def get_db():
+	db = SessionLocal()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+class StartRoundRequest(BaseModel):
+	round_assessment: str | None = None
+
+
+def get_company(db: Session, company_id: int) -> CompanyTable:
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.id == company_id, CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+	return company
+
+
+@router.get("/{company_id}/rounds")
+def list_rounds(
+	company_id: int,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	company = get_company(db, company_id)
+	return {"current_round": company.current_round, "rounds": round_history(db, company)}
+
+
+@router.post("/{company_id}/rounds")
+def start_round(
+	company_id: int,
+	payload: StartRoundRequest,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	"""Open the company's next round; answers from earlier rounds are kept as they are."""
+	company = get_company(db, company_id)
+	current_round = start_next_round(db, company, payload.round_assessment)
+	db.commit()
+	return {"company_id": company.id, "current_round": current_round}
@@ -1,13 +1,20 @@
+import json
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from pydantic import BaseModel
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from auth.auth import hash_password
 from database.database import SessionLocal
+from database.pagination import decode_cursor, encode_cursor, estimate_count
+from database.routing import get_read_db
 from entity.role import RoleTable
 from entity.user import UserTable
+from service.provisioning import ProvisioningError, csv_to_users, parse_users, provision_users
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -32,6 +39,13 @@ class UserResponse(BaseModel):
 	role_name: str
 
 
+class UserPageResponse(BaseModel):
+	items: list[UserResponse]
+	next_cursor: str | None = None
+	total: int
+	total_is_estimate: bool
+
+
 class CreateUserRequest(BaseModel):
 	username: str
 	password: str
@@ -45,13 +59,13 @@ class UpdateUserRequest(BaseModel):
 
 
 @router.get("/roles", response_model=list[RoleResponse])
-def list_roles(db: Session = Depends(get_db)):
+def list_roles(db: Session = Depends(get_read_db)):
 	roles = db.query(RoleTable).order_by(RoleTable.id.asc()).all()
 	return [RoleResponse(id=role.id, name=role.name) for role in roles]
 
 
 @router.get("/users", response_model=list[UserResponse])
-def list_users(db: Session = Depends(get_db)):
+def list_users(db: Session = Depends(get_read_db)):
 	users = (
 		db.query(UserTable, RoleTable)
 		.join(RoleTable, RoleTable.id == UserTable.roleid)
@@ -71,6 +85,57 @@ def list_users(db: Session = Depends(get_db)):
 	]
 
 
+@router.get("/users/search", response_model=UserPageResponse)
+def search_users(
+	q: str | None = None,
+	match: Literal["prefix", "contains"] = "contains",
+	roleid: int | None = None,
+	limit: int = Query(50, ge=1, le=200),
+	cursor: str | None = None,
+	db: Session = Depends(get_read_db),
+):
+	"""Keyset-paginated user list with case-insensitive username search.
+
+	Pass the returned ``next_cursor`` back as ``cursor`` for the next page.
+	Prefix search uses ``ix_users_username_lower_prefix_live`` and substring
+	search the pg_trgm index, both created by migrate().
+	"""
+	statement = (
+		select(UserTable.id, UserTable.username, UserTable.roleid, RoleTable.name)
+		.join(RoleTable, RoleTable.id == UserTable.roleid)
+		.where(UserTable.delete_at.is_(None))
+	)
+	if q:
+		if match == "prefix":
+			statement = statement.where(func.lower(UserTable.username).startswith(q.lower(), autoescape=True))
+		else:
+			statement = statement.where(UserTable.username.icontains(q, autoescape=True))
+	if roleid is not None:
+		statement = statement.where(UserTable.roleid == roleid)
+
+	total, total_is_estimate = estimate_count(db, statement)
+
+	if cursor:
+		try:
+			(after_id,) = decode_cursor(cursor)
+		except ValueError:
+			raise HTTPException(status_code=400, detail="Invalid cursor")
+		statement = statement.where(UserTable.id > int(after_id))
+	rows = db.execute(statement.order_by(UserTable.id.asc()).limit(limit + 1)).all()
+
+	has_more = len(rows) > limit
+	rows = rows[:limit]
+	return UserPageResponse(
+		items=[
+			UserResponse(id=user_id, username=username, roleid=role_id, role_name=role_name)
+			for user_id, username, role_id, role_name in rows
+		],
+		next_cursor=encode_cursor([rows[-1][0]]) if has_more else None,
+		total=total,
+		total_is_estimate=total_is_estimate,
+	)
+
+
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(payload: CreateUserRequest, db: Session = Depends(get_db)):
 	existing = db.query(UserTable).filter(UserTable.username == payload.username).first()
@@ -98,6 +163,34 @@ def create_user(payload: CreateUserRequest, db: Session = Depends(get_db)):
 	)
 
 
+@router.post("/users/bulk", status_code=status.HTTP_201_CREATED)
+def create_users_bulk(
+	file: UploadFile = File(...),
+	skip_existing: bool = False,
+	db: Session = Depends(get_db),
+):
+	"""Create many users (and company/auditor profiles) from a CSV or JSON upload.
+
+	JSON is a list of ``{"username", "password", "role", "company": {...}}``
+	objects; CSV has ``username,password,role`` plus optional company columns.
+	"""
+	try:
+		text = file.file.read().decode("utf-8-sig")
+		if (file.filename or "").lower().endswith(".csv"):
+			raw = csv_to_users(text)
+		else:
+			raw = json.loads(text)
+			raw = raw.get("users", []) if isinstance(raw, dict) else raw
+		result = provision_users(db, parse_users(raw), skip_existing=skip_existing)
+	except (UnicodeDecodeError, json.JSONDecodeError) as error:
+		raise HTTPException(status_code=400, detail=f"Could not read upload: {error}")
+	except ProvisioningError as error:
+		raise HTTPException(status_code=422, detail=error.errors)
+
+	db.commit()
+	return result
+
+
 @router.put("/users/{user_id}", response_model=UserResponse)
 def update_user(user_id: int, payload: UpdateUserRequest, db: Session = Depends(get_db)):
 	user = db.query(UserTable).filter(UserTable.id == user_id).first()
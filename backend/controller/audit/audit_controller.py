@@ -1,15 +1,18 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from database.database import SessionLocal
+from database.routing import get_read_db
 from entity.company import CompanyTable
 from entity.company_submit import CompanySubmitTable
 from entity.company_assessment_result import CompanyAssessmentResultTable
 from entity.status import StatusTable
 from midlewere.midlewere import require_auth
+from service.submission_events import broadcaster, stream_events
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -32,12 +35,17 @@ class SubmissionItem(BaseModel):
 
 @router.get("/submissions", response_model=list[SubmissionItem])
 def list_submissions(
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 	user: dict = Depends(require_auth),
 ):
+	# Only submissions for each company's open round are listed.
 	rows = (
 		db.query(CompanySubmitTable)
-		.filter(CompanySubmitTable.delete_at.is_(None))
+		.join(CompanyTable, CompanyTable.id == CompanySubmitTable.company_id)
+		.filter(
+			CompanySubmitTable.delete_at.is_(None),
+			CompanySubmitTable.assessment_round == CompanyTable.current_round,
+		)
 		.order_by(CompanySubmitTable.company_id.asc(), CompanySubmitTable.created_at.desc())
 		.all()
 	)
@@ -70,6 +78,9 @@ def list_submissions(
 	) if company_ids else []
 	score_map: dict[int, float] = {}
 	for result in results:
+		company = company_map.get(result.company_id)
+		if not company or result.assessment_round != company.current_round:
+			continue
 		score_map[result.company_id] = score_map.get(result.company_id, 0) + (result.score or 0)
 
 	items: list[SubmissionItem] = []
@@ -89,3 +100,21 @@ def list_submissions(
 		)
 
 	return items
+
+
+@router.get("/submissions/events")
+async def submission_events(
+	request: Request,
+	user: dict = Depends(require_auth),
+):
+	"""Server-sent events for new company submissions and auditor scores.
+
+	Each event carries the company id so the dashboard can refresh just that
+	row instead of polling ``/submissions``.
+	"""
+	subscriber = broadcaster.subscribe()
+	return StreamingResponse(
+		stream_events(subscriber, request.is_disconnected),
+		media_type="text/event-stream",
+		headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+	)
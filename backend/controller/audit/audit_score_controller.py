@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from database.database import SessionLocal
+from database.routing import get_read_db
 from entity.auditor import AuditorTable
 from entity.auditor_score import AuditorScoreTable
 from entity.auditor_submit import AuditorSubmitTable
@@ -13,7 +14,9 @@ from entity.company_assessment import CompanyAssessmentTable
 from entity.evaluation_criteria import EvaluationCriteriaTable
 from entity.point import PointTable
 from entity.status import StatusTable
+from midlewere.metrics import assessment_submits_total
 from midlewere.midlewere import require_auth
+from service.submission_events import notify_submission
 
 router = APIRouter(prefix="/api/audit", tags=["audit-score"])
 
@@ -84,6 +87,7 @@ def submit_auditor_scores(
 		.filter(
 			AuditorSubmitTable.auditor_id == auditor.id,
 			AuditorSubmitTable.company_id == company_id,
+			AuditorSubmitTable.assessment_round == company.current_round,
 			AuditorSubmitTable.delete_at.is_(None),
 		)
 		.first()
@@ -98,6 +102,7 @@ def submit_auditor_scores(
 		db.query(CompanyAssessmentTable)
 		.filter(
 			CompanyAssessmentTable.company_id == company_id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
 			CompanyAssessmentTable.assessment_id.in_(assessment_ids),
 			CompanyAssessmentTable.delete_at.is_(None),
 		)
@@ -153,6 +158,7 @@ def submit_auditor_scores(
 			.filter(
 				AuditorScoreTable.auditor_id == auditor.id,
 				AuditorScoreTable.company_assessment_id == company_assessment.id,
+				AuditorScoreTable.assessment_round == company_assessment.assessment_round,
 				AuditorScoreTable.delete_at.is_(None),
 			)
 			.first()
@@ -165,6 +171,7 @@ def submit_auditor_scores(
 			record = AuditorScoreTable(
 				auditor_id=auditor.id,
 				company_assessment_id=company_assessment.id,
+				assessment_round=company_assessment.assessment_round,
 				evaluation_criteria_id=item.evaluation_criteria_id,
 			)
 			db.add(record)
@@ -173,11 +180,20 @@ def submit_auditor_scores(
 	submit_record = AuditorSubmitTable(
 		auditor_id=auditor.id,
 		company_id=company.id,
+		assessment_round=company.current_round,
 		status_id=status_row.id,
 	)
 	db.add(submit_record)
+	notify_submission(
+		db,
+		"auditor_scored",
+		company.id,
+		auditor_id=auditor.id,
+		assessment_round=company.current_round,
+	)
 
 	db.commit()
+	assessment_submits_total.inc(kind="auditor_scores")
 
 	return SubmitScoresResponse(
 		processed=len(payload.scores),
@@ -189,7 +205,8 @@ def submit_auditor_scores(
 @router.get("/submissions/{company_id}/auditor-scores", response_model=list[AuditorScoreView])
 def get_auditor_scores_for_company(
 	company_id: int,
-	db: Session = Depends(get_db),
+	assessment_round: int | None = None,
+	db: Session = Depends(get_read_db),
 	user: dict = Depends(require_auth),
 ):
 	user_id = user.get("sub")
@@ -211,11 +228,13 @@ def get_auditor_scores_for_company(
 	)
 	if not company:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+	round_number = assessment_round or company.current_round
 
 	company_assessments = (
 		db.query(CompanyAssessmentTable)
 		.filter(
 			CompanyAssessmentTable.company_id == company_id,
+			CompanyAssessmentTable.assessment_round == round_number,
 			CompanyAssessmentTable.delete_at.is_(None),
 		)
 		.all()
@@ -231,6 +250,7 @@ def get_auditor_scores_for_company(
 		.filter(
 			AuditorScoreTable.auditor_id == auditor.id,
 			AuditorScoreTable.company_assessment_id.in_(company_assessment_ids),
+			AuditorScoreTable.assessment_round == round_number,
 			AuditorScoreTable.delete_at.is_(None),
 		)
 		.all()
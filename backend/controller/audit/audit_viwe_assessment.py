@@ -1,11 +1,12 @@
 from datetime import datetime
-from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from controller.responses import FastJSONResponse
 from database.database import SessionLocal
+from database.routing import get_read_db
 from entity.assessment import AssessmentTable
 from entity.auditor import AuditorTable
 from entity.auditor_score import AuditorScoreTable
@@ -20,6 +21,7 @@ from entity.pillars import PillarsTable
 from entity.point import PointTable
 from entity.status import StatusTable
 from midlewere.midlewere import require_auth
+from service.storage import evidence_url
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -32,15 +34,6 @@ def get_db():
 		db.close()
 
 
-def build_public_url(file_path: str | None) -> str | None:
-	if not file_path:
-		return None
-	file_name = Path(file_path).name
-	if not file_name:
-		return None
-	return f"/uploads/evidence/{file_name}"
-
-
 class QuestionItem(BaseModel):
 	id: int
 	question: str
@@ -76,6 +69,7 @@ class SubmissionDetailResponse(BaseModel):
 	company_job_position: str | None = None
 	company_date_assessment: datetime | None = None
 	company_round_assessment: str | None = None
+	assessment_round: int = 1
 	submitted_at: datetime | None = None
 	status: str
 	score: float
@@ -87,7 +81,8 @@ class SubmissionDetailResponse(BaseModel):
 @router.get("/submissions/{company_id}", response_model=SubmissionDetailResponse)
 def get_submission_detail(
 	company_id: int,
-	db: Session = Depends(get_db),
+	assessment_round: int | None = None,
+	db: Session = Depends(get_read_db),
 	user: dict = Depends(require_auth),
 ):
 	user_id = user.get("sub")
@@ -107,11 +102,14 @@ def get_submission_detail(
 	)
 	if not company:
 		raise HTTPException(status_code=404, detail="Company not found")
+	# Earlier rounds stay readable; by default the auditor sees the open one.
+	round_number = assessment_round or company.current_round
 
 	latest_submit = (
 		db.query(CompanySubmitTable)
 		.filter(
 			CompanySubmitTable.company_id == company_id,
+			CompanySubmitTable.assessment_round == round_number,
 			CompanySubmitTable.delete_at.is_(None),
 		)
 		.order_by(CompanySubmitTable.created_at.desc())
@@ -134,6 +132,7 @@ def get_submission_detail(
 			.filter(
 				AuditorSubmitTable.auditor_id == auditor_id,
 				AuditorSubmitTable.company_id == company_id,
+				AuditorSubmitTable.assessment_round == round_number,
 				AuditorSubmitTable.delete_at.is_(None),
 			)
 			.order_by(AuditorSubmitTable.created_at.desc())
@@ -144,6 +143,7 @@ def get_submission_detail(
 		db.query(CompanyAssessmentResultTable)
 		.filter(
 			CompanyAssessmentResultTable.company_id == company_id,
+			CompanyAssessmentResultTable.assessment_round == round_number,
 			CompanyAssessmentResultTable.delete_at.is_(None),
 		)
 		.all()
@@ -157,7 +157,7 @@ def get_submission_detail(
 		.all()
 	)
 
-	pillar_items: list[PillarItem] = []
+	pillar_items: list[dict] = []
 	for pillar in pillars:
 		assessments = (
 			db.query(AssessmentTable)
@@ -176,6 +176,7 @@ def get_submission_detail(
 			db.query(CompanyAssessmentTable)
 			.filter(
 				CompanyAssessmentTable.company_id == company_id,
+				CompanyAssessmentTable.assessment_round == round_number,
 				CompanyAssessmentTable.assessment_id.in_(assessment_ids),
 				CompanyAssessmentTable.delete_at.is_(None),
 			)
@@ -190,6 +191,7 @@ def get_submission_detail(
 				.filter(
 					AuditorScoreTable.auditor_id == auditor_id,
 					AuditorScoreTable.company_assessment_id.in_(company_assessment_ids),
+					AuditorScoreTable.assessment_round == round_number,
 					AuditorScoreTable.delete_at.is_(None),
 				)
 				.all()
@@ -199,6 +201,7 @@ def get_submission_detail(
 			db.query(EvidenceTable)
 			.filter(
 				EvidenceTable.company_assessment_id.in_(company_assessment_ids),
+				EvidenceTable.assessment_round == round_number,
 				EvidenceTable.delete_at.is_(None),
 			)
 			.order_by(EvidenceTable.created_at.asc())
@@ -210,7 +213,7 @@ def get_submission_detail(
 			assessment_id = company_assessment_to_assessment.get(row.company_assessment_id)
 			if not assessment_id:
 				continue
-			url = row.url or build_public_url(row.file_path)
+			url = row.url or evidence_url(row.file_path, row.storage_backend)
 			if not url:
 				continue
 			evidence_map.setdefault(assessment_id, []).append(url)
@@ -234,7 +237,9 @@ def get_submission_detail(
 		) if point_ids else []
 		point_map = {row.id: row for row in points}
 
-		questions: list[QuestionItem] = []
+		# Built as plain dicts: a full submission has hundreds of questions and
+		# options, and validating each one as a model dominated the response time.
+		questions: list[dict] = []
 		for assessment in assessments:
 			company_row = company_map.get(assessment.id)
 			selected_criteria_id = (
@@ -242,19 +247,19 @@ def get_submission_detail(
 				if company_row and company_row.evaluation_criteria_id
 				else None
 			)
-			criteria_list = criteria_by_assessment.get(assessment.id, [])
 			criteria_options = []
-			for criteria in criteria_list:
+			selected_option = None
+			for criteria in criteria_by_assessment.get(assessment.id, []):
 				point = point_map.get(criteria.point_id) if criteria.point_id else None
-				criteria_options.append(
-					CriteriaOption(
-						id=criteria.id,
-						name=criteria.name,
-						score=point.score if point else None,
-						selected=criteria.id == selected_criteria_id,
-					)
-				)
-			selected_option = next((opt for opt in criteria_options if opt.selected), None)
+				option = {
+					"id": criteria.id,
+					"name": criteria.name,
+					"score": point.score if point else None,
+					"selected": criteria.id == selected_criteria_id,
+				}
+				if option["selected"] and selected_option is None:
+					selected_option = option
+				criteria_options.append(option)
 
 			company_assessment_id = company_row.id if company_row else None
 			auditor_score_row = auditor_score_map.get(company_assessment_id) if company_assessment_id else None
@@ -263,36 +268,39 @@ def get_submission_detail(
 			auditor_point = point_map.get(auditor_criteria.point_id) if auditor_criteria and auditor_criteria.point_id else None
 			auditor_score_value = auditor_point.score if auditor_point else None
 			questions.append(
-				QuestionItem(
-					id=assessment.id,
-					question=assessment.title,
-					description=assessment.description,
-					performance_results=company_row.performance_results if company_row else None,
-					answer=selected_option.name if selected_option else None,
-					score=selected_option.score if selected_option else None,
-					criteria_options=criteria_options,
-					evidence=evidence_map.get(assessment.id, []),
-					auditor_score_criteria_id=auditor_score_criteria_id,
-					auditor_score_value=auditor_score_value,
-				)
+				{
+					"id": assessment.id,
+					"question": assessment.title,
+					"description": assessment.description,
+					"performance_results": company_row.performance_results if company_row else None,
+					"answer": selected_option["name"] if selected_option else None,
+					"score": selected_option["score"] if selected_option else None,
+					"criteria_options": criteria_options,
+					"evidence": evidence_map.get(assessment.id, []),
+					"auditor_score_criteria_id": auditor_score_criteria_id,
+					"auditor_score_value": auditor_score_value,
+				}
 			)
 
-		pillar_items.append(PillarItem(title=pillar.name, questions=questions))
+		pillar_items.append({"title": pillar.name, "questions": questions})
 
-	return SubmissionDetailResponse(
-		company_id=company.id,
-		company_name=getattr(company, "company_name", None) or getattr(company, "name", ""),
-		company_type=getattr(company, "type_company", None),
-		company_number_of_employees=getattr(company, "Number_of_employees", None),
-		company_address=getattr(company, "address", None),
-		company_evaluation=getattr(company, "evaluation", None),
-		company_job_position=getattr(company, "job_position", None),
-		company_date_assessment=getattr(company, "date_assessment", None),
-		company_round_assessment=getattr(company, "round_assessment", None),
-		submitted_at=latest_submit.created_at if latest_submit else None,
-		status=status_name,
-		score=overall_score,
-		auditor_submitted=auditor_submit is not None,
-		auditor_submitted_at=auditor_submit.created_at if auditor_submit else None,
-		pillars=pillar_items,
+	return FastJSONResponse(
+		{
+			"company_id": company.id,
+			"company_name": getattr(company, "company_name", None) or getattr(company, "name", ""),
+			"company_type": getattr(company, "type_company", None),
+			"company_number_of_employees": getattr(company, "Number_of_employees", None),
+			"company_address": getattr(company, "address", None),
+			"company_evaluation": getattr(company, "evaluation", None),
+			"company_job_position": getattr(company, "job_position", None),
+			"company_date_assessment": getattr(company, "date_assessment", None),
+			"company_round_assessment": getattr(company, "round_assessment", None),
+			"assessment_round": round_number,
+			"submitted_at": latest_submit.created_at if latest_submit else None,
+			"status": status_name,
+			"score": overall_score,
+			"auditor_submitted": auditor_submit is not None,
+			"auditor_submitted_at": auditor_submit.created_at if auditor_submit else None,
+			"pillars": pillar_items,
+		}
 	)
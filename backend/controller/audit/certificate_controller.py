@@ -0,0 +1,101 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from entity.company import CompanyTable
+from midlewere.midlewere import require_auth
+from service import certificates
+from service.jobs import enqueue
+
+router = APIRouter(prefix="/api", tags=["certificate"])
+
+CertificateFormat = Literal["pdf", "png"]
+
+
+def get_db():
+	db = SessionLocal()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+def certificate_response(db: Session, company: CompanyTable, file_format: str, user: dict):
+	"""Serve the cached certificate, or queue a render and answer 202 with the job id."""
+	if file_format == "png" and not certificates.png_supported():
+		raise HTTPException(status_code=400, detail="PNG certificates are not available")
+
+	path, version = certificates.cached_certificate(db, company, file_format)
+	if version is None:
+		raise HTTPException(status_code=404, detail="No submitted results for this company")
+	if path is not None:
+		return FileResponse(
+			path,
+			media_type="application/pdf" if file_format == "pdf" else "image/png",
+			filename=f"certificate-{company.id}.{file_format}",
+			headers={"ETag": f'"{version}"', "Cache-Control": "private, max-age=0, must-revalidate"},
+		)
+
+	job = certificates.request_render(
+		db, company.id, file_format, created_by=int(user["sub"]) if user.get("sub") else None
+	)
+	db.commit()
+	return JSONResponse(
+		status_code=status.HTTP_202_ACCEPTED,
+		content={"job_id": job.id, "status": job.status, "version": version},
+	)
+
+
+@router.get("/company/certificate")
+def get_company_certificate(
+	file_format: CertificateFormat = Query("pdf", alias="format"),
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	user_id = user.get("sub")
+	if not user_id:
+		raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.user_id == int(user_id), CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+	return certificate_response(db, company, file_format, user)
+
+
+@router.get("/audit/submissions/{company_id}/certificate")
+def get_submission_certificate(
+	company_id: int,
+	file_format: CertificateFormat = Query("pdf", alias="format"),
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.id == company_id, CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+	return certificate_response(db, company, file_format, user)
+
+
+@router.post("/admin/certificates/batch", status_code=status.HTTP_202_ACCEPTED)
+def render_all_certificates(
+	file_format: CertificateFormat = Query("pdf", alias="format"),
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	job = enqueue(
+		db,
+		"render_certificates",
+		{"format": file_format},
+		created_by=int(user["sub"]) if user.get("sub") else None,
+	)
+	db.commit()
+	return {"job_id": job.id, "status": job.status}
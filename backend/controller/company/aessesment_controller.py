@@ -1,18 +1,34 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from controller.responses import FastJSONResponse
 from database.database import SessionLocal
+from database.routing import get_read_db
 from entity.assessment import AssessmentTable
 from entity.company import CompanyTable
 from entity.company_assessment import CompanyAssessmentTable
 from entity.evaluation_criteria import EvaluationCriteriaTable
 from entity.company_submit import CompanySubmitTable
-from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.evidence import EvidenceTable
 from entity.pillars import PillarsTable
 from entity.point import PointTable
 from entity.status import StatusTable
+from midlewere.metrics import (
+	assessment_answers_saved_total,
+	assessment_auto_saves_total,
+	assessment_submits_total,
+)
 from midlewere.midlewere import require_auth
+from service.analytics import company_standing, refresh_company_snapshot
+from service.jobs import enqueue
+from service.progress import get_progress, record_answers, record_submit
+from service.scoring import score_company
+from service.submission_events import notify_submission
 
 router = APIRouter(prefix="/api/company", tags=["company-assessment"])
 
@@ -49,6 +65,8 @@ class DraftItem(BaseModel):
 	assessment_id: int
 	evaluation_criteria_id: int | None = None
 	performance_results: str | None = None
+	# The version this client last read (0 before its first save); None overwrites unconditionally.
+	version: int | None = None
 
 
 class DraftPayload(BaseModel):
@@ -56,14 +74,40 @@ class DraftPayload(BaseModel):
 	items: list[DraftItem]
 
 
+class DraftVersion(BaseModel):
+	assessment_id: int
+	version: int
+
+
 class DraftResponse(BaseModel):
 	saved: int
+	versions: list[DraftVersion] = []
 
 
 class DraftItemResponse(BaseModel):
 	assessment_id: int
 	evaluation_criteria_id: int | None = None
 	performance_results: str | None = None
+	version: int = 0
+
+
+def draft_conflict(records: list[CompanyAssessmentTable]) -> HTTPException:
+	"""409 carrying the server's copy of each conflicting answer, for the client to merge."""
+	return HTTPException(
+		status_code=status.HTTP_409_CONFLICT,
+		detail={
+			"message": "Draft was changed by another session",
+			"conflicts": [
+				DraftItemResponse(
+					assessment_id=record.assessment_id,
+					evaluation_criteria_id=record.evaluation_criteria_id,
+					performance_results=record.performance_results,
+					version=record.version,
+				).model_dump()
+				for record in records
+			],
+		},
+	)
 
 
 class DraftListResponse(BaseModel):
@@ -83,6 +127,7 @@ class SubmitStatusResponse(BaseModel):
 
 
 class SummaryStatusResponse(BaseModel):
+	assessment_round: int
 	completed: bool
 	submitted: bool
 	submitted_at: str | None = None
@@ -113,8 +158,185 @@ class SummaryResultResponse(BaseModel):
 	pillars: list[PillarResultResponse]
 
 
+class BootstrapQuestion(QuestionResponse):
+	draft: DraftItemResponse | None = None
+	evidence_count: int = 0
+
+
+class BootstrapPillar(BaseModel):
+	key: str
+	name: str
+	weight: float | None = None
+	submitted: bool
+	total: int
+	answered: int
+	questions: list[BootstrapQuestion]
+
+
+class BootstrapResponse(BaseModel):
+	company_id: int
+	company_name: str
+	summary: SummaryStatusResponse
+	pillars: list[BootstrapPillar]
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+def get_dashboard_bootstrap(
+	db: Session = Depends(get_read_db),
+	user: dict = Depends(require_auth),
+):
+	"""Everything the dashboard's first paint needs, in a fixed number of queries.
+
+	Combines the per-pillar questionnaire, drafts and submit state with the
+	summary status and per-question evidence counts, so the page no longer
+	makes a dozen requests that each repeat the auth and company lookups.
+	"""
+	user_id = user.get("sub")
+	if not user_id:
+		raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.user_id == int(user_id), CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+
+	pillars = (
+		db.query(PillarsTable)
+		.filter(PillarsTable.delete_at.is_(None))
+		.order_by(PillarsTable.id.asc())
+		.all()
+	)
+	assessments = (
+		db.query(AssessmentTable)
+		.filter(AssessmentTable.delete_at.is_(None))
+		.order_by(AssessmentTable.id.asc())
+		.all()
+	)
+	choice_rows = (
+		db.query(
+			EvaluationCriteriaTable.id,
+			EvaluationCriteriaTable.assessment_id,
+			EvaluationCriteriaTable.name,
+			EvaluationCriteriaTable.point_id,
+			PointTable.score,
+		)
+		.join(AssessmentTable, AssessmentTable.id == EvaluationCriteriaTable.assessment_id)
+		.outerjoin(
+			PointTable,
+			(PointTable.id == EvaluationCriteriaTable.point_id) & PointTable.delete_at.is_(None),
+		)
+		.filter(EvaluationCriteriaTable.delete_at.is_(None), AssessmentTable.delete_at.is_(None))
+		.order_by(EvaluationCriteriaTable.id.asc())
+		.all()
+	)
+	company_rows = (
+		db.query(CompanyAssessmentTable)
+		.filter(
+			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
+			CompanyAssessmentTable.delete_at.is_(None),
+		)
+		.all()
+	)
+	evidence_counts = dict(
+		db.query(CompanyAssessmentTable.assessment_id, func.count(EvidenceTable.id))
+		.join(EvidenceTable, EvidenceTable.company_assessment_id == CompanyAssessmentTable.id)
+		.filter(
+			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
+			CompanyAssessmentTable.delete_at.is_(None),
+			EvidenceTable.assessment_round == company.current_round,
+			EvidenceTable.delete_at.is_(None),
+		)
+		.group_by(CompanyAssessmentTable.assessment_id)
+		.all()
+	)
+	submit_status = (
+		db.query(StatusTable)
+		.filter(StatusTable.name == "submit", StatusTable.delete_at.is_(None))
+		.first()
+	)
+	latest_submit = (
+		db.query(CompanySubmitTable)
+		.filter(
+			CompanySubmitTable.company_id == company.id,
+			CompanySubmitTable.assessment_round == company.current_round,
+			CompanySubmitTable.delete_at.is_(None),
+		)
+		.order_by(CompanySubmitTable.created_at.desc())
+		.first()
+	)
+
+	choices_by_assessment: dict[int, list[dict]] = {}
+	for criteria_id, assessment_id, name, point_id, score in choice_rows:
+		choices_by_assessment.setdefault(assessment_id, []).append(
+			{"id": criteria_id, "label": name, "score": score if score is not None else 0, "point_id": point_id}
+		)
+	drafts = {row.assessment_id: row for row in company_rows}
+	submit_status_id = submit_status.id if submit_status else None
+
+	questions_by_pillar: dict[int, list[dict]] = {}
+	for assessment in assessments:
+		draft = drafts.get(assessment.id)
+		questions_by_pillar.setdefault(assessment.pillar_id, []).append(
+			{
+				"id": assessment.id,
+				"title": assessment.title,
+				"detail": assessment.description,
+				"choices": choices_by_assessment.get(assessment.id, []),
+				"draft": {
+					"assessment_id": draft.assessment_id,
+					"evaluation_criteria_id": draft.evaluation_criteria_id,
+					"performance_results": draft.performance_results,
+					"version": draft.version,
+				} if draft else None,
+				"evidence_count": evidence_counts.get(assessment.id, 0),
+			}
+		)
+
+	pillar_items = []
+	for pillar in pillars:
+		questions = questions_by_pillar.get(pillar.id, [])
+		pillar_drafts = [drafts[question["id"]] for question in questions if question["id"] in drafts]
+		pillar_items.append(
+			{
+				"key": pillar.key,
+				"name": pillar.name,
+				"weight": pillar.weight,
+				# Same rule as /submit-status: every question carries the submit status.
+				"submitted": bool(questions) and submit_status_id is not None and sum(
+					1 for row in pillar_drafts if row.status_id == submit_status_id
+				) == len(questions),
+				"total": len(questions),
+				"answered": sum(1 for row in pillar_drafts if row.evaluation_criteria_id is not None),
+				"questions": questions,
+			}
+		)
+
+	total = len(assessments)
+	answered = sum(1 for row in company_rows if row.evaluation_criteria_id is not None)
+	return FastJSONResponse(
+		{
+			"company_id": company.id,
+			"company_name": company.company_name,
+			"summary": {
+				"assessment_round": company.current_round,
+				"completed": total > 0 and answered >= total,
+				"submitted": latest_submit is not None,
+				"submitted_at": latest_submit.created_at.isoformat() if latest_submit else None,
+				"total": total,
+				"answered": answered,
+			},
+			"pillars": pillar_items,
+		}
+	)
+
+
 @router.get("/assessments/{pillar_key}", response_model=PillarAssessmentResponse)
-def get_assessments_by_pillar(pillar_key: str, db: Session = Depends(get_db)):
+def get_assessments_by_pillar(pillar_key: str, db: Session = Depends(get_read_db)):
 	pillar = (
 		db.query(PillarsTable)
 		.filter(PillarsTable.key == pillar_key, PillarsTable.delete_at.is_(None))
@@ -248,6 +470,7 @@ def auto_save_assessment(
 			db.query(CompanyAssessmentTable)
 			.filter(
 				CompanyAssessmentTable.company_id == company.id,
+				CompanyAssessmentTable.assessment_round == company.current_round,
 				CompanyAssessmentTable.assessment_id.in_(assessment_ids),
 				CompanyAssessmentTable.status_id == submit_status.id,
 				CompanyAssessmentTable.delete_at.is_(None),
@@ -257,52 +480,122 @@ def auto_save_assessment(
 		if submitted_count == len(assessment_ids):
 			raise HTTPException(status_code=400, detail="Assessment already submitted")
 
-	saved = 0
 	for item in payload.items:
-		assessment = assessment_map.get(item.assessment_id)
-		if not assessment:
-			continue
 		criteria_id = item.evaluation_criteria_id
 		if criteria_id is not None:
 			criteria = criteria_map.get(criteria_id)
-			if not criteria or criteria.assessment_id != assessment.id:
+			if not criteria or criteria.assessment_id != item.assessment_id:
 				raise HTTPException(status_code=400, detail="Invalid criteria")
 
-		record = (
-			db.query(CompanyAssessmentTable)
-			.filter(
-				CompanyAssessmentTable.company_id == company.id,
-				CompanyAssessmentTable.assessment_id == assessment.id,
-				CompanyAssessmentTable.delete_at.is_(None),
-			)
-			.first()
+	records = {
+		record.assessment_id: record
+		for record in db.query(CompanyAssessmentTable)
+		.filter(
+			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
+			CompanyAssessmentTable.assessment_id.in_(assessment_ids),
+			CompanyAssessmentTable.delete_at.is_(None),
 		)
+		.all()
+	}
 
+	# A client that is behind only conflicts if the server holds an answer it hasn't seen.
+	stale = [
+		record
+		for item in payload.items
+		if item.version is not None
+		and (record := records.get(item.assessment_id)) is not None
+		and record.version != item.version
+		and (item.version > 0 or record.evaluation_criteria_id is not None or record.performance_results)
+	]
+	if stale:
+		raise draft_conflict(stale)
+
+	# Created or recounted before the writes below, but not locked yet.
+	progress = get_progress(db, company)
+	answered_delta = 0
+	saved = 0
+	versions: list[DraftVersion] = []
+	lost = False
+	# The last entry wins when a payload repeats a question; rows are written in id
+	# order so two overlapping saves can't lock them in opposite orders.
+	unique_items = {item.assessment_id: item for item in payload.items}
+	for item in sorted(unique_items.values(), key=lambda item: item.assessment_id):
+		criteria_id = item.evaluation_criteria_id
+		record = records.get(item.assessment_id)
+		was_answered = record is not None and record.evaluation_criteria_id is not None
+		answered_delta += (criteria_id is not None) - was_answered
 		if record:
-			record.evaluation_criteria_id = criteria_id
-			record.performance_results = item.performance_results
-			record.status_id = status_id
-			db.add(record)
+			# Conditional on the version read above, so a concurrent save can't be overwritten.
+			updated = (
+				db.query(CompanyAssessmentTable)
+				.filter(
+					CompanyAssessmentTable.id == record.id,
+					CompanyAssessmentTable.version == record.version,
+				)
+				.update(
+					{
+						CompanyAssessmentTable.evaluation_criteria_id: criteria_id,
+						CompanyAssessmentTable.performance_results: item.performance_results,
+						CompanyAssessmentTable.status_id: status_id,
+						CompanyAssessmentTable.version: CompanyAssessmentTable.version + 1,
+					},
+					synchronize_session=False,
+				)
+			)
+			if not updated:
+				lost = True
+				break
+			versions.append(DraftVersion(assessment_id=item.assessment_id, version=record.version + 1))
 		else:
-			record = CompanyAssessmentTable(
-				company_id=company.id,
-				assessment_id=assessment.id,
-				evaluation_criteria_id=criteria_id,
-				performance_results=item.performance_results,
-				status_id=status_id,
+			db.add(
+				CompanyAssessmentTable(
+					company_id=company.id,
+					assessment_round=company.current_round,
+					assessment_id=item.assessment_id,
+					evaluation_criteria_id=criteria_id,
+					performance_results=item.performance_results,
+					status_id=status_id,
+					version=1,
+				)
 			)
-			db.add(record)
+			versions.append(DraftVersion(assessment_id=item.assessment_id, version=1))
 		saved += 1
 
+	if not lost:
+		try:
+			db.flush()
+		except IntegrityError:
+			lost = True
+	if lost:
+		# Another save won the race; report the state it left behind.
+		db.rollback()
+		current = (
+			db.query(CompanyAssessmentTable)
+			.filter(
+				CompanyAssessmentTable.company_id == company.id,
+				CompanyAssessmentTable.assessment_round == company.current_round,
+				CompanyAssessmentTable.assessment_id.in_(assessment_ids),
+				CompanyAssessmentTable.delete_at.is_(None),
+			)
+			.all()
+		)
+		raise draft_conflict(current)
+
+	# Locked (and reloaded) last, so the counter lock is held only for the commit.
+	db.refresh(progress, with_for_update=True)
+	record_answers(progress, pillar.id, answered_delta)
 	db.commit()
-	return DraftResponse(saved=saved)
+	assessment_auto_saves_total.inc()
+	assessment_answers_saved_total.inc(saved)
+	return DraftResponse(saved=saved, versions=versions)
 
 
 @router.get("/assessments/{pillar_key}/draft", response_model=DraftListResponse)
 def get_draft_assessments(
 	pillar_key: str,
 	user_id: int | None = None,
-	db: Session = Depends(get_db),
+	db: Session = Depends(get_read_db),
 	user: dict = Depends(require_auth),
 ):
 	resolved_user_id = user_id or user.get("sub")
@@ -333,6 +626,7 @@ def get_draft_assessments(
 		)
 		.filter(
 			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
 			CompanyAssessmentTable.delete_at.is_(None),
 			AssessmentTable.pillar_id == pillar.id,
 			AssessmentTable.delete_at.is_(None),
@@ -346,6 +640,7 @@ def get_draft_assessments(
 			assessment_id=row.assessment_id,
 			evaluation_criteria_id=row.evaluation_criteria_id,
 			performance_results=row.performance_results,
+			version=row.version,
 		)
 		for row in rows
 	]
@@ -402,6 +697,7 @@ def submit_pillar_assessments(
 		db.query(CompanyAssessmentTable)
 		.filter(
 			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
 			CompanyAssessmentTable.assessment_id.in_(assessment_ids),
 			CompanyAssessmentTable.delete_at.is_(None),
 		)
@@ -419,6 +715,7 @@ def submit_pillar_assessments(
 		else:
 			record = CompanyAssessmentTable(
 				company_id=company.id,
+				assessment_round=company.current_round,
 				assessment_id=assessment_id,
 				status_id=status_row.id,
 			)
@@ -426,6 +723,7 @@ def submit_pillar_assessments(
 			updated += 1
 
 	db.commit()
+	assessment_submits_total.inc(kind="pillar")
 	return SubmitResponse(updated=updated)
 
 
@@ -480,6 +778,7 @@ def get_submit_status(
 		db.query(CompanyAssessmentTable)
 		.filter(
 			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
 			CompanyAssessmentTable.assessment_id.in_(assessment_ids),
 			CompanyAssessmentTable.status_id == status_row.id,
 			CompanyAssessmentTable.delete_at.is_(None),
@@ -508,36 +807,17 @@ def get_summary_status(
 	if not company:
 		raise HTTPException(status_code=404, detail="Company not found")
 
-	total = (
-		db.query(AssessmentTable)
-		.filter(AssessmentTable.delete_at.is_(None))
-		.count()
-	)
-
-	answered = (
-		db.query(CompanyAssessmentTable)
-		.filter(
-			CompanyAssessmentTable.company_id == company.id,
-			CompanyAssessmentTable.delete_at.is_(None),
-			CompanyAssessmentTable.evaluation_criteria_id.isnot(None),
-		)
-		.count()
-	)
-
-	latest_submit = (
-		db.query(CompanySubmitTable)
-		.filter(
-			CompanySubmitTable.company_id == company.id,
-			CompanySubmitTable.delete_at.is_(None),
-		)
-		.order_by(CompanySubmitTable.created_at.desc())
-		.first()
-	)
+	progress = get_progress(db, company)
+	if db.new or db.dirty:
+		db.commit()
 
+	total = progress.total_questions
+	answered = progress.answered
 	return SummaryStatusResponse(
+		assessment_round=company.current_round,
 		completed=total > 0 and answered >= total,
-		submitted=latest_submit is not None,
-		submitted_at=latest_submit.created_at.isoformat() if latest_submit else None,
+		submitted=progress.submitted_at is not None,
+		submitted_at=progress.submitted_at.isoformat() if progress.submitted_at else None,
 		total=total,
 		answered=answered,
 	)
@@ -569,42 +849,37 @@ def submit_assessment_summary(
 	if not status_row:
 		raise HTTPException(status_code=400, detail="Submit status not found")
 
-	total = (
-		db.query(AssessmentTable)
-		.filter(AssessmentTable.delete_at.is_(None))
-		.count()
-	)
-	answered = (
-		db.query(CompanyAssessmentTable)
-		.filter(
-			CompanyAssessmentTable.company_id == company.id,
-			CompanyAssessmentTable.delete_at.is_(None),
-			CompanyAssessmentTable.evaluation_criteria_id.isnot(None),
-		)
-		.count()
-	)
-	if total == 0 or answered < total:
+	progress = get_progress(db, company, for_update=True)
+	if progress.total_questions == 0 or progress.answered < progress.total_questions:
 		raise HTTPException(status_code=400, detail="Assessment not completed")
 
-	record = CompanySubmitTable(company_id=company.id, status_id=status_row.id)
+	record = CompanySubmitTable(
+		company_id=company.id,
+		assessment_round=company.current_round,
+		status_id=status_row.id,
+	)
 	db.add(record)
+	submitted_at = datetime.utcnow()
+	record.created_at = submitted_at
+	record_submit(progress, submitted_at)
+	refresh_company_snapshot(db, company, submitted_at=submitted_at)
+	# Results are scored off the request path so the auditor dashboard has them
+	# even if the company never opens its results page.
+	enqueue(db, "rescore_company", {"company_id": company.id}, created_by=company.user_id)
+	notify_submission(
+		db,
+		"company_submitted",
+		company.id,
+		company_name=company.company_name,
+		assessment_round=company.current_round,
+	)
 	db.commit()
 	db.refresh(record)
+	assessment_submits_total.inc(kind="summary")
 
 	return SummarySubmitResponse(submitted_at=record.created_at.isoformat())
 
 
-def map_point_to_score(point_score: float) -> float:
-	lookup = {
-		0.0: 0.0,
-		0.25: 5.0,
-		0.5: 10.0,
-		0.75: 15.0,
-		1.0: 20.0,
-	}
-	return lookup.get(round(point_score, 2), 0.0)
-
-
 @router.get("/assessment-summary/results", response_model=SummaryResultResponse)
 def get_assessment_summary_results(
 	user_id: int | None = None,
@@ -623,132 +898,35 @@ def get_assessment_summary_results(
 	if not company:
 		raise HTTPException(status_code=404, detail="Company not found")
 
-	pillars = (
-		db.query(PillarsTable)
-		.filter(PillarsTable.delete_at.is_(None))
-		.order_by(PillarsTable.id.asc())
-		.all()
-	)
-
-	results: list[PillarResultResponse] = []
-	for pillar in pillars:
-		assessments = (
-			db.query(AssessmentTable)
-			.filter(
-				AssessmentTable.pillar_id == pillar.id,
-				AssessmentTable.delete_at.is_(None),
-			)
-			.all()
-		)
-		assessment_ids = [assessment.id for assessment in assessments]
-		if not assessment_ids:
-			results.append(
-				PillarResultResponse(
-					key=pillar.key,
-					name=pillar.name,
-					weight=pillar.weight,
-					score=0.0,
-					max_score=float(pillar.weight or 0),
-				)
-			)
-			continue
-
-		company_rows = (
-			db.query(CompanyAssessmentTable)
-			.filter(
-				CompanyAssessmentTable.company_id == company.id,
-				CompanyAssessmentTable.assessment_id.in_(assessment_ids),
-				CompanyAssessmentTable.delete_at.is_(None),
-			)
-			.all()
-		)
-		criteria_by_assessment = {
-			row.assessment_id: row.evaluation_criteria_id
-			for row in company_rows
-			if row.evaluation_criteria_id
-		}
-		criteria_ids = list(criteria_by_assessment.values())
-		criteria_rows = (
-			db.query(EvaluationCriteriaTable)
-			.filter(
-				EvaluationCriteriaTable.id.in_(criteria_ids),
-				EvaluationCriteriaTable.delete_at.is_(None),
-			)
-			.all()
-		) if criteria_ids else []
-		criteria_to_point = {row.id: row.point_id for row in criteria_rows if row.point_id}
-		point_ids = list(criteria_to_point.values())
-		point_rows = (
-			db.query(PointTable)
-			.filter(PointTable.id.in_(point_ids), PointTable.delete_at.is_(None))
-			.all()
-		) if point_ids else []
-		point_scores = {row.id: row.score for row in point_rows}
-
-		raw_score = 0.0
-		for assessment_id in assessment_ids:
-			criteria_id = criteria_by_assessment.get(assessment_id)
-			if not criteria_id:
-				continue
-			point_id = criteria_to_point.get(criteria_id)
-			if not point_id:
-				continue
-			point_score = point_scores.get(point_id)
-			if point_score is None:
-				continue
-			raw_score += map_point_to_score(point_score)
-
-		max_raw = float(len(assessment_ids) * 20)
-		weight = float(pillar.weight or 0)
-		if weight > 0 and max_raw > 0:
-			weighted_score = (raw_score / max_raw) * weight
-			max_score = weight
-		else:
-			weighted_score = raw_score
-			max_score = max_raw
-
-		result_row = (
-			db.query(CompanyAssessmentResultTable)
-			.filter(
-				CompanyAssessmentResultTable.company_id == company.id,
-				CompanyAssessmentResultTable.pillar_id == pillar.id,
-				CompanyAssessmentResultTable.delete_at.is_(None),
-			)
-			.first()
-		)
-		if result_row:
-			result_row.score = weighted_score
-			db.add(result_row)
-		else:
-			db.add(
-				CompanyAssessmentResultTable(
-					company_id=company.id,
-					pillar_id=pillar.id,
-					score=weighted_score,
-				)
-			)
+	score = score_company(db, company)
+	db.commit()
 
-		results.append(
-			PillarResultResponse(
-				key=pillar.key,
-				name=pillar.name,
-				weight=pillar.weight,
-				score=round(weighted_score, 2),
-				max_score=round(max_score, 2),
-			)
-		)
+	return SummaryResultResponse(
+		overall_score=score.overall_score,
+		max_score=score.max_score,
+		star_count=score.star_count,
+		pillars=[PillarResultResponse(**pillar.model_dump()) for pillar in score.pillars],
+	)
 
-	db.commit()
 
-	overall_score = round(sum(item.score for item in results), 2)
-	max_score = round(sum(item.max_score for item in results), 2)
-	star_count = 0
-	if max_score > 0:
-		star_count = max(0, min(5, round((overall_score / max_score) * 5)))
+@router.get("/assessment-summary/benchmark")
+def get_assessment_summary_benchmark(
+	db: Session = Depends(get_read_db),
+	user: dict = Depends(require_auth),
+):
+	user_id = user.get("sub")
+	if not user_id:
+		raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-	return SummaryResultResponse(
-		overall_score=overall_score,
-		max_score=max_score,
-		star_count=star_count,
-		pillars=results,
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.user_id == int(user_id), CompanyTable.delete_at.is_(None))
+		.first()
 	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+
+	standing = company_standing(db, company.id)
+	if standing is None:
+		raise HTTPException(status_code=404, detail="Results not calculated yet")
+	return standing
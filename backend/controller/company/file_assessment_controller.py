@@ -1,10 +1,9 @@
-import os
-import uuid
+import logging
 from datetime import datetime
-from pathlib import Path
 from typing import List
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -13,7 +12,13 @@ from entity.assessment import AssessmentTable
 from entity.company import CompanyTable
 from entity.company_assessment import CompanyAssessmentTable
 from entity.evidence import EvidenceTable
+from midlewere.metrics import evidence_uploaded_bytes_total, evidence_uploaded_files_total
 from midlewere.midlewere import require_auth
+from service import storage
+from service.evidence_ingest import request_optimization
+from service.storage import evidence_url, get_storage, stored_key
+
+logger = logging.getLogger("hicm.storage")
 
 router = APIRouter(prefix="/api/company", tags=["company-evidence"])
 
@@ -44,20 +49,56 @@ class EvidenceDeleteResponse(BaseModel):
 	success: bool
 
 
-def ensure_upload_dir() -> Path:
-	base_dir = Path(__file__).resolve().parents[3]
-	upload_dir = base_dir / "uploads" / "evidence"
-	upload_dir.mkdir(parents=True, exist_ok=True)
-	return upload_dir
+class UploadTicketRequest(BaseModel):
+	file_name: str
+	content_type: str | None = None
+	size: int | None = None
+
+
+class UploadTicketResponse(BaseModel):
+	upload_token: str
+	url: str
+	method: str
+	headers: dict[str, str]
+	expires_in: int
+
 
+class UploadCompleteRequest(BaseModel):
+	upload_token: str
 
-def build_public_url(file_path: str | None) -> str | None:
-	if not file_path:
-		return None
-	file_name = Path(file_path).name
-	if not file_name:
-		return None
-	return f"/uploads/evidence/{file_name}"
+
+def evidence_item(row: EvidenceTable) -> EvidenceItem:
+	return EvidenceItem(
+		id=row.id,
+		file_path=row.file_path,
+		url=evidence_url(row.file_path, row.storage_backend),
+	)
+
+
+def get_company_assessment(db: Session, company: CompanyTable, assessment_id: int) -> CompanyAssessmentTable:
+	"""The company's answer row for ``assessment_id`` in its open round, created if missing."""
+	company_assessment = (
+		db.query(CompanyAssessmentTable)
+		.filter(
+			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
+			CompanyAssessmentTable.assessment_id == assessment_id,
+			CompanyAssessmentTable.delete_at.is_(None),
+		)
+		.first()
+	)
+	if not company_assessment:
+		company_assessment = CompanyAssessmentTable(
+			company_id=company.id,
+			assessment_round=company.current_round,
+			assessment_id=assessment_id,
+			performance_results=None,
+			created_at=datetime.utcnow(),
+			updated_at=datetime.utcnow(),
+		)
+		db.add(company_assessment)
+		db.flush()
+	return company_assessment
 
 
 @router.post("/assessments/{assessment_id}/evidence", response_model=EvidenceUploadResponse)
@@ -87,56 +128,184 @@ def upload_evidence(
 	if not assessment:
 		raise HTTPException(status_code=404, detail="Assessment not found")
 
-	company_assessment = (
-		db.query(CompanyAssessmentTable)
-		.filter(
-			CompanyAssessmentTable.company_id == company.id,
-			CompanyAssessmentTable.assessment_id == assessment_id,
-			CompanyAssessmentTable.delete_at.is_(None),
-		)
-		.first()
-	)
-	if not company_assessment:
-		company_assessment = CompanyAssessmentTable(
-			company_id=company.id,
-			assessment_id=assessment_id,
-			performance_results=None,
-			created_at=datetime.utcnow(),
-			updated_at=datetime.utcnow(),
-		)
-		db.add(company_assessment)
-		db.flush()
+	company_assessment = get_company_assessment(db, company, assessment_id)
 
-	upload_dir = ensure_upload_dir()
+	backend = get_storage()
 	items: list[EvidenceItem] = []
 	for file in files:
 		if not file.filename:
 			continue
-		safe_name = f"{uuid.uuid4().hex}_{os.path.basename(file.filename)}"
-		file_path = upload_dir / safe_name
-		with file_path.open("wb") as buffer:
-			buffer.write(file.file.read())
+		key = storage.evidence_key(company.id, company_assessment.assessment_round, file.filename)
+		written = backend.save(key, file.file, file.content_type)
+		evidence_uploaded_bytes_total.inc(written)
+		evidence_uploaded_files_total.inc()
 
 		evidence = EvidenceTable(
 			company_assessment_id=company_assessment.id,
-			file_path=str(file_path),
+			assessment_round=company_assessment.assessment_round,
+			file_path=key,
+			storage_backend=backend.name,
 			created_at=datetime.utcnow(),
 			updated_at=datetime.utcnow(),
 		)
 		db.add(evidence)
 		db.flush()
-		items.append(
-			EvidenceItem(
-				id=evidence.id,
-				file_path=evidence.file_path,
-				url=build_public_url(evidence.file_path),
-			)
-		)
+		request_optimization(db, evidence)
+		items.append(evidence_item(evidence))
 
 	db.commit()
 	return EvidenceUploadResponse(items=items)
 
 
+@router.post("/assessments/{assessment_id}/evidence/uploads", response_model=UploadTicketResponse)
+def create_evidence_upload(
+	assessment_id: int,
+	payload: UploadTicketRequest,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	"""Start a direct upload.
+
+	The client sends the file with ``method`` to ``url`` (plus ``headers``),
+	then posts ``upload_token`` to ``/evidence/uploads/complete``. With the
+	S3 backend the bytes never pass through the API.
+	"""
+	resolved_user_id = user.get("sub")
+	if not resolved_user_id:
+		raise HTTPException(status_code=401, detail="Invalid token")
+
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.user_id == int(resolved_user_id), CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+
+	assessment = (
+		db.query(AssessmentTable)
+		.filter(AssessmentTable.id == assessment_id, AssessmentTable.delete_at.is_(None))
+		.first()
+	)
+	if not assessment:
+		raise HTTPException(status_code=404, detail="Assessment not found")
+	if payload.size is not None and payload.size > storage.EVIDENCE_MAX_BYTES:
+		raise HTTPException(status_code=413, detail="File too large")
+
+	backend = get_storage()
+	key = storage.evidence_key(company.id, company.current_round, payload.file_name)
+	token = storage.sign_upload(
+		{
+			"backend": backend.name,
+			"key": key,
+			"company_id": company.id,
+			"assessment_id": assessment_id,
+			"assessment_round": company.current_round,
+		}
+	)
+	upload = backend.presign_upload(key, token, payload.content_type)
+	return UploadTicketResponse(
+		upload_token=token,
+		url=upload.url,
+		method=upload.method,
+		headers=upload.headers,
+		expires_in=storage.UPLOAD_URL_EXPIRES_SECONDS,
+	)
+
+
+@router.put("/evidence/uploads/{token}")
+async def receive_local_evidence_upload(token: str, request: Request):
+	"""Upload target for the local backend; the signed token stands in for a presigned URL."""
+	claims = storage.verify_upload(token)
+	if not claims or claims.get("backend") != "local":
+		raise HTTPException(status_code=404, detail="Upload not found")
+
+	written = 0
+	with get_storage("local").writer(claims["key"]) as buffer:
+		async for chunk in request.stream():
+			written += len(chunk)
+			if written > storage.EVIDENCE_MAX_BYTES:
+				raise HTTPException(status_code=413, detail="File too large")
+			await run_in_threadpool(buffer.write, chunk)
+	return Response(status_code=200)
+
+
+@router.post("/assessments/{assessment_id}/evidence/uploads/complete", response_model=EvidenceItem)
+def complete_evidence_upload(
+	assessment_id: int,
+	payload: UploadCompleteRequest,
+	db: Session = Depends(get_db),
+	user: dict = Depends(require_auth),
+):
+	"""Record the evidence row for a finished direct upload; repeating it returns the same row."""
+	claims = storage.verify_upload(payload.upload_token, grace_seconds=storage.UPLOAD_URL_EXPIRES_SECONDS)
+	if not claims or claims.get("assessment_id") != assessment_id:
+		raise HTTPException(status_code=400, detail="Invalid upload token")
+
+	resolved_user_id = user.get("sub")
+	if not resolved_user_id:
+		raise HTTPException(status_code=401, detail="Invalid token")
+
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.user_id == int(resolved_user_id), CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if not company:
+		raise HTTPException(status_code=404, detail="Company not found")
+	if company.id != claims.get("company_id"):
+		raise HTTPException(status_code=403, detail="Upload belongs to another company")
+	if company.current_round != claims.get("assessment_round"):
+		raise HTTPException(status_code=409, detail="Assessment round changed during upload")
+
+	assessment = (
+		db.query(AssessmentTable)
+		.filter(AssessmentTable.id == assessment_id, AssessmentTable.delete_at.is_(None))
+		.first()
+	)
+	if not assessment:
+		raise HTTPException(status_code=404, detail="Assessment not found")
+
+	key = claims["key"]
+	company_assessment = get_company_assessment(db, company, assessment_id)
+	existing = (
+		db.query(EvidenceTable)
+		.filter(
+			EvidenceTable.company_assessment_id == company_assessment.id,
+			EvidenceTable.assessment_round == company_assessment.assessment_round,
+			EvidenceTable.file_path == key,
+			EvidenceTable.delete_at.is_(None),
+		)
+		.first()
+	)
+	if existing:
+		return evidence_item(existing)
+
+	backend = get_storage(claims["backend"])
+	info = backend.stat(key)
+	if info is None:
+		raise HTTPException(status_code=400, detail="File has not been uploaded")
+	if info.size > storage.EVIDENCE_MAX_BYTES:
+		backend.delete(key)
+		raise HTTPException(status_code=413, detail="File too large")
+
+	evidence = EvidenceTable(
+		company_assessment_id=company_assessment.id,
+		assessment_round=company_assessment.assessment_round,
+		file_path=key,
+		storage_backend=backend.name,
+		created_at=datetime.utcnow(),
+		updated_at=datetime.utcnow(),
+	)
+	db.add(evidence)
+	db.flush()
+	request_optimization(db, evidence)
+	db.commit()
+	evidence_uploaded_bytes_total.inc(info.size)
+	evidence_uploaded_files_total.inc()
+	return evidence_item(evidence)
+
+
 @router.get("/assessments/{assessment_id}/evidence", response_model=EvidenceListResponse)
 def list_evidence(
 	assessment_id: int,
@@ -159,6 +328,7 @@ def list_evidence(
 		db.query(CompanyAssessmentTable)
 		.filter(
 			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
 			CompanyAssessmentTable.assessment_id == assessment_id,
 			CompanyAssessmentTable.delete_at.is_(None),
 		)
@@ -171,21 +341,14 @@ def list_evidence(
 		db.query(EvidenceTable)
 		.filter(
 			EvidenceTable.company_assessment_id == company_assessment.id,
+			EvidenceTable.assessment_round == company_assessment.assessment_round,
 			EvidenceTable.delete_at.is_(None),
 		)
 		.order_by(EvidenceTable.created_at.asc())
 		.all()
 	)
 
-	items = [
-		EvidenceItem(
-			id=row.id,
-			file_path=row.file_path,
-			url=build_public_url(row.file_path),
-		)
-		for row in evidence_rows
-	]
-	return EvidenceListResponse(items=items)
+	return EvidenceListResponse(items=[evidence_item(row) for row in evidence_rows])
 
 
 @router.delete(
@@ -214,6 +377,7 @@ def delete_evidence(
 		db.query(CompanyAssessmentTable)
 		.filter(
 			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
 			CompanyAssessmentTable.assessment_id == assessment_id,
 			CompanyAssessmentTable.delete_at.is_(None),
 		)
@@ -227,6 +391,7 @@ def delete_evidence(
 		.filter(
 			EvidenceTable.id == evidence_id,
 			EvidenceTable.company_assessment_id == company_assessment.id,
+			EvidenceTable.assessment_round == company_assessment.assessment_round,
 			EvidenceTable.delete_at.is_(None),
 		)
 		.first()
@@ -234,13 +399,13 @@ def delete_evidence(
 	if not evidence:
 		raise HTTPException(status_code=404, detail="Evidence not found")
 
-	if evidence.file_path:
+	key = stored_key(evidence.file_path)
+	if key:
 		try:
-			file_path = Path(evidence.file_path)
-			if file_path.exists():
-				file_path.unlink()
-		except OSError:
-			pass
+			get_storage(evidence.storage_backend or "local").delete(key)
+		except Exception:
+			# The row is tombstoned either way; a leftover object is only wasted space.
+			logger.warning("Could not delete evidence object %s", key, exc_info=True)
 
 	evidence.delete_at = datetime.utcnow()
 	evidence.updated_at = datetime.utcnow()
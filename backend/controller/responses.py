@@ -0,0 +1,31 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+	orjson = None
+
+
+def _default(value: Any) -> Any:
+	if isinstance(value, (datetime, date)):
+		return value.isoformat()
+	raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+	"""JSON response for prebuilt dict payloads, encoded with orjson when installed.
+
+	Endpoints that return this directly skip FastAPI's response_model
+	validation, so the content must already match the declared model.
+	"""
+
+	def render(self, content: Any) -> bytes:
+		if orjson is not None:
+			return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+		return json.dumps(
+			content, ensure_ascii=False, separators=(",", ":"), default=_default
+		).encode("utf-8")
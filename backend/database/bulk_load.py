@@ -0,0 +1,108 @@
+import io
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+from sqlalchemy import Table, insert, text
+from sqlalchemy.engine import Connection
+
+from database.database import Base
+
+DEFAULT_CHUNK_SIZE = 5000
+# Stay well under PostgreSQL's 65535 bind-parameter limit per statement.
+MAX_BIND_PARAMS = 30000
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+	chunk: list[dict] = []
+	for row in rows:
+		chunk.append(row)
+		if len(chunk) >= size:
+			yield chunk
+			chunk = []
+	if chunk:
+		yield chunk
+
+
+def _copy_value(value) -> str:
+	if value is None:
+		return "\\N"
+	if isinstance(value, bool):
+		return "t" if value else "f"
+	if isinstance(value, (datetime, date)):
+		return value.isoformat()
+	return (
+		str(value)
+		.replace("\\", "\\\\")
+		.replace("\t", "\\t")
+		.replace("\n", "\\n")
+		.replace("\r", "\\r")
+	)
+
+
+def _copy_buffer(columns: list[str], chunk: list[dict]) -> io.StringIO:
+	buffer = io.StringIO()
+	for row in chunk:
+		buffer.write("\t".join(_copy_value(row.get(column)) for column in columns))
+		buffer.write("\n")
+	buffer.seek(0)
+	return buffer
+
+
+def _copy_chunk(connection: Connection, table: Table, columns: list[str], chunk: list[dict]) -> bool:
+	"""COPY ``chunk`` through the raw driver connection; False if the driver can't."""
+	driver_connection = connection.connection.driver_connection
+	column_list = ", ".join(f'"{column}"' for column in columns)
+	statement = f'COPY "{table.name}" ({column_list}) FROM STDIN'
+	buffer = _copy_buffer(columns, chunk)
+	with driver_connection.cursor() as cursor:
+		if hasattr(cursor, "copy_expert"):
+			# psycopg2
+			cursor.copy_expert(statement, buffer)
+			return True
+		if hasattr(cursor, "copy"):
+			# psycopg 3
+			with cursor.copy(statement) as copy:
+				copy.write(buffer.getvalue())
+			return True
+	return False
+
+
+def bulk_insert(
+	connection: Connection,
+	table: Table,
+	rows: Iterable[dict],
+	chunk_size: int = DEFAULT_CHUNK_SIZE,
+	use_copy: bool = True,
+) -> int:
+	"""Load ``rows`` into ``table`` in chunks and return the number of rows written.
+
+	PostgreSQL connections stream each chunk with COPY; other dialects, or
+	drivers without a COPY API, fall back to one multi-row INSERT per chunk.
+	Every row must carry the same keys; missing keys are loaded as NULL.
+	"""
+	use_copy = use_copy and connection.dialect.name == "postgresql"
+	total = 0
+	columns: list[str] | None = None
+	for chunk in _chunks(rows, chunk_size):
+		if columns is None:
+			columns = [column.name for column in table.columns if column.name in chunk[0]]
+		if not (use_copy and _copy_chunk(connection, table, columns, chunk)):
+			use_copy = False
+			rows_per_statement = max(1, MAX_BIND_PARAMS // len(columns))
+			for start in range(0, len(chunk), rows_per_statement):
+				connection.execute(insert(table).values(chunk[start:start + rows_per_statement]))
+		total += len(chunk)
+	return total
+
+
+def reset_sequences(connection: Connection) -> None:
+	"""Move every ``id`` sequence past rows that were loaded with explicit ids."""
+	for table in Base.metadata.sorted_tables:
+		if "id" not in table.columns:
+			continue
+		connection.execute(
+			text(
+				f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+				f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+			)
+		)
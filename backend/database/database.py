@@ -6,8 +6,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
 engine = create_engine(DATABASE_URL)
+# Without a replica, reads share the primary engine and pool.
+replica_engine = create_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -15,4 +18,10 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=replica_engine
+)
+
 Base = declarative_base()
@@ -1,4 +1,4 @@
-from database import SessionLocal
+from database.database import SessionLocal
 
 def get_db():
     db = SessionLocal()
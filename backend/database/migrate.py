@@ -1,4 +1,8 @@
+import logging
+from contextlib import contextmanager
+
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 
 from database.database import Base, engine
 from entity.assessment import AssessmentTable
@@ -16,72 +20,274 @@ from entity.user import UserTable
 from entity.company_submit import CompanySubmitTable
 from entity.company_assessment_result import CompanyAssessmentResultTable
 from entity.auditor_submit import AuditorSubmitTable
+from entity.company_score_snapshot import CompanyScoreSnapshotTable
+from entity.company_progress import CompanyProgressTable
+from entity.job import JobTable
+from entity.idempotency_key import IdempotencyKeyTable
+from entity.archive import ARCHIVE_TABLES
+from service.archival import reference_indexes
 
+# Partial indexes matching the hot lookups; every one of them filters on
+# delete_at IS NULL, so tombstoned rows stay out of the index entirely.
+HOT_INDEXES = [
+	("ix_companies_user_live", "companies", "user_id"),
+	("ix_auditors_user_live", "auditors", "user_id"),
+	("ix_users_username_live", "users", "username"),
+	("ix_pillars_key_live", "pillars", "key"),
+	("ix_assessments_pillar_live", "assessments", "pillar_id, id"),
+	("ix_evaluation_criteria_assessment_live", "evaluation_criteria", "assessment_id, id"),
+	("ix_company_assessments_company_round_assessment_live", "company_assessments", "company_id, assessment_round, assessment_id"),
+	("ix_evidences_company_assessment_live", "evidences", "company_assessment_id, created_at"),
+	("ix_auditor_scores_auditor_company_assessment_live", "auditor_scores", "auditor_id, company_assessment_id"),
+	("ix_company_submits_company_round_created_live", "company_submits", "company_id, assessment_round, created_at DESC"),
+	("ix_auditor_submits_auditor_company_round_live", "auditor_submits", "auditor_id, company_id, assessment_round"),
+	("ix_company_assessment_results_company_round_pillar_live", "company_assessment_results", "company_id, assessment_round, pillar_id"),
+]
 
-def migrate() -> None:
-	Base.metadata.create_all(bind=engine)
-	with engine.begin() as connection:
-		connection.execute(
-			text("ALTER TABLE pillars ADD COLUMN IF NOT EXISTS key VARCHAR(255)")
-		)
+# Replaced by the round-aware indexes above.
+SUPERSEDED_INDEXES = (
+	"ix_company_assessments_company_assessment_live",
+	"ix_company_submits_company_created_live",
+	"ix_auditor_submits_auditor_company_live",
+	"ix_company_assessment_results_company_pillar_live",
+)
+
+# One live answer per company, round and question (see create_draft_unique_index).
+DRAFT_UNIQUE_INDEX = "ux_company_assessments_company_round_assessment_live"
+
+# Tables whose rows belong to one assessment round (see companies.current_round).
+ROUND_TABLES = (
+	"company_assessments",
+	"evidences",
+	"auditor_scores",
+	"company_submits",
+	"auditor_submits",
+	"company_assessment_results",
+)
+
+
+def _mode(concurrently: bool) -> str:
+	return "CONCURRENTLY " if concurrently else ""
+
+
+@contextmanager
+def _optional_step(connection, concurrently: bool):
+	"""Scope for a step that may fail without aborting the migration.
+
+	In a transaction that is a savepoint. An autocommit connection (the
+	CONCURRENTLY build) has none; each statement stands alone there.
+	"""
+	if concurrently:
+		yield
+	else:
+		with connection.begin_nested():
+			yield
+
+
+def _drop_failed_index(connection, name: str, concurrently: bool) -> None:
+	# A failed CREATE INDEX CONCURRENTLY leaves an INVALID index that
+	# IF NOT EXISTS would then skip for good.
+	if concurrently:
+		connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def create_indexes(connection, concurrently: bool = False) -> None:
+	"""Create the partial index pack; CONCURRENTLY needs an autocommit connection."""
+	mode = _mode(concurrently)
+	for name, table, columns in HOT_INDEXES:
 		connection.execute(
 			text(
-				"""
-				DO $$
-				BEGIN
-				    IF EXISTS (
-				        SELECT 1
-				        FROM information_schema.columns
-				        WHERE table_name = 'pillars'
-				          AND column_name = 'assessment_id'
-				    ) THEN
-				        ALTER TABLE pillars ALTER COLUMN assessment_id DROP NOT NULL;
-				    END IF;
-				END $$;
-				"""
+				f"CREATE INDEX {mode}IF NOT EXISTS {name} ON {table} ({columns}) "
+				"WHERE delete_at IS NULL"
 			)
 		)
-		connection.execute(
-			text("ALTER TABLE assessments ADD COLUMN IF NOT EXISTS pillar_id INTEGER")
+
+
+def create_user_search_indexes(connection, concurrently: bool = False) -> None:
+	"""Indexes behind /api/admin/users/search.
+
+	Prefix search uses a text_pattern_ops index on lower(username); substring
+	search needs pg_trgm, which is skipped if the extension can't be created.
+	"""
+	mode = _mode(concurrently)
+	connection.execute(
+		text(
+			f"CREATE INDEX {mode}IF NOT EXISTS ix_users_username_lower_prefix_live "
+			"ON users (lower(username) text_pattern_ops) WHERE delete_at IS NULL"
 		)
-		connection.execute(
-			text(
-				"ALTER TABLE evaluation_criteria ADD COLUMN IF NOT EXISTS assessment_id INTEGER"
+	)
+	connection.execute(
+		text(f"CREATE INDEX {mode}IF NOT EXISTS ix_users_roleid_live ON users (roleid, id) WHERE delete_at IS NULL")
+	)
+	try:
+		with _optional_step(connection, concurrently):
+			connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+			connection.execute(
+				text(
+					f"CREATE INDEX {mode}IF NOT EXISTS ix_users_username_trgm_live "
+					"ON users USING gin (username gin_trgm_ops) WHERE delete_at IS NULL"
+				)
 			)
+	except DBAPIError:
+		_drop_failed_index(connection, "ix_users_username_trgm_live", concurrently)
+		logging.getLogger("hicm.db").warning(
+			"pg_trgm is not available; username substring search will scan users"
 		)
-		connection.execute(
-			text(
-				"ALTER TABLE evaluation_criteria ADD COLUMN IF NOT EXISTS point_id INTEGER"
+
+
+def create_draft_unique_index(connection, concurrently: bool = False) -> None:
+	"""One live answer per company, round and question.
+
+	Two first saves of the same question then conflict instead of inserting
+	duplicates. Skipped, with a warning, while older duplicates remain.
+	"""
+	try:
+		with _optional_step(connection, concurrently):
+			connection.execute(
+				text(
+					f"CREATE UNIQUE INDEX {_mode(concurrently)}IF NOT EXISTS {DRAFT_UNIQUE_INDEX} "
+					"ON company_assessments (company_id, assessment_round, assessment_id) "
+					"WHERE delete_at IS NULL"
+				)
 			)
+	except DBAPIError:
+		_drop_failed_index(connection, DRAFT_UNIQUE_INDEX, concurrently)
+		logging.getLogger("hicm.db").warning(
+			"company_assessments has duplicate live answers; draft inserts are not deduplicated"
 		)
+
+
+def create_archive_indexes(connection, concurrently: bool = False) -> None:
+	"""Indexes the archival job scans: dead rows by age, and every reference to an archivable row."""
+	mode = _mode(concurrently)
+	for name in ARCHIVE_TABLES:
 		connection.execute(
 			text(
-				"""
-				DO $$
-				BEGIN
-				    IF EXISTS (
-				        SELECT 1
-				        FROM information_schema.columns
-				        WHERE table_name = 'evaluation_criteria'
-				          AND column_name = 'pillar_id'
-				    ) THEN
-				        ALTER TABLE evaluation_criteria ALTER COLUMN pillar_id DROP NOT NULL;
-				    END IF;
-				END $$;
-				"""
+				f"CREATE INDEX {mode}IF NOT EXISTS ix_{name}_deleted ON {name} (delete_at) "
+				"WHERE delete_at IS NOT NULL"
 			)
 		)
+	for name, table, column in reference_indexes():
+		connection.execute(text(f"CREATE INDEX {mode}IF NOT EXISTS {name} ON {table} ({column})"))
+
+
+def create_all_indexes(connection, concurrently: bool = False) -> None:
+	"""Every index migrate() maintains, after dropping the ones they replace."""
+	mode = _mode(concurrently)
+	for name in SUPERSEDED_INDEXES:
+		connection.execute(text(f"DROP INDEX {mode}IF EXISTS {name}"))
+	create_indexes(connection, concurrently)
+	connection.execute(
+		text(
+			f"CREATE INDEX {mode}IF NOT EXISTS ix_jobs_queued_run_after ON jobs (run_after, id) "
+			"WHERE status = 'queued'"
+		)
+	)
+	create_user_search_indexes(connection, concurrently)
+	create_draft_unique_index(connection, concurrently)
+	create_archive_indexes(connection, concurrently)
+
+
+def add_columns(connection) -> None:
+	"""Columns that create_all can't add to tables that already exist."""
+	connection.execute(
+		text("ALTER TABLE pillars ADD COLUMN IF NOT EXISTS key VARCHAR(255)")
+	)
+	connection.execute(
+		text(
+			"""
+			DO $$
+			BEGIN
+			    IF EXISTS (
+			        SELECT 1
+			        FROM information_schema.columns
+			        WHERE table_name = 'pillars'
+			          AND column_name = 'assessment_id'
+			    ) THEN
+			        ALTER TABLE pillars ALTER COLUMN assessment_id DROP NOT NULL;
+			    END IF;
+			END $$;
+			"""
+		)
+	)
+	connection.execute(
+		text("ALTER TABLE assessments ADD COLUMN IF NOT EXISTS pillar_id INTEGER")
+	)
+	connection.execute(
+		text(
+			"ALTER TABLE evaluation_criteria ADD COLUMN IF NOT EXISTS assessment_id INTEGER"
+		)
+	)
+	connection.execute(
+		text(
+			"ALTER TABLE evaluation_criteria ADD COLUMN IF NOT EXISTS point_id INTEGER"
+		)
+	)
+	connection.execute(
+		text(
+			"""
+			DO $$
+			BEGIN
+			    IF EXISTS (
+			        SELECT 1
+			        FROM information_schema.columns
+			        WHERE table_name = 'evaluation_criteria'
+			          AND column_name = 'pillar_id'
+			    ) THEN
+			        ALTER TABLE evaluation_criteria ALTER COLUMN pillar_id DROP NOT NULL;
+			    END IF;
+			END $$;
+			"""
+		)
+	)
+	connection.execute(
+		text(
+			"ALTER TABLE evidences ADD COLUMN IF NOT EXISTS company_assessment_id INTEGER"
+		)
+	)
+	connection.execute(
+		text(
+			"ALTER TABLE company_submits ADD COLUMN IF NOT EXISTS status_id INTEGER"
+		)
+	)
+	connection.execute(
+		text("ALTER TABLE companies ADD COLUMN IF NOT EXISTS current_round INTEGER NOT NULL DEFAULT 1")
+	)
+	for table in ROUND_TABLES + tuple(f"{name}_archive" for name in ROUND_TABLES):
+		# A constant default makes this a catalog-only change on Postgres 11+.
 		connection.execute(
-			text(
-				"ALTER TABLE evidences ADD COLUMN IF NOT EXISTS company_assessment_id INTEGER"
-			)
+			text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS assessment_round INTEGER NOT NULL DEFAULT 1")
 		)
+	for table in ("company_assessments", "company_assessments_archive"):
 		connection.execute(
-			text(
-				"ALTER TABLE company_submits ADD COLUMN IF NOT EXISTS status_id INTEGER"
-			)
+			text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+		)
+	for table in ("evidences", "evidences_archive"):
+		connection.execute(
+			text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS storage_backend VARCHAR(20)")
+		)
+		connection.execute(
+			text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS optimized_at TIMESTAMP")
 		)
 
 
+def migrate() -> None:
+	Base.metadata.create_all(bind=engine)
+	with engine.begin() as connection:
+		add_columns(connection)
+		create_all_indexes(connection)
+
+
 if __name__ == "__main__":
+	import sys
+
+	if "--indexes-concurrently" in sys.argv:
+		# Build every index without blocking writes on a live database; the
+		# columns they cover go in first, and the IF NOT EXISTS in migrate()
+		# then skips them at startup.
+		Base.metadata.create_all(bind=engine)
+		with engine.begin() as connection:
+			add_columns(connection)
+		with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+			create_all_indexes(connection, concurrently=True)
 	migrate()
@@ -0,0 +1,50 @@
+import base64
+import json
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough to run.
+EXACT_COUNT_THRESHOLD = 1000
+
+
+def encode_cursor(values: list[Any]) -> str:
+	return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+	"""Decode a cursor from ``encode_cursor``; raises ValueError when malformed."""
+	try:
+		padding = "=" * (-len(cursor) % 4)
+		values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+	except (ValueError, TypeError) as error:
+		raise ValueError("Invalid cursor") from error
+	if not isinstance(values, list):
+		raise ValueError("Invalid cursor")
+	return values
+
+
+def planner_estimate(db: Session, statement: Select) -> int | None:
+	"""Row count the Postgres planner expects ``statement`` to return, or None elsewhere."""
+	connection = db.connection()
+	if connection.dialect.name != "postgresql":
+		return None
+	compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+	plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params).scalar()
+	document = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+	return int(document["Plan"]["Plan Rows"])
+
+
+def estimate_count(db: Session, statement: Select) -> tuple[int, bool]:
+	"""Total rows for ``statement`` as ``(count, is_estimate)``.
+
+	Large results use the planner's estimate instead of COUNT(*), which would
+	have to visit every matching row on each page load.
+	"""
+	estimate = planner_estimate(db, statement)
+	if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+		return estimate, True
+	exact = db.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar()
+	return int(exact or 0), False
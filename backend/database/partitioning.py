@@ -0,0 +1,206 @@
+"""Opt-in LIST partitioning of the per-round answer tables by ``assessment_round``.
+
+``company_assessments`` and ``evidences`` (plus ``auditor_scores``, which
+references answers and would otherwise pin every round in place) are
+rebuilt as partitioned tables with one ``<table>_r<n>`` partition per round
+and a ``<table>_default`` catch-all. Queries that filter on the open round
+are pruned to its partition, and a finished round can be detached and
+dumped or dropped without touching the others.
+
+Postgres requires the partition key in every unique constraint, so the
+primary keys become ``(id, assessment_round)`` and the foreign keys to
+``company_assessments`` become composite. ids still come from the original
+sequences, so the ORM keeps addressing rows by ``id``.
+
+Usage (from backend/, Postgres only; takes ACCESS EXCLUSIVE locks, run it in
+a maintenance window):
+
+	python -m database.partitioning --convert
+	python -m database.partitioning --detach-round 1
+"""
+
+import argparse
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database.database import Base
+from database.migrate import create_archive_indexes, create_draft_unique_index, create_indexes
+
+# Referenced tables first; each is converted before the tables that point at it.
+PARTITIONED_TABLES = ("company_assessments", "evidences", "auditor_scores")
+ROUND_REFERENCES = (
+	("evidences", "company_assessment_id", "company_assessments"),
+	("auditor_scores", "company_assessment_id", "company_assessments"),
+)
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+	if connection.dialect.name != "postgresql":
+		return False
+	return bool(
+		connection.execute(
+			text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+			{"table": table},
+		).scalar()
+	)
+
+
+def partition_name(table: str, assessment_round: int) -> str:
+	return f"{table}_r{int(assessment_round)}"
+
+
+def ensure_round_partitions(connection: Connection, assessment_round: int) -> list[str]:
+	"""Create the partitions for ``assessment_round`` on every partitioned table; no-op otherwise."""
+	created = []
+	for table in PARTITIONED_TABLES:
+		if not is_partitioned(connection, table):
+			continue
+		name = partition_name(table, assessment_round)
+		connection.execute(
+			text(
+				f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+				f"FOR VALUES IN ({int(assessment_round)})"
+			)
+		)
+		created.append(name)
+	return created
+
+
+def _foreign_key_name(table: str, column: str) -> str:
+	return f"fk_{table}_{column}"
+
+
+def _drop_foreign_keys_to(connection: Connection, referenced: str) -> None:
+	rows = connection.execute(
+		text(
+			"SELECT conrelid::regclass::text, conname FROM pg_constraint "
+			"WHERE contype = 'f' AND confrelid = to_regclass(:table) AND conparentid = 0"
+		),
+		{"table": referenced},
+	).all()
+	for table, name in rows:
+		connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS "{name}"'))
+
+
+def convert_table(connection: Connection, table: str) -> list[int]:
+	"""Rebuild ``table`` as a LIST-partitioned copy; returns the rounds given partitions."""
+	legacy = f"{table}_unpartitioned"
+	connection.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+	_drop_foreign_keys_to(connection, table)
+	connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+	connection.execute(
+		text(
+			f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+			f"PRIMARY KEY (id, assessment_round)) PARTITION BY LIST (assessment_round)"
+		)
+	)
+	rounds = [
+		int(value)
+		for value in connection.execute(
+			text(f"SELECT DISTINCT assessment_round FROM {legacy} ORDER BY 1")
+		).scalars()
+	]
+	open_round = connection.execute(text("SELECT coalesce(max(current_round), 1) FROM companies")).scalar()
+	next_round = max(rounds + [int(open_round)]) + 1
+	for assessment_round in sorted(set(rounds) | {1, int(open_round), next_round}):
+		connection.execute(
+			text(
+				f"CREATE TABLE {partition_name(table, assessment_round)} PARTITION OF {table} "
+				f"FOR VALUES IN ({assessment_round})"
+			)
+		)
+	connection.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+	connection.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}"))
+	# Keep the id sequence alive when the legacy table is dropped.
+	connection.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id"))
+	connection.execute(text(f"DROP TABLE {legacy}"))
+
+	# Foreign keys to the unpartitioned tables are recreated as they were.
+	for foreign_key in Base.metadata.tables[table].foreign_keys:
+		target = foreign_key.column.table.name
+		if target in PARTITIONED_TABLES:
+			continue
+		column = foreign_key.parent.name
+		connection.execute(
+			text(
+				f"ALTER TABLE {table} ADD CONSTRAINT {_foreign_key_name(table, column)} "
+				f"FOREIGN KEY ({column}) REFERENCES {target} (id)"
+			)
+		)
+	return rounds
+
+
+def add_round_references(connection: Connection) -> None:
+	for table, column, target in ROUND_REFERENCES:
+		connection.execute(
+			text(
+				f"ALTER TABLE {table} ADD CONSTRAINT {_foreign_key_name(table, column)} "
+				f"FOREIGN KEY ({column}, assessment_round) REFERENCES {target} (id, assessment_round)"
+			)
+		)
+
+
+def convert(connection: Connection) -> dict[str, list[int]]:
+	"""Partition every table in PARTITIONED_TABLES that isn't already, in one transaction."""
+	converted = {}
+	for table in PARTITIONED_TABLES:
+		if not is_partitioned(connection, table):
+			converted[table] = convert_table(connection, table)
+	if converted:
+		add_round_references(connection)
+		# Indexes defined on the parent are created on every partition.
+		create_indexes(connection)
+		create_draft_unique_index(connection)
+		create_archive_indexes(connection)
+	return converted
+
+
+def detach_round(connection: Connection, assessment_round: int) -> list[str]:
+	"""Detach one round's partitions, referencing tables first; returns the detached tables.
+
+	The detached tables keep their rows and can be dumped and dropped.
+	"""
+	detached = []
+	for table in reversed(PARTITIONED_TABLES):
+		name = partition_name(table, assessment_round)
+		if not is_partitioned(connection, table) or connection.execute(
+			text("SELECT to_regclass(:name)"), {"name": name}
+		).scalar() is None:
+			continue
+		connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+		for referencing, column, target in ROUND_REFERENCES:
+			if referencing == table:
+				connection.execute(
+					text(f"ALTER TABLE {name} DROP CONSTRAINT IF EXISTS {_foreign_key_name(table, column)}")
+				)
+		detached.append(name)
+	return detached
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	group = parser.add_mutually_exclusive_group(required=True)
+	group.add_argument("--convert", action="store_true")
+	group.add_argument("--detach-round", type=int)
+	args = parser.parse_args()
+
+	from database.database import engine
+
+	if engine.dialect.name != "postgresql":
+		parser.error("Partitioning needs Postgres")
+	with engine.begin() as connection:
+		if args.convert:
+			for table, rounds in convert(connection).items():
+				print(f"{table}: partitioned, rounds {rounds or [1]}")
+		else:
+			for name in detach_round(connection, args.detach_round):
+				print(f"Detached {name}")
+	if args.convert:
+		with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+			for table in PARTITIONED_TABLES:
+				connection.execute(text(f"ANALYZE {table}"))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements slower than this are logged with an EXPLAIN plan; 0 disables.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1") not in ("0", "false", "False")
+# The same statement is explained at most once per interval.
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+EXPLAINABLE_PREFIXES = ("select", "with", "update", "delete", "insert")
+
+slow_query_logger = logging.getLogger("hicm.db.slow")
+
+
+class QueryStats:
+	def __init__(self, route: str | None = None) -> None:
+		self.route = route
+		self.count = 0
+		self.total_seconds = 0.0
+
+	@property
+	def total_ms(self) -> float:
+		return self.total_seconds * 1000
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+	return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+	conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+	elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+	stats = _current_stats.get()
+	if stats is not None:
+		stats.count += 1
+		stats.total_seconds += elapsed
+	if (
+		SLOW_QUERY_MS
+		and elapsed * 1000 >= SLOW_QUERY_MS
+		and conn.get_execution_options().get("log_slow_queries", True)
+	):
+		_log_slow_query(conn.engine, statement, parameters, executemany, elapsed, stats)
+
+
+def redact_parameters(parameters: Any) -> Any:
+	"""Keep the shape of bound parameters but hide text and binary values."""
+	if isinstance(parameters, dict):
+		return {key: redact_parameters(value) for key, value in parameters.items()}
+	if isinstance(parameters, (list, tuple)):
+		return [redact_parameters(value) for value in parameters]
+	if isinstance(parameters, str):
+		return f"<str len={len(parameters)}>"
+	if isinstance(parameters, (bytes, bytearray, memoryview)):
+		return f"<bytes len={len(parameters)}>"
+	if isinstance(parameters, (datetime, date)):
+		return parameters.isoformat()
+	if parameters is None or isinstance(parameters, (bool, int, float)):
+		return parameters
+	return f"<{type(parameters).__name__}>"
+
+
+class _ExplainScheduler:
+	"""Run EXPLAIN for slow statements on a background thread.
+
+	Plans are captured on a separate pooled connection so the request never
+	waits for them, and each distinct statement is explained at most once
+	per SLOW_QUERY_EXPLAIN_INTERVAL.
+	"""
+
+	def __init__(self) -> None:
+		self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+		self._lock = threading.Lock()
+		self._last_explained: dict[str, float] = {}
+		self._pending = threading.BoundedSemaphore(16)
+
+	def should_explain(self, fingerprint: str) -> bool:
+		now = time.monotonic()
+		with self._lock:
+			last = self._last_explained.get(fingerprint)
+			if last is not None and now - last < SLOW_QUERY_EXPLAIN_INTERVAL:
+				return False
+			self._last_explained[fingerprint] = now
+			if len(self._last_explained) > 1000:
+				self._last_explained.clear()
+			return True
+
+	def submit(self, engine: Engine, fingerprint: str, statement: str, parameters: Any) -> None:
+		if not self._pending.acquire(blocking=False):
+			return
+		future = self._executor.submit(self._explain, engine, fingerprint, statement, parameters)
+		future.add_done_callback(lambda _: self._pending.release())
+
+	@staticmethod
+	def _explain(engine: Engine, fingerprint: str, statement: str, parameters: Any) -> None:
+		try:
+			with engine.connect().execution_options(log_slow_queries=False) as connection:
+				rows = connection.exec_driver_sql(
+					f"EXPLAIN (ANALYZE off) {statement}", parameters or ()
+				).all()
+				connection.rollback()
+			plan = "\n".join(row[0] for row in rows)
+			slow_query_logger.warning(
+				json.dumps({"event": "slow_query_plan", "fingerprint": fingerprint, "plan": plan})
+			)
+		except Exception as error:
+			slow_query_logger.warning(
+				json.dumps({"event": "slow_query_plan_failed", "fingerprint": fingerprint, "error": str(error)})
+			)
+
+
+_explain_scheduler = _ExplainScheduler()
+
+
+def _log_slow_query(
+	engine: Engine,
+	statement: str,
+	parameters: Any,
+	executemany: bool,
+	elapsed: float,
+	stats: QueryStats | None,
+) -> None:
+	fingerprint = hashlib.sha1(statement.encode("utf-8")).hexdigest()[:12]
+	slow_query_logger.warning(
+		json.dumps(
+			{
+				"event": "slow_query",
+				"fingerprint": fingerprint,
+				"duration_ms": round(elapsed * 1000, 2),
+				"route": stats.route if stats else None,
+				"statement": statement,
+				"parameters": redact_parameters(parameters),
+			}
+		)
+	)
+	if (
+		SLOW_QUERY_EXPLAIN
+		and not executemany
+		and engine.dialect.name == "postgresql"
+		and statement.lstrip().lower().startswith(EXPLAINABLE_PREFIXES)
+		and _explain_scheduler.should_explain(fingerprint)
+	):
+		_explain_scheduler.submit(engine, fingerprint, statement, parameters)
+
+
+def install(engine: Engine) -> None:
+	"""Attach the statement counters to ``engine``; safe to call more than once."""
+	if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+		event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+		event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(route: str | None = None) -> Iterator[QueryStats]:
+	"""Collect statement count and DB time for everything run inside the block.
+
+	Sync endpoints run in a worker thread with a copy of the caller's
+	context, so the stats object set here is the one they update.
+	"""
+	stats = QueryStats(route)
+	token = _current_stats.set(stats)
+	try:
+		yield stats
+	finally:
+		_current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+	"""Fail with AssertionError if the block issues more than ``max_queries`` statements.
+
+	For code called directly in the current thread::
+
+		with query_budget(8):
+			get_submission_detail(company_id, db=db, user=user)
+
+	Requests sent through TestClient run in another thread; check those
+	with ``assert_query_budget(response, 8)`` instead.
+	"""
+	with track_queries() as stats:
+		yield stats
+	if stats.count > max_queries:
+		raise AssertionError(
+			f"Query budget exceeded: {stats.count} statements (budget {max_queries})"
+		)
+
+
+def assert_query_budget(response, max_queries: int) -> None:
+	"""Check the ``X-DB-Queries`` header set by QueryStatsMiddleware."""
+	count = int(response.headers["x-db-queries"])
+	if count > max_queries:
+		raise AssertionError(
+			f"Query budget exceeded for {response.request.method} {response.request.url.path}: "
+			f"{count} statements (budget {max_queries})"
+		)
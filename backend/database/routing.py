@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from database.database import ReadSessionLocal, SessionLocal, engine, replica_engine
+
+# How long a client keeps reading from the primary after one of its writes;
+# should comfortably exceed the replica's replay lag.
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+STICKY_COOKIE = "hicm_primary_until"
+WRITE_PREFIXES = ("insert", "update", "delete")
+
+
+class RequestRouting:
+	def __init__(self, client_key: str | None, sticky_until: float = 0.0) -> None:
+		self.client_key = client_key
+		self.sticky_until = sticky_until
+		self.wrote = False
+		self.used_replica = False
+
+
+_current_routing: ContextVar[RequestRouting | None] = ContextVar("request_routing", default=None)
+_recent_writes: dict[str, float] = {}
+_recent_writes_lock = threading.Lock()
+
+
+def replica_enabled() -> bool:
+	return replica_engine is not engine
+
+
+def current_routing() -> RequestRouting | None:
+	return _current_routing.get()
+
+
+def begin_request(routing: RequestRouting):
+	return _current_routing.set(routing)
+
+
+def end_request(token) -> None:
+	_current_routing.reset(token)
+
+
+def _record_write(conn, cursor, statement, parameters, context, executemany) -> None:
+	routing = _current_routing.get()
+	if routing is None or routing.wrote or not statement.lstrip().lower().startswith(WRITE_PREFIXES):
+		return
+	routing.wrote = True
+	if routing.client_key is None:
+		return
+	expires = time.time() + REPLICA_STICKY_SECONDS
+	with _recent_writes_lock:
+		_recent_writes[routing.client_key] = expires
+		if len(_recent_writes) > 10000:
+			now = time.time()
+			for key in [key for key, until in _recent_writes.items() if until < now]:
+				del _recent_writes[key]
+
+
+if replica_enabled():
+	event.listen(engine, "before_cursor_execute", _record_write)
+
+
+def should_read_from_primary() -> bool:
+	"""True while the current client is inside its read-your-writes window."""
+	if not replica_enabled():
+		return True
+	routing = _current_routing.get()
+	if routing is None:
+		return False
+	now = time.time()
+	if routing.sticky_until > now:
+		return True
+	if routing.client_key is None:
+		return False
+	with _recent_writes_lock:
+		return _recent_writes.get(routing.client_key, 0.0) > now
+
+
+def get_read_db():
+	"""Session for read-only endpoints: the replica, unless the client just wrote."""
+	use_primary = should_read_from_primary()
+	db = SessionLocal() if use_primary else ReadSessionLocal()
+	routing = _current_routing.get()
+	if routing is not None and not use_primary:
+		routing.used_replica = True
+	try:
+		yield db
+	finally:
+		db.close()
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Table
+
+from database.database import Base
+from entity.assessment import AssessmentTable
+from entity.auditor_score import AuditorScoreTable
+from entity.auditor_submit import AuditorSubmitTable
+from entity.company_assessment import CompanyAssessmentTable
+from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.company_submit import CompanySubmitTable
+from entity.evaluation_criteria import EvaluationCriteriaTable
+from entity.evidence import EvidenceTable
+
+# Tables whose soft-deleted rows are moved to a "<name>_archive" copy.
+ARCHIVED_ENTITIES = (
+	AssessmentTable,
+	EvaluationCriteriaTable,
+	CompanyAssessmentTable,
+	AuditorScoreTable,
+	EvidenceTable,
+	CompanySubmitTable,
+	AuditorSubmitTable,
+	CompanyAssessmentResultTable,
+)
+
+
+def _archive_table(source: Table) -> Table:
+	"""Same columns as ``source`` without foreign keys, plus ``archived_at``."""
+	columns = [
+		Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable, autoincrement=False)
+		for column in source.columns
+	]
+	name = f"{source.name}_archive"
+	return Table(
+		name,
+		Base.metadata,
+		*columns,
+		Column("archived_at", DateTime, default=datetime.utcnow, nullable=False),
+		Index(f"ix_{name}_archived_at", "archived_at"),
+	)
+
+
+ARCHIVE_TABLES: dict[str, Table] = {
+	entity.__tablename__: _archive_table(entity.__table__) for entity in ARCHIVED_ENTITIES
+}
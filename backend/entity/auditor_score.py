@@ -15,6 +15,7 @@ class AuditorScoreTable(Base):
         Integer, ForeignKey("company_assessments.id"), nullable=False
     )
     evaluation_criteria_id = Column(Integer, ForeignKey("evaluation_criteria.id"), nullable=False)
+    assessment_round = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     delete_at = Column(DateTime, nullable=True)
@@ -25,6 +26,7 @@ class AuditorScore(BaseModel):
     auditor_id: int
     company_assessment_id: int
     evaluation_criteria_id: int
+    assessment_round: int = 1
     created_at: datetime
     updated_at: datetime
     delete_at: datetime | None = None
@@ -19,6 +19,8 @@ class CompanyTable(Base):
     job_position = Column(String(255), nullable=True)
     date_assessment = Column(DateTime, nullable=True)
     round_assessment = Column(String(255), nullable=True)
+    # Round whose answers are open; earlier rounds are kept, keyed by assessment_round.
+    current_round = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     delete_at = Column(DateTime, nullable=True)
@@ -35,6 +37,7 @@ class Company(BaseModel):
     job_position: str | None = None
     date_assessment: datetime | None = None
     round_assessment: str | None = None
+    current_round: int = 1
     created_at: datetime
     updated_at: datetime
     delete_at: datetime | None = None
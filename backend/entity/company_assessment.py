@@ -15,6 +15,9 @@ class CompanyAssessmentTable(Base):
     performance_results = Column(String(1000), nullable=True)
     evaluation_criteria_id = Column(Integer, ForeignKey("evaluation_criteria.id"), nullable=True)
     status_id = Column(Integer, ForeignKey("statuses.id"), nullable=True)
+    assessment_round = Column(Integer, nullable=False, default=1, server_default="1")
+    # Bumped by every draft save; auto-save only updates the version the client last saw.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     delete_at = Column(DateTime, nullable=True)
@@ -27,6 +30,8 @@ class CompanyAssessment(BaseModel):
     performance_results: str | None = None
     evaluation_criteria_id: int | None = None
     status_id: int | None = None
+    assessment_round: int = 1
+    version: int = 1
     created_at: datetime
     updated_at: datetime
     delete_at: datetime | None = None
@@ -13,6 +13,7 @@ class CompanyAssessmentResultTable(Base):
 	company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
 	pillar_id = Column(Integer, ForeignKey("pillars.id"), nullable=False)
 	score = Column(Float, nullable=True)
+	assessment_round = Column(Integer, nullable=False, default=1, server_default="1")
 	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 	updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 	delete_at = Column(DateTime, nullable=True)
@@ -23,6 +24,7 @@ class CompanyAssessmentResult(BaseModel):
 	company_id: int
 	pillar_id: int
 	score: float | None = None
+	assessment_round: int = 1
 	created_at: datetime
 	updated_at: datetime
 	delete_at: datetime | None = None
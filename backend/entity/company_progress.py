@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer
+
+from database.database import Base
+
+
+class CompanyProgressTable(Base):
+	"""One row per company with answer counts for its open round.
+
+	Kept in step with auto-save, submit and questionnaire changes so the
+	status endpoints read this row instead of counting answers.
+	"""
+
+	__tablename__ = "company_progress"
+
+	id = Column(Integer, primary_key=True, index=True)
+	company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, unique=True)
+	assessment_round = Column(Integer, nullable=False, default=1)
+	answered = Column(Integer, nullable=False, default=0)
+	# {pillar_id: answered} and {pillar_id: live questions}; JSON keys are strings.
+	answered_by_pillar = Column(JSON, nullable=False, default=dict)
+	total_questions = Column(Integer, nullable=False, default=0)
+	total_by_pillar = Column(JSON, nullable=False, default=dict)
+	submitted_at = Column(DateTime, nullable=True)
+	updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CompanyProgress(BaseModel):
+	id: int
+	company_id: int
+	assessment_round: int
+	answered: int
+	answered_by_pillar: dict[str, int]
+	total_questions: int
+	total_by_pillar: dict[str, int]
+	submitted_at: datetime | None = None
+	updated_at: datetime
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String
+
+from database.database import Base
+
+
+class CompanyScoreSnapshotTable(Base):
+	"""One row per company with its latest scores, kept for cross-company analytics."""
+
+	__tablename__ = "company_score_snapshots"
+
+	id = Column(Integer, primary_key=True, index=True)
+	company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, unique=True)
+	type_company = Column(String(255), nullable=True)
+	employee_band = Column(String(50), nullable=True)
+	round_assessment = Column(String(255), nullable=True)
+	overall_score = Column(Float, nullable=False, default=0.0)
+	max_score = Column(Float, nullable=False, default=0.0)
+	star_count = Column(Integer, nullable=False, default=0)
+	pillar_scores = Column(JSON, nullable=False, default=dict)
+	submitted_at = Column(DateTime, nullable=True)
+	refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class CompanyScoreSnapshot(BaseModel):
+	id: int
+	company_id: int
+	type_company: str | None = None
+	employee_band: str | None = None
+	round_assessment: str | None = None
+	overall_score: float
+	max_score: float
+	star_count: int
+	pillar_scores: dict[str, float]
+	submitted_at: datetime | None = None
+	refreshed_at: datetime
@@ -12,6 +12,7 @@ class CompanySubmitTable(Base):
 	id = Column(Integer, primary_key=True, index=True)
 	company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
 	status_id = Column(Integer, ForeignKey("statuses.id"), nullable=False)
+	assessment_round = Column(Integer, nullable=False, default=1, server_default="1")
 	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 	updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 	delete_at = Column(DateTime, nullable=True)
@@ -21,6 +22,7 @@ class CompanySubmit(BaseModel):
 	id: int
 	company_id: int
 	status_id: int
+	assessment_round: int = 1
 	created_at: datetime
 	updated_at: datetime
 	delete_at: datetime | None = None
@@ -14,7 +14,13 @@ class EvidenceTable(Base):
         Integer, ForeignKey("company_assessments.id"), nullable=False
     )
     url = Column(String(500), nullable=True)
+    # Storage key (see service.storage); older rows hold an absolute local path.
     file_path = Column(String(500), nullable=True)
+    # Backend holding file_path; null for files written before backends existed (local).
+    storage_backend = Column(String(20), nullable=True)
+    # Set once the optimize_evidence job has processed the file (see service.evidence_ingest).
+    optimized_at = Column(DateTime, nullable=True)
+    assessment_round = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     delete_at = Column(DateTime, nullable=True)
@@ -25,6 +31,9 @@ class Evidence(BaseModel):
     company_assessment_id: int
     url: str | None = None
     file_path: str | None = None
+    storage_backend: str | None = None
+    optimized_at: datetime | None = None
+    assessment_round: int = 1
     created_at: datetime
     updated_at: datetime
     delete_at: datetime | None = None
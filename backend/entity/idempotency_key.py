@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer, LargeBinary, String, UniqueConstraint
+
+from database.database import Base
+
+
+class IdempotencyKeyTable(Base):
+	"""The stored outcome of one ``Idempotency-Key`` per user.
+
+	A row with a null ``status_code`` is a claim: the first request is still
+	running. Rows expire after ``expires_at`` and are purged by the
+	``purge_idempotency_keys`` job.
+	"""
+
+	__tablename__ = "idempotency_keys"
+	__table_args__ = (UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),)
+
+	id = Column(Integer, primary_key=True, index=True)
+	user_id = Column(Integer, nullable=False)
+	key = Column(String(255), nullable=False)
+	method = Column(String(10), nullable=False)
+	path = Column(String(1024), nullable=False)
+	# sha256 of method, path, query string and body; null until the request finishes.
+	fingerprint = Column(String(64), nullable=True)
+	status_code = Column(Integer, nullable=True)
+	response_headers = Column(JSON, nullable=True)
+	response_body = Column(LargeBinary, nullable=True)
+	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	expires_at = Column(DateTime, nullable=False, index=True)
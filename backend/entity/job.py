@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Column, DateTime, Integer, String, Text
+
+from database.database import Base
+
+
+class JobTable(Base):
+	__tablename__ = "jobs"
+
+	id = Column(Integer, primary_key=True, index=True)
+	kind = Column(String(100), nullable=False)
+	payload = Column(JSON, nullable=False, default=dict)
+	# queued -> running -> succeeded | failed; failed attempts below max_attempts go back to queued.
+	status = Column(String(20), nullable=False, default="queued")
+	attempts = Column(Integer, nullable=False, default=0)
+	max_attempts = Column(Integer, nullable=False, default=3)
+	run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+	locked_at = Column(DateTime, nullable=True)
+	locked_by = Column(String(255), nullable=True)
+	last_error = Column(Text, nullable=True)
+	result = Column(JSON, nullable=True)
+	created_by = Column(Integer, nullable=True)
+	created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+	updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+	finished_at = Column(DateTime, nullable=True)
+
+
+class Job(BaseModel):
+	id: int
+	kind: str
+	payload: dict[str, Any]
+	status: str
+	attempts: int
+	max_attempts: int
+	run_after: datetime
+	locked_at: datetime | None = None
+	locked_by: str | None = None
+	last_error: str | None = None
+	result: Any = None
+	created_by: int | None = None
+	created_at: datetime
+	updated_at: datetime
+	finished_at: datetime | None = None
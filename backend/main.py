@@ -1,27 +1,55 @@
 from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pathlib import Path
 from sqlalchemy import text
 
 from auth.login import router as auth_router
 from controller.admin.usermanagement_controller import router as admin_router
 from controller.admin.aessessment_controller import router as assessment_router
+from controller.admin.analytics_controller import router as analytics_router
+from controller.admin.job_controller import router as job_router
+from controller.admin.export_controller import router as export_router
+from controller.admin.archive_controller import router as archive_router
+from controller.admin.round_controller import router as round_router
 from controller.company.aessesment_controller import router as company_assessment_router
 from controller.company.file_assessment_controller import router as company_file_router
 from controller.audit.audit_controller import router as audit_router
 from controller.audit.audit_viwe_assessment import router as audit_view_router
 from controller.audit.audit_score_controller import router as audit_score_router
-from database.database import engine
+from controller.audit.certificate_controller import router as certificate_router
+from database.database import engine, replica_engine
 from database.migrate import migrate
+from database import query_stats
+from midlewere.compression import CompressionMiddleware
+from midlewere.idempotency import IdempotencyMiddleware
+from midlewere.metrics import MetricsMiddleware, register_pool_gauges, registry
+from midlewere.query_stats import QueryStatsMiddleware
+from midlewere.read_routing import ReadRoutingMiddleware
+from service import jobs, provisioning, storage, submission_events
 
 app = FastAPI()
+jobs.load_handlers()
+query_stats.install(engine)
+register_pool_gauges(engine)
+if replica_engine is not engine:
+    query_stats.install(replica_engine)
+    register_pool_gauges(replica_engine, name="replica")
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     migrate()
+    submission_events.start_listener()
 
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    submission_events.stop_listener()
+    provisioning.shutdown_hash_pool()
+
+# Innermost, so replayed responses still get CORS headers, compression and metrics.
+app.add_middleware(IdempotencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     # allow_origins=["http://localhost:3000"],  # Next.js
@@ -29,20 +57,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time", "X-DB-Session", "Idempotent-Replayed"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ReadRoutingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(auth_router, prefix="/api")
 app.include_router(admin_router)
 app.include_router(assessment_router)
+app.include_router(analytics_router)
+app.include_router(job_router)
+app.include_router(export_router)
+app.include_router(archive_router)
+app.include_router(round_router)
 app.include_router(company_assessment_router)
 app.include_router(company_file_router)
 app.include_router(audit_router)
 app.include_router(audit_view_router)
 app.include_router(audit_score_router)
+app.include_router(certificate_router)
 
-uploads_dir = Path(__file__).resolve().parents[1] / "uploads"
-uploads_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
+# Files kept by the local storage backend (STORAGE_BACKEND=local).
+storage.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+app.mount("/uploads", StaticFiles(directory=str(storage.UPLOAD_DIR)), name="uploads")
 
 @app.get("/")
 def root():
@@ -59,6 +98,11 @@ def health():
         return {"status": "error", "database": "disconnected", "detail": str(error)}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/favicon.ico")
 def favicon():
     return Response(status_code=204)
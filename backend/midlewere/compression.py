@@ -0,0 +1,154 @@
+import gzip
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+	import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+	brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSIBLE_TYPES = (
+	"application/json",
+	"application/javascript",
+	"application/xml",
+	"text/csv",
+	"text/html",
+	"text/plain",
+	"text/xml",
+	"image/svg+xml",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+	"""Pick ``br`` or ``gzip`` from an Accept-Encoding header, honouring q-values."""
+	offered: dict[str, float] = {}
+	for part in accept_encoding.split(","):
+		token, _, params = part.strip().partition(";")
+		quality = 1.0
+		params = params.strip()
+		if params.startswith("q="):
+			try:
+				quality = float(params[2:])
+			except ValueError:
+				quality = 0.0
+		if token:
+			offered[token.strip().lower()] = quality
+
+	candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+	best, best_quality = None, 0.0
+	for encoding in candidates:
+		quality = offered.get(encoding, offered.get("*", 0.0))
+		if quality > best_quality:
+			best, best_quality = encoding, quality
+	return best
+
+
+class _StreamCompressor:
+	def __init__(self, encoding: str) -> None:
+		self.encoding = encoding
+		if encoding == "br":
+			self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+		else:
+			self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+	def compress(self, data: bytes) -> bytes:
+		if self.encoding == "br":
+			return self._compressor.process(data) + self._compressor.flush()
+		return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+	def finish(self) -> bytes:
+		return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+
+def compress_body(encoding: str, body: bytes) -> bytes:
+	if encoding == "br":
+		return brotli.compress(body, quality=BROTLI_QUALITY)
+	return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+	"""Compress text and JSON responses with brotli (if installed) or gzip.
+
+	Complete bodies under COMPRESSION_MIN_BYTES are sent as-is. Streamed
+	bodies are compressed chunk by chunk, except server-sent events, which
+	must reach the client unbuffered.
+	"""
+
+	def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES) -> None:
+		self.app = app
+		self.minimum_size = minimum_size
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+		if encoding is None:
+			await self.app(scope, receive, send)
+			return
+
+		start_message: Message | None = None
+		compressor: _StreamCompressor | None = None
+		passthrough = False
+
+		async def send_compressed(message: Message) -> None:
+			nonlocal start_message, compressor, passthrough
+			if message["type"] == "http.response.start":
+				headers = Headers(raw=message.get("headers", []))
+				content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+				passthrough = (
+					"content-encoding" in headers
+					or content_type not in COMPRESSIBLE_TYPES
+				)
+				if passthrough:
+					await send(message)
+				else:
+					start_message = message
+				return
+
+			if message["type"] != "http.response.body" or passthrough:
+				await send(message)
+				return
+
+			body = message.get("body", b"")
+			more_body = message.get("more_body", False)
+
+			if start_message is not None and compressor is None:
+				if not more_body:
+					# Whole body in one message: compress only when it pays off.
+					if len(body) >= self.minimum_size:
+						body = compress_body(encoding, body)
+						headers = MutableHeaders(raw=start_message["headers"])
+						headers["content-encoding"] = encoding
+						headers["content-length"] = str(len(body))
+						headers.add_vary_header("Accept-Encoding")
+					await send(start_message)
+					start_message = None
+					await send({"type": "http.response.body", "body": body})
+					return
+
+				compressor = _StreamCompressor(encoding)
+				headers = MutableHeaders(raw=start_message["headers"])
+				headers["content-encoding"] = encoding
+				headers.add_vary_header("Accept-Encoding")
+				del headers["content-length"]
+				await send(start_message)
+				start_message = None
+
+			if compressor is None:
+				await send(message)
+				return
+
+			chunk = compressor.compress(body) if body else b""
+			if not more_body:
+				chunk += compressor.finish()
+			await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+		await self.app(scope, receive, send_compressed)
@@ -0,0 +1,197 @@
+import hashlib
+import json
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth.auth import decode_access_token
+from service import idempotency
+
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+MAX_KEY_LENGTH = 255
+
+
+def _user_id(headers: Headers) -> int | None:
+	scheme, _, token = headers.get("authorization", "").partition(" ")
+	if scheme.lower() != "bearer" or not token:
+		return None
+	payload = decode_access_token(token.strip())
+	try:
+		return int(payload["sub"]) if payload else None
+	except (KeyError, TypeError, ValueError):
+		return None
+
+
+class RequestFingerprint:
+	"""sha256 of method, path, query string and body, fed as the body streams in.
+
+	Multipart boundaries are random per send, so they are left out of the
+	hash; a retried upload of the same files matches its first attempt.
+	"""
+
+	def __init__(self, scope: Scope, headers: Headers) -> None:
+		self.digest = hashlib.sha256()
+		self.digest.update(scope["method"].encode("latin-1") + b"\n")
+		self.digest.update(scope["path"].encode("utf-8") + b"\n")
+		self.digest.update(scope.get("query_string", b"") + b"\n")
+		content_type, _, params = headers.get("content-type", "").partition(";")
+		self.boundary = b""
+		if content_type.strip().lower() == "multipart/form-data":
+			for param in params.split(";"):
+				name, _, value = param.strip().partition("=")
+				if name.lower() == "boundary" and value:
+					self.boundary = value.strip('"').encode("latin-1")
+		self.pending = b""
+
+	def update(self, chunk: bytes) -> None:
+		if not self.boundary:
+			self.digest.update(chunk)
+			return
+		# Hold back a possible partial boundary until the next chunk arrives.
+		data = (self.pending + chunk).replace(self.boundary, b"")
+		keep = len(self.boundary) - 1
+		self.digest.update(data[: len(data) - keep] if len(data) > keep else b"")
+		self.pending = data[len(data) - keep :] if len(data) > keep else data
+
+	def hexdigest(self) -> str:
+		self.digest.update(self.pending)
+		self.pending = b""
+		return self.digest.hexdigest()
+
+
+async def _send_json(send: Send, status_code: int, detail: str, extra_headers: list | None = None) -> None:
+	body = json.dumps({"detail": detail}).encode("utf-8")
+	headers = [
+		(b"content-type", b"application/json"),
+		(b"content-length", str(len(body)).encode("latin-1")),
+	]
+	await send({"type": "http.response.start", "status": status_code, "headers": headers + (extra_headers or [])})
+	await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+	"""Replay the stored response for retried writes that carry ``Idempotency-Key``.
+
+	Only authenticated POST/PUT/PATCH/DELETE requests take part; keys are
+	scoped to the token's user. The request body is hashed as it streams to
+	the endpoint, so uploads are not buffered. A reused key with a different
+	request gets 422, and a retry that arrives while the first request is
+	still running gets 409. 5xx responses are not stored.
+	"""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+			await self.app(scope, receive, send)
+			return
+		headers = Headers(scope=scope)
+		key = headers.get("idempotency-key", "").strip()
+		if not key:
+			await self.app(scope, receive, send)
+			return
+		if len(key) > MAX_KEY_LENGTH:
+			await _send_json(send, 400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+			return
+		user_id = _user_id(headers)
+		if user_id is None:
+			# Let the endpoint reject the request; nothing is worth storing.
+			await self.app(scope, receive, send)
+			return
+
+		result = await run_in_threadpool(idempotency.claim, user_id, key, scope["method"], scope["path"])
+		if result.outcome == idempotency.IN_PROGRESS:
+			await _send_json(
+				send,
+				409,
+				"A request with this Idempotency-Key is still being processed",
+				[(b"retry-after", b"1")],
+			)
+			return
+		if result.outcome == idempotency.REPLAY:
+			await self._replay(scope, receive, send, result.response)
+			return
+		await self._run_and_store(scope, receive, send, result.row_id, user_id, key)
+
+	async def _replay(self, scope: Scope, receive: Receive, send: Send, stored) -> None:
+		digest = RequestFingerprint(scope, Headers(scope=scope))
+		more_body = True
+		while more_body:
+			message = await receive()
+			if message["type"] == "http.disconnect":
+				return
+			digest.update(message.get("body", b""))
+			more_body = message.get("more_body", False)
+		if digest.hexdigest() != stored.fingerprint:
+			await _send_json(send, 422, "Idempotency-Key was already used for a different request")
+			return
+
+		response_headers = [
+			(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers
+		]
+		response_headers.append((b"idempotent-replayed", b"true"))
+		await send({"type": "http.response.start", "status": stored.status_code, "headers": response_headers})
+		await send({"type": "http.response.body", "body": stored.body})
+
+	async def _run_and_store(
+		self, scope: Scope, receive: Receive, send: Send, row_id: int, user_id: int, key: str
+	) -> None:
+		headers = Headers(scope=scope)
+		digest = RequestFingerprint(scope, headers)
+		# Endpoints without a body parameter never call receive().
+		body_read = headers.get("content-length", "0") == "0" and "transfer-encoding" not in headers
+		status_code = 500
+		response_headers: list[tuple[str, str]] = []
+		chunks: list[bytes] = []
+		size = 0
+		oversized = False
+
+		async def receive_and_hash() -> Message:
+			nonlocal body_read
+			message = await receive()
+			if message["type"] == "http.request":
+				digest.update(message.get("body", b""))
+				if not message.get("more_body", False):
+					body_read = True
+			return message
+
+		async def send_and_capture(message: Message) -> None:
+			nonlocal status_code, size, oversized
+			if message["type"] == "http.response.start":
+				status_code = message["status"]
+				response_headers.extend(
+					(name.decode("latin-1"), value.decode("latin-1"))
+					for name, value in message.get("headers", [])
+				)
+			elif message["type"] == "http.response.body" and not oversized:
+				body = message.get("body", b"")
+				size += len(body)
+				if size > idempotency.IDEMPOTENCY_MAX_BODY_BYTES:
+					oversized = True
+					chunks.clear()
+				else:
+					chunks.append(body)
+			await send(message)
+
+		try:
+			await self.app(scope, receive_and_hash, send_and_capture)
+		except BaseException:
+			await run_in_threadpool(idempotency.release, row_id)
+			raise
+
+		# A request whose body was never fully read can't be fingerprinted reliably.
+		if status_code >= 500 or oversized or not body_read:
+			await run_in_threadpool(idempotency.release, row_id)
+			return
+		await run_in_threadpool(
+			idempotency.complete,
+			row_id,
+			user_id,
+			key,
+			digest.hexdigest(),
+			status_code,
+			response_headers,
+			b"".join(chunks),
+		)
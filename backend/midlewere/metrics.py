@@ -0,0 +1,270 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.query_stats import current_stats
+from midlewere.query_stats import route_template
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+	pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+	if extra:
+		pairs.append(extra)
+	return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+	if value == float("inf"):
+		return "+Inf"
+	return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+	kind = ""
+
+	def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+		self.name = name
+		self.documentation = documentation
+		self.labelnames = tuple(labelnames)
+		self._lock = threading.Lock()
+
+	def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+		return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+	@abstractmethod
+	def samples(self) -> list[str]:
+		"""Exposition lines for every label set, without the HELP/TYPE header."""
+
+	def render(self) -> str:
+		lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+		lines.extend(self.samples())
+		return "\n".join(lines)
+
+
+class Counter(_Metric):
+	kind = "counter"
+
+	def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+		super().__init__(name, documentation, labelnames)
+		self._values: dict[tuple[str, ...], float] = {}
+
+	def inc(self, amount: float = 1, **labels: str) -> None:
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0) + amount
+
+	def samples(self) -> list[str]:
+		with self._lock:
+			items = list(self._values.items())
+		return [
+			f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+			for key, value in items
+		]
+
+
+class Gauge(_Metric):
+	kind = "gauge"
+
+	def __init__(
+		self,
+		name: str,
+		documentation: str,
+		labelnames: Iterable[str] = (),
+		collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+	) -> None:
+		super().__init__(name, documentation, labelnames)
+		self._values: dict[tuple[str, ...], float] = {}
+		self._collect = collect
+
+	def inc(self, amount: float = 1, **labels: str) -> None:
+		key = self._key(labels)
+		with self._lock:
+			self._values[key] = self._values.get(key, 0) + amount
+
+	def dec(self, amount: float = 1, **labels: str) -> None:
+		self.inc(-amount, **labels)
+
+	def samples(self) -> list[str]:
+		if self._collect is not None:
+			items = list(self._collect().items())
+		else:
+			with self._lock:
+				items = list(self._values.items())
+		return [
+			f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+			for key, value in items
+		]
+
+
+class Histogram(_Metric):
+	kind = "histogram"
+
+	def __init__(
+		self,
+		name: str,
+		documentation: str,
+		labelnames: Iterable[str] = (),
+		buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+	) -> None:
+		super().__init__(name, documentation, labelnames)
+		self.buckets = tuple(buckets) + (float("inf"),)
+		# Per label set: [bucket counts..., sum, count]
+		self._values: dict[tuple[str, ...], list[float]] = {}
+
+	def observe(self, value: float, **labels: str) -> None:
+		key = self._key(labels)
+		index = bisect_left(self.buckets, value)
+		with self._lock:
+			state = self._values.get(key)
+			if state is None:
+				state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+			state[index] += 1
+			state[-2] += value
+			state[-1] += 1
+
+	def samples(self) -> list[str]:
+		with self._lock:
+			items = [(key, list(state)) for key, state in self._values.items()]
+		lines: list[str] = []
+		for key, state in items:
+			cumulative = 0.0
+			for bound, count in zip(self.buckets, state):
+				cumulative += count
+				labels = _format_labels(self.labelnames, key, f'le="{_format_number(bound)}"')
+				lines.append(f"{self.name}_bucket{labels} {_format_number(cumulative)}")
+			labels = _format_labels(self.labelnames, key)
+			lines.append(f"{self.name}_sum{labels} {state[-2]!r}")
+			lines.append(f"{self.name}_count{labels} {_format_number(state[-1])}")
+		return lines
+
+
+class Registry:
+	def __init__(self) -> None:
+		self._metrics: list[_Metric] = []
+
+	def register(self, metric: _Metric) -> _Metric:
+		self._metrics.append(metric)
+		return metric
+
+	def render(self) -> str:
+		return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(
+	Counter("hicm_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+)
+http_request_duration_seconds = registry.register(
+	Histogram("hicm_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+)
+http_requests_in_flight = registry.register(
+	Gauge("hicm_http_requests_in_flight", "HTTP requests currently being served by router.", ("router",))
+)
+db_queries_total = registry.register(
+	Counter("hicm_db_queries_total", "SQL statements issued by route.", ("route",))
+)
+db_query_duration_seconds_total = registry.register(
+	Counter("hicm_db_query_duration_seconds_total", "Time spent in SQL statements by route.", ("route",))
+)
+assessment_auto_saves_total = registry.register(
+	Counter("hicm_assessment_auto_saves_total", "Auto-save requests that wrote answers.")
+)
+assessment_answers_saved_total = registry.register(
+	Counter("hicm_assessment_answers_saved_total", "Answers written by auto-save.")
+)
+assessment_submits_total = registry.register(
+	Counter("hicm_assessment_submits_total", "Submissions by kind.", ("kind",))
+)
+evidence_uploaded_bytes_total = registry.register(
+	Counter("hicm_evidence_uploaded_bytes_total", "Evidence bytes written to storage.")
+)
+evidence_uploaded_files_total = registry.register(
+	Counter("hicm_evidence_uploaded_files_total", "Evidence files written to storage.")
+)
+
+
+_pool_engines: dict[str, object] = {}
+
+
+def _pool_reader(method: str) -> Callable[[], dict[tuple[str, ...], float]]:
+	def read() -> dict[tuple[str, ...], float]:
+		values: dict[tuple[str, ...], float] = {}
+		for name, engine in list(_pool_engines.items()):
+			reader = getattr(engine.pool, method, None)
+			if reader is not None:
+				values[(name,)] = float(reader())
+		return values
+
+	return read
+
+
+for _method, _documentation in (
+	("size", "Configured pool size."),
+	("checkedout", "Connections currently checked out."),
+	("checkedin", "Idle connections in the pool."),
+	("overflow", "Connections open beyond the pool size."),
+):
+	registry.register(
+		Gauge(f"hicm_db_pool_{_method}", _documentation, ("engine",), collect=_pool_reader(_method))
+	)
+
+
+def register_pool_gauges(engine, name: str = "primary") -> None:
+	"""Expose connection pool state for ``engine``, read at scrape time."""
+	_pool_engines[name] = engine
+
+
+def router_group(path: str) -> str:
+	for prefix in ("/api/company", "/api/audit", "/api/admin"):
+		if path.startswith(prefix):
+			return prefix.rsplit("/", 1)[-1]
+	return "other"
+
+
+class MetricsMiddleware:
+	"""Record latency, status counts, in-flight requests and DB usage per route."""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		group = router_group(scope.get("path", ""))
+		status_code = 500
+
+		async def send_with_status(message: Message) -> None:
+			nonlocal status_code
+			if message["type"] == "http.response.start":
+				status_code = message["status"]
+			await send(message)
+
+		http_requests_in_flight.inc(router=group)
+		started = time.perf_counter()
+		try:
+			await self.app(scope, receive, send_with_status)
+		finally:
+			elapsed = time.perf_counter() - started
+			http_requests_in_flight.dec(router=group)
+			# Unmatched paths share one label so scanners can't grow the series set.
+			route = route_template(scope) if scope.get("route") else "unmatched"
+			method = scope.get("method", "")
+			http_request_duration_seconds.observe(elapsed, method=method, route=route)
+			http_requests_total.inc(method=method, route=route, status=str(status_code))
+			stats = current_stats()
+			if stats is not None and stats.count:
+				db_queries_total.inc(stats.count, route=route)
+				db_query_duration_seconds_total.inc(stats.total_seconds, route=route)
@@ -0,0 +1,73 @@
+import json
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.query_stats import track_queries
+
+logger = logging.getLogger("hicm.db")
+
+
+def route_template(scope: Scope) -> str:
+	"""Return the matched route path (``/api/audit/submissions/{company_id}``) when known."""
+	route = scope.get("route")
+	return getattr(route, "path", None) or scope.get("path", "")
+
+
+class QueryStatsMiddleware:
+	"""Count SQL statements and DB time per request.
+
+	The totals are returned as ``X-DB-Queries`` / ``X-DB-Time`` (milliseconds)
+	response headers and logged as one JSON line on the ``hicm.db`` logger.
+
+	Headers go out before the body, so streaming responses (no
+	``Content-Length``, e.g. the CSV/XLSX export and SSE) get no headers:
+	their queries run while the body streams, and only the log line and the
+	``/metrics`` counters, both written when the request ends, have the totals.
+	"""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		started = time.perf_counter()
+		status_code = 500
+		with track_queries(scope.get("path")) as stats:
+
+			async def send_with_stats(message: Message) -> None:
+				nonlocal status_code
+				if message["type"] == "http.response.start":
+					status_code = message["status"]
+					headers = list(message.get("headers", []))
+					if not any(name.lower() == b"content-length" for name, _ in headers):
+						await send(message)
+						return
+					headers.append((b"x-db-queries", str(stats.count).encode("latin-1")))
+					headers.append((b"x-db-time", f"{stats.total_ms:.2f}".encode("latin-1")))
+					message["headers"] = headers
+				await send(message)
+
+			try:
+				await self.app(scope, receive, send_with_stats)
+			finally:
+				stats.route = route_template(scope)
+				if logger.isEnabledFor(logging.INFO):
+					logger.info(
+						json.dumps(
+							{
+								"event": "request",
+								"method": scope.get("method"),
+								"path": scope.get("path"),
+								"route": stats.route,
+								"status": status_code,
+								"db_queries": stats.count,
+								"db_time_ms": round(stats.total_ms, 2),
+								"duration_ms": round((time.perf_counter() - started) * 1000, 2),
+							}
+						)
+					)
@@ -0,0 +1,72 @@
+import hashlib
+import time
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.routing import (
+	REPLICA_STICKY_SECONDS,
+	STICKY_COOKIE,
+	RequestRouting,
+	begin_request,
+	end_request,
+	replica_enabled,
+)
+
+
+def _client_key(headers: Headers) -> str | None:
+	authorization = headers.get("authorization")
+	if not authorization:
+		return None
+	return hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:32]
+
+
+def _sticky_until(headers: Headers) -> float:
+	cookie = SimpleCookie(headers.get("cookie", ""))
+	morsel = cookie.get(STICKY_COOKIE)
+	try:
+		return float(morsel.value) if morsel else 0.0
+	except ValueError:
+		return 0.0
+
+
+class ReadRoutingMiddleware:
+	"""Track writes per client so get_read_db can honour read-your-writes.
+
+	Writes are remembered in-process by Authorization header and, for other
+	workers, in a short-lived cookie. Responses served from the replica are
+	marked with ``X-DB-Session: replica``.
+	"""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http" or not replica_enabled():
+			await self.app(scope, receive, send)
+			return
+
+		headers = Headers(scope=scope)
+		routing = RequestRouting(_client_key(headers), _sticky_until(headers))
+
+		async def send_with_routing(message: Message) -> None:
+			if message["type"] == "http.response.start":
+				response_headers = list(message.get("headers", []))
+				if routing.wrote:
+					until = time.time() + REPLICA_STICKY_SECONDS
+					cookie = (
+						f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(REPLICA_STICKY_SECONDS) + 1}; "
+						"Path=/; SameSite=Lax; HttpOnly"
+					)
+					response_headers.append((b"set-cookie", cookie.encode("latin-1")))
+				if routing.used_replica:
+					response_headers.append((b"x-db-session", b"replica"))
+				message["headers"] = response_headers
+			await send(message)
+
+		token = begin_request(routing)
+		try:
+			await self.app(scope, receive, send_with_routing)
+		finally:
+			end_request(token)
@@ -0,0 +1,193 @@
+"""Bulk seeding for local and staging databases.
+
+Usage (from backend/):
+
+	python mocup_data/seed.py reference
+	python mocup_data/seed.py synthetic --companies 100000 --questions-per-pillar 50 --truncate
+
+``reference`` loads roles, statuses, points, pillars and the default test
+accounts, skipping rows that already exist. ``synthetic`` bulk-loads a
+production-sized dataset (see benchmark/dataset.py) with COPY.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from auth.auth import hash_password
+from benchmark.dataset import Dataset, DatasetConfig, PILLARS, POINT_SCORES, ROLES, STATUSES, load_dataset
+from database.bulk_load import bulk_insert
+from database.database import Base, engine
+from database.migrate import migrate
+from entity.auditor import AuditorTable
+from entity.company import CompanyTable
+from entity.pillars import PillarsTable
+from entity.point import PointTable
+from entity.role import RoleTable
+from entity.status import StatusTable
+from entity.user import UserTable
+
+DEFAULT_USERS = [
+	("admin", "12345678", "admin"),
+	("companytest", "12345678", "company"),
+	("companytest2", "12345678", "company"),
+	("audittest", "12345678", "audit"),
+]
+DEFAULT_COMPANIES = [("Company Test", "companytest"), ("Company Test 2", "companytest2")]
+DEFAULT_AUDITORS = ["audittest"]
+
+
+class PasswordHasher:
+	"""Hash each distinct password once, or reuse one precomputed hash for all."""
+
+	def __init__(self, precomputed: str | None = None) -> None:
+		self.precomputed = precomputed
+		self._cache: dict[str, str] = {}
+
+	def __call__(self, password: str) -> str:
+		if self.precomputed:
+			return self.precomputed
+		if password not in self._cache:
+			self._cache[password] = hash_password(password)
+		return self._cache[password]
+
+
+def _insert_missing(connection: Connection, table, key: str, rows: list[dict]) -> int:
+	existing = set(
+		connection.execute(select(table.c[key]).where(table.c[key].in_([row[key] for row in rows]))).scalars()
+	)
+	now = datetime.utcnow()
+	missing = [
+		{**row, "created_at": now, "updated_at": now}
+		for row in rows
+		if row[key] not in existing
+	]
+	return bulk_insert(connection, table, missing) if missing else 0
+
+
+def seed_reference(connection: Connection, hasher: PasswordHasher) -> dict[str, int]:
+	counts = {
+		"roles": _insert_missing(connection, RoleTable.__table__, "name", [{"name": name} for name in ROLES]),
+		"statuses": _insert_missing(
+			connection, StatusTable.__table__, "name", [{"name": name} for name in STATUSES]
+		),
+		"pillars": _insert_missing(connection, PillarsTable.__table__, "key", [dict(pillar) for pillar in PILLARS]),
+	}
+
+	existing_scores = set(
+		connection.execute(select(PointTable.score).where(PointTable.delete_at.is_(None))).scalars()
+	)
+	now = datetime.utcnow()
+	points = [
+		{"score": score, "created_at": now, "updated_at": now}
+		for score in POINT_SCORES
+		if score not in existing_scores
+	]
+	counts["points"] = bulk_insert(connection, PointTable.__table__, points) if points else 0
+
+	role_ids = dict(connection.execute(select(RoleTable.name, RoleTable.id)).all())
+	counts["users"] = _insert_missing(
+		connection,
+		UserTable.__table__,
+		"username",
+		[
+			{"username": username, "password": hasher(password), "roleid": role_ids[role]}
+			for username, password, role in DEFAULT_USERS
+		],
+	)
+
+	user_ids = dict(
+		connection.execute(
+			select(UserTable.username, UserTable.id).where(
+				UserTable.username.in_([username for username, _, _ in DEFAULT_USERS])
+			)
+		).all()
+	)
+	companies = [
+		{"company_name": company_name, "user_id": user_ids[username]}
+		for company_name, username in DEFAULT_COMPANIES
+	]
+	counts["companies"] = _insert_missing(connection, CompanyTable.__table__, "user_id", companies)
+	counts["auditors"] = _insert_missing(
+		connection,
+		AuditorTable.__table__,
+		"user_id",
+		[{"user_id": user_ids[username]} for username in DEFAULT_AUDITORS],
+	)
+	return counts
+
+
+def truncate_all(connection: Connection) -> None:
+	tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+	connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+def _has_rows(connection: Connection) -> bool:
+	return connection.execute(select(UserTable.id).limit(1)).first() is not None
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument(
+		"--password-hash",
+		default=os.getenv("SEED_PASSWORD_HASH"),
+		help="Precomputed hash (auth.auth.hash_password) stored for every seeded user",
+	)
+	parser.add_argument("--no-copy", action="store_true", help="Use multi-row INSERT instead of COPY")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	subparsers.add_parser("reference", help="Roles, statuses, points, pillars and test accounts")
+
+	synthetic = subparsers.add_parser("synthetic", help="Production-sized synthetic dataset")
+	synthetic.add_argument("--companies", type=int, default=1000)
+	synthetic.add_argument("--questions-per-pillar", type=int, default=25)
+	synthetic.add_argument("--auditors", type=int, default=20)
+	synthetic.add_argument("--answer-ratio", type=float, default=1.0)
+	synthetic.add_argument("--submitted-ratio", type=float, default=0.5)
+	synthetic.add_argument("--evidence-per-answer", type=int, default=1)
+	synthetic.add_argument("--seed", type=int, default=2547)
+	synthetic.add_argument(
+		"--truncate",
+		action="store_true",
+		help="Empty every table first; synthetic rows use explicit ids",
+	)
+	args = parser.parse_args()
+
+	migrate()
+	hasher = PasswordHasher(args.password_hash)
+	started = time.perf_counter()
+	with engine.begin() as connection:
+		if args.command == "reference":
+			counts = seed_reference(connection, hasher)
+		else:
+			if args.truncate:
+				truncate_all(connection)
+			elif _has_rows(connection):
+				parser.error("database already has rows; rerun with --truncate")
+			config = DatasetConfig(
+				companies=args.companies,
+				questions_per_pillar=args.questions_per_pillar,
+				auditors=args.auditors,
+				answer_ratio=args.answer_ratio,
+				submitted_ratio=args.submitted_ratio,
+				evidence_per_answer=args.evidence_per_answer,
+				seed=args.seed,
+			)
+			dataset = Dataset(config, password_hash=hasher("12345678"))
+			counts = load_dataset(connection, dataset, use_copy=not args.no_copy)
+
+	elapsed = time.perf_counter() - started
+	for table_name, count in counts.items():
+		print(f"{table_name:<28} {count:>10}")
+	print(f"Seeded {sum(counts.values())} rows in {elapsed:.1f}s.")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,361 @@
+"""Cross-company score analytics built from ``company_score_snapshots``.
+
+Each company has one snapshot row holding its per-pillar scores and the
+segment it falls in. Snapshots are refreshed for a single company whenever
+its results are recalculated or it submits, so the analytics endpoints
+never aggregate ``company_assessment_results`` over every company per
+request. Aggregates are cached in-process and reused until a snapshot
+changes.
+
+Rebuild every snapshot (e.g. after deploying, or after bulk imports)::
+
+	python -m service.analytics --rebuild
+"""
+
+import sys
+import threading
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from entity.assessment import AssessmentTable
+from entity.company import CompanyTable
+from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.company_score_snapshot import CompanyScoreSnapshotTable
+from entity.company_submit import CompanySubmitTable
+from entity.pillars import PillarsTable
+from service.jobs import job_handler
+
+# Upper bounds (exclusive) for Number_of_employees bands; the last band is open.
+EMPLOYEE_BANDS = ((50, "1-49"), (200, "50-199"), (500, "200-499"), (1000, "500-999"), (None, "1000+"))
+SEGMENT_FIELDS = ("type_company", "employee_band", "round_assessment")
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BUCKETS = 10
+
+
+def employee_band(number_of_employees: int | None) -> str | None:
+	if not number_of_employees or number_of_employees <= 0:
+		return None
+	for upper, label in EMPLOYEE_BANDS:
+		if upper is None or number_of_employees < upper:
+			return label
+	return None
+
+
+def star_count(overall_score: float, max_score: float) -> int:
+	if max_score <= 0:
+		return 0
+	return max(0, min(5, round((overall_score / max_score) * 5)))
+
+
+def pillar_max_scores(db: Session) -> list[tuple[PillarsTable, float]]:
+	"""Live pillars in display order with the maximum score each can contribute."""
+	pillars = (
+		db.query(PillarsTable)
+		.filter(PillarsTable.delete_at.is_(None))
+		.order_by(PillarsTable.id.asc())
+		.all()
+	)
+	question_counts = dict(
+		db.query(AssessmentTable.pillar_id, func.count(AssessmentTable.id))
+		.filter(AssessmentTable.delete_at.is_(None))
+		.group_by(AssessmentTable.pillar_id)
+		.all()
+	)
+	maxima: list[tuple[PillarsTable, float]] = []
+	for pillar in pillars:
+		weight = float(pillar.weight or 0)
+		max_raw = float(question_counts.get(pillar.id, 0) * 20)
+		maxima.append((pillar, weight if weight > 0 and max_raw > 0 else max_raw))
+	return maxima
+
+
+def _snapshot_values(
+	company: CompanyTable,
+	scores_by_pillar_id: dict[int, float],
+	maxima: list[tuple[PillarsTable, float]],
+	submitted_at: datetime | None,
+	refreshed_at: datetime,
+) -> dict:
+	pillar_scores = {
+		pillar.key: round(scores_by_pillar_id.get(pillar.id, 0.0), 2) for pillar, _ in maxima
+	}
+	overall_score = round(sum(pillar_scores.values()), 2)
+	max_score = round(sum(maximum for _, maximum in maxima), 2)
+	return {
+		"company_id": company.id,
+		"type_company": company.type_company,
+		"employee_band": employee_band(company.Number_of_employees),
+		"round_assessment": company.round_assessment,
+		"overall_score": overall_score,
+		"max_score": max_score,
+		"star_count": star_count(overall_score, max_score),
+		"pillar_scores": pillar_scores,
+		"submitted_at": submitted_at,
+		"refreshed_at": refreshed_at,
+	}
+
+
+def refresh_company_snapshot(
+	db: Session,
+	company: CompanyTable,
+	submitted_at: datetime | None = None,
+) -> CompanyScoreSnapshotTable:
+	"""Recompute one company's snapshot in the caller's transaction.
+
+	``submitted_at`` marks the company as submitted; otherwise the existing
+	submission time is kept.
+	"""
+	# Sessions don't autoflush; the caller's fresh result rows must be visible.
+	db.flush()
+	scores_by_pillar_id = dict(
+		db.query(CompanyAssessmentResultTable.pillar_id, CompanyAssessmentResultTable.score)
+		.filter(
+			CompanyAssessmentResultTable.company_id == company.id,
+			CompanyAssessmentResultTable.assessment_round == company.current_round,
+			CompanyAssessmentResultTable.delete_at.is_(None),
+		)
+		.all()
+	)
+	snapshot = (
+		db.query(CompanyScoreSnapshotTable)
+		.filter(CompanyScoreSnapshotTable.company_id == company.id)
+		.first()
+	)
+	if snapshot is None:
+		snapshot = CompanyScoreSnapshotTable(company_id=company.id)
+		db.add(snapshot)
+	values = _snapshot_values(
+		company,
+		{pillar_id: score or 0.0 for pillar_id, score in scores_by_pillar_id.items()},
+		pillar_max_scores(db),
+		submitted_at or snapshot.submitted_at,
+		datetime.utcnow(),
+	)
+	for key, value in values.items():
+		setattr(snapshot, key, value)
+	return snapshot
+
+
+def rebuild_snapshots(db: Session, chunk_size: int = 5000) -> int:
+	"""Replace every snapshot from the current results in a few bulk queries."""
+	maxima = pillar_max_scores(db)
+	companies = db.query(CompanyTable).filter(CompanyTable.delete_at.is_(None)).all()
+
+	scores: dict[int, dict[int, float]] = {}
+	for company_id, pillar_id, score in (
+		db.query(
+			CompanyAssessmentResultTable.company_id,
+			CompanyAssessmentResultTable.pillar_id,
+			CompanyAssessmentResultTable.score,
+		)
+		.join(CompanyTable, CompanyTable.id == CompanyAssessmentResultTable.company_id)
+		.filter(
+			CompanyAssessmentResultTable.delete_at.is_(None),
+			CompanyAssessmentResultTable.assessment_round == CompanyTable.current_round,
+		)
+		.yield_per(chunk_size)
+	):
+		scores.setdefault(company_id, {})[pillar_id] = score or 0.0
+
+	submitted = dict(
+		db.query(CompanySubmitTable.company_id, func.max(CompanySubmitTable.created_at))
+		.join(CompanyTable, CompanyTable.id == CompanySubmitTable.company_id)
+		.filter(
+			CompanySubmitTable.delete_at.is_(None),
+			CompanySubmitTable.assessment_round == CompanyTable.current_round,
+		)
+		.group_by(CompanySubmitTable.company_id)
+		.all()
+	)
+
+	refreshed_at = datetime.utcnow()
+	db.query(CompanyScoreSnapshotTable).delete(synchronize_session=False)
+	rows = [
+		_snapshot_values(company, scores.get(company.id, {}), maxima, submitted.get(company.id), refreshed_at)
+		for company in companies
+	]
+	for start in range(0, len(rows), chunk_size):
+		db.execute(insert(CompanyScoreSnapshotTable), rows[start:start + chunk_size])
+	return len(rows)
+
+
+@job_handler("rebuild_analytics")
+def rebuild_analytics_job(db: Session, payload: dict) -> dict:
+	return {"companies": rebuild_snapshots(db)}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+	"""Linear-interpolated percentile of an already sorted list."""
+	if not ordered:
+		return 0.0
+	position = (len(ordered) - 1) * fraction
+	lower = int(position)
+	upper = min(lower + 1, len(ordered) - 1)
+	return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def distribution(values: Iterable[float], max_score: float) -> dict:
+	ordered = sorted(values)
+	width = max_score / HISTOGRAM_BUCKETS if max_score > 0 else 0.0
+	counts = [0] * HISTOGRAM_BUCKETS
+	if width:
+		for value in ordered:
+			counts[min(HISTOGRAM_BUCKETS - 1, max(0, int(value / width)))] += 1
+	return {
+		"count": len(ordered),
+		"mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+		"min": round(ordered[0], 2) if ordered else 0.0,
+		"max": round(ordered[-1], 2) if ordered else 0.0,
+		"max_score": round(max_score, 2),
+		"percentiles": {f"p{p}": round(percentile(ordered, p / 100), 2) for p in PERCENTILES},
+		"histogram": [
+			{
+				"lower": round(index * width, 2),
+				"upper": round((index + 1) * width, 2),
+				"count": count,
+			}
+			for index, count in enumerate(counts)
+		] if width else [],
+	}
+
+
+def _summarise(rows: list, maxima: list[tuple[PillarsTable, float]]) -> dict:
+	stars = {str(stars): 0 for stars in range(6)}
+	for row in rows:
+		stars[str(row.star_count)] = stars.get(str(row.star_count), 0) + 1
+	return {
+		"company_count": len(rows),
+		"overall": distribution(
+			(row.overall_score for row in rows), sum(maximum for _, maximum in maxima)
+		),
+		"star_histogram": stars,
+		"pillars": [
+			{
+				"key": pillar.key,
+				"name": pillar.name,
+				**distribution(((row.pillar_scores or {}).get(pillar.key, 0.0) for row in rows), maximum),
+			}
+			for pillar, maximum in maxima
+		],
+	}
+
+
+class _AnalyticsCache:
+	"""Aggregates keyed by filters, valid while no snapshot has been refreshed."""
+
+	def __init__(self, max_entries: int = 256) -> None:
+		self._entries: dict[tuple, tuple[datetime | None, dict]] = {}
+		self._lock = threading.Lock()
+		self._max_entries = max_entries
+
+	def get(self, key: tuple, version: datetime | None) -> dict | None:
+		with self._lock:
+			entry = self._entries.get(key)
+		if entry is not None and entry[0] == version:
+			return entry[1]
+		return None
+
+	def put(self, key: tuple, version: datetime | None, payload: dict) -> None:
+		with self._lock:
+			if len(self._entries) >= self._max_entries:
+				self._entries.clear()
+			self._entries[key] = (version, payload)
+
+
+_cache = _AnalyticsCache()
+
+
+def snapshot_version(db: Session) -> datetime | None:
+	return db.query(func.max(CompanyScoreSnapshotTable.refreshed_at)).scalar()
+
+
+def benchmark_summary(db: Session, filters: dict[str, str | None], group_by: str | None = None) -> dict:
+	"""Score distributions over submitted companies, optionally split by segment."""
+	filters = {field: value for field, value in filters.items() if value is not None}
+	key = (tuple(sorted(filters.items())), group_by)
+	version = snapshot_version(db)
+	cached = _cache.get(key, version)
+	if cached is not None:
+		return cached
+
+	query = db.query(
+		CompanyScoreSnapshotTable.type_company,
+		CompanyScoreSnapshotTable.employee_band,
+		CompanyScoreSnapshotTable.round_assessment,
+		CompanyScoreSnapshotTable.overall_score,
+		CompanyScoreSnapshotTable.star_count,
+		CompanyScoreSnapshotTable.pillar_scores,
+	).filter(CompanyScoreSnapshotTable.submitted_at.isnot(None))
+	for field, value in filters.items():
+		query = query.filter(getattr(CompanyScoreSnapshotTable, field) == value)
+	rows = query.all()
+	maxima = pillar_max_scores(db)
+
+	payload = {"filters": filters, "group_by": group_by, **_summarise(rows, maxima)}
+	if group_by:
+		segments: dict[str | None, list] = {}
+		for row in rows:
+			segments.setdefault(getattr(row, group_by), []).append(row)
+		payload["segments"] = [
+			{"value": value, **_summarise(segment_rows, maxima)}
+			for value, segment_rows in sorted(segments.items(), key=lambda item: (item[0] is None, item[0] or ""))
+		]
+	payload["refreshed_at"] = version.isoformat() if version else None
+	_cache.put(key, version, payload)
+	return payload
+
+
+def company_standing(db: Session, company_id: int) -> dict | None:
+	"""Where one company's overall score sits among submitted peers in its segment."""
+	snapshot = (
+		db.query(CompanyScoreSnapshotTable)
+		.filter(CompanyScoreSnapshotTable.company_id == company_id)
+		.first()
+	)
+	if snapshot is None:
+		return None
+
+	standing = {
+		"overall_score": snapshot.overall_score,
+		"max_score": snapshot.max_score,
+		"star_count": snapshot.star_count,
+		"segments": {},
+	}
+	for field in (None, *SEGMENT_FIELDS):
+		value = getattr(snapshot, field) if field else None
+		if field and value is None:
+			continue
+		segment = {field: value} if field else {}
+		summary = benchmark_summary(db, segment)
+		overall = summary["overall"]
+		below = db.query(func.count(CompanyScoreSnapshotTable.id)).filter(
+			CompanyScoreSnapshotTable.submitted_at.isnot(None),
+			CompanyScoreSnapshotTable.overall_score < snapshot.overall_score,
+			*(getattr(CompanyScoreSnapshotTable, name) == wanted for name, wanted in segment.items()),
+		).scalar()
+		standing["segments"][field or "all"] = {
+			"value": value,
+			"company_count": summary["company_count"],
+			"percentile_rank": round(100 * below / summary["company_count"], 1) if summary["company_count"] else None,
+			"percentiles": overall["percentiles"],
+			"mean": overall["mean"],
+		}
+	return standing
+
+
+if __name__ == "__main__":
+	if "--rebuild" not in sys.argv:
+		raise SystemExit("Usage: python -m service.analytics --rebuild")
+
+	from database.database import SessionLocal
+
+	session = SessionLocal()
+	try:
+		count = rebuild_snapshots(session)
+		session.commit()
+	finally:
+		session.close()
+	print(f"Rebuilt {count} company score snapshots")
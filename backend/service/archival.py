@@ -0,0 +1,206 @@
+"""Move long-deleted rows out of the hot tables into ``*_archive`` copies.
+
+A tombstoned row is archived once ``delete_at`` is older than the retention
+period and nothing left in the live schema references it, so a dead
+evaluation criterion stays put while any company answer or auditor score
+still points at it. Tables are processed children first, which lets a dead
+answer and then its dead criterion go in the same run.
+
+Each batch commits on its own, so an interrupted run keeps what it moved
+and the next run carries on. Postgres reuses the freed space after
+(auto)vacuum; ``python -m service.archival --vacuum`` runs it straight away.
+
+Usage (from backend/):
+
+	python -m service.archival [--retention-days 180] [--dry-run] [--vacuum]
+"""
+
+import argparse
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import Table, and_, delete, exists, func, insert, literal_column, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.database import Base
+from entity.archive import ARCHIVE_TABLES
+from service.jobs import job_handler
+
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger("hicm.archival")
+
+
+def archive_order() -> list[Table]:
+	"""Archivable tables, referencing tables before the tables they point at."""
+	return [table for table in reversed(Base.metadata.sorted_tables) if table.name in ARCHIVE_TABLES]
+
+
+def referencing_columns(table: Table) -> list:
+	"""Every foreign-key column in the schema that points at ``table.id``."""
+	columns = []
+	for other in Base.metadata.sorted_tables:
+		for foreign_key in other.foreign_keys:
+			if foreign_key.column.table is table:
+				columns.append(foreign_key.parent)
+	return columns
+
+
+def reference_indexes() -> list[tuple[str, str, str]]:
+	"""``(name, table, column)`` indexes that keep the NOT EXISTS checks cheap.
+
+	The live partial indexes can't answer "is any row, dead or alive,
+	pointing here", so each referencing column gets a plain index.
+	"""
+	indexes = []
+	for table in archive_order():
+		for column in referencing_columns(table):
+			indexes.append((f"ix_{column.table.name}_{column.name}_ref", column.table.name, column.name))
+	return sorted(set(indexes))
+
+
+def archivable(table: Table, cutoff: datetime):
+	return and_(
+		table.c.delete_at.isnot(None),
+		table.c.delete_at < cutoff,
+		*(~exists().where(column == table.c.id) for column in referencing_columns(table)),
+	)
+
+
+def _row_bytes(db: Session, table: Table):
+	# pg_column_size of the whole row is the heap space the tuple occupies.
+	if db.get_bind().dialect.name == "postgresql":
+		return literal_column(f"pg_column_size({table.name}.*)")
+	return None
+
+
+def archive_table(
+	db: Session,
+	table: Table,
+	cutoff: datetime,
+	batch_size: int = ARCHIVE_BATCH_SIZE,
+	dry_run: bool = False,
+) -> dict:
+	"""Archive ``table``'s eligible rows in batches; returns rows and bytes moved."""
+	archive = ARCHIVE_TABLES[table.name]
+	condition = archivable(table, cutoff)
+	size = _row_bytes(db, table)
+
+	if dry_run:
+		columns = [func.count()] + ([func.coalesce(func.sum(size), 0)] if size is not None else [])
+		counts = db.execute(select(*columns).select_from(table).where(condition)).one()
+		return {"rows": int(counts[0]), "bytes": int(counts[1]) if size is not None else None}
+
+	rows_moved, bytes_moved = 0, 0
+	while True:
+		candidates = (
+			select(table.c.id, size if size is not None else literal_column("0"))
+			.where(condition)
+			.order_by(table.c.id)
+			.limit(batch_size)
+			.with_for_update(skip_locked=True)
+		)
+		batch = db.execute(candidates).all()
+		if not batch:
+			break
+		ids = [row[0] for row in batch]
+		try:
+			# Re-check the condition so a reference added since the SELECT keeps the row.
+			moved = db.execute(
+				delete(table).where(table.c.id.in_(ids), condition).returning(*table.c)
+			).mappings().all()
+			if moved:
+				archived_at = datetime.utcnow()
+				db.execute(insert(archive), [{**row, "archived_at": archived_at} for row in moved])
+			db.commit()
+		except IntegrityError:
+			db.rollback()
+			logger.warning("Skipped a %s batch that gained a reference mid-archive", table.name)
+			break
+
+		moved_ids = {row["id"] for row in moved}
+		rows_moved += len(moved_ids)
+		bytes_moved += sum(int(row[1] or 0) for row in batch if row[0] in moved_ids)
+		if len(batch) < batch_size or not moved:
+			break
+
+	return {"rows": rows_moved, "bytes": bytes_moved if size is not None else None}
+
+
+def archive_deleted(
+	db: Session,
+	retention_days: int = ARCHIVE_RETENTION_DAYS,
+	batch_size: int = ARCHIVE_BATCH_SIZE,
+	dry_run: bool = False,
+) -> dict:
+	"""Archive every table; ``bytes`` is None on databases without pg_column_size."""
+	cutoff = datetime.utcnow() - timedelta(days=retention_days)
+	tables = {
+		table.name: archive_table(db, table, cutoff, batch_size=batch_size, dry_run=dry_run)
+		for table in archive_order()
+	}
+	measured = [report["bytes"] for report in tables.values() if report["bytes"] is not None]
+	return {
+		"cutoff": cutoff.isoformat(),
+		"dry_run": dry_run,
+		"tables": tables,
+		"rows": sum(report["rows"] for report in tables.values()),
+		"bytes": sum(measured) if measured else None,
+	}
+
+
+@job_handler("archive_deleted")
+def archive_deleted_job(db: Session, payload: dict) -> dict:
+	return archive_deleted(
+		db,
+		retention_days=int(payload.get("retention_days", ARCHIVE_RETENTION_DAYS)),
+		batch_size=int(payload.get("batch_size", ARCHIVE_BATCH_SIZE)),
+		dry_run=bool(payload.get("dry_run", False)),
+	)
+
+
+def vacuum(engine) -> dict[str, dict[str, int]]:
+	"""VACUUM ANALYZE the archived tables and report their on-disk size before and after."""
+	names = [table.name for table in archive_order()]
+	sizes: dict[str, dict[str, int]] = {}
+	with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+		for name in names:
+			before = connection.execute(text("SELECT pg_total_relation_size(:name)"), {"name": name}).scalar()
+			connection.execute(text(f"VACUUM (ANALYZE) {name}"))
+			after = connection.execute(text("SELECT pg_total_relation_size(:name)"), {"name": name}).scalar()
+			sizes[name] = {"before": int(before), "after": int(after)}
+	return sizes
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--retention-days", type=int, default=ARCHIVE_RETENTION_DAYS)
+	parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+	parser.add_argument("--dry-run", action="store_true")
+	parser.add_argument("--vacuum", action="store_true", help="VACUUM ANALYZE afterwards (Postgres only)")
+	args = parser.parse_args()
+
+	from database.database import SessionLocal, engine
+
+	session = SessionLocal()
+	try:
+		report = archive_deleted(session, args.retention_days, args.batch_size, args.dry_run)
+		session.commit()
+	finally:
+		session.close()
+
+	for name, table_report in report["tables"].items():
+		size = f"{table_report['bytes']:>12} bytes" if table_report["bytes"] is not None else ""
+		print(f"{name:<28} {table_report['rows']:>8} rows {size}")
+	print(f"{'total':<28} {report['rows']:>8} rows", f"{report['bytes']:>12} bytes" if report["bytes"] is not None else "")
+
+	if args.vacuum and not args.dry_run and engine.dialect.name == "postgresql":
+		for name, size in vacuum(engine).items():
+			print(f"{name:<28} {size['before']:>12} -> {size['after']:>12} bytes on disk")
+
+
+if __name__ == "__main__":
+	main()
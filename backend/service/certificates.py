@@ -0,0 +1,309 @@
+"""Certificate rendering with an on-disk artifact cache.
+
+A certificate's content (company details, pillar scores, star count) is
+hashed into a version, and the rendered file is stored as
+``<CERTIFICATE_DIR>/<company_id>/<version>.<format>``. A request for an
+unchanged certificate is served from disk; a changed score produces a new
+version and the stale files for that company are removed after the new one
+is written. Rendering runs in the job worker (``render_certificate``), and
+``render_certificates`` fans out one job per submitted company.
+
+PDFs are drawn with reportlab when it is installed (set CERTIFICATE_FONT to
+a TTF such as THSarabunNew for Thai text); otherwise a minimal built-in
+PDF writer is used, which only has the standard Latin fonts. PNG output
+needs Pillow.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from entity.company import CompanyTable
+from entity.company_score_snapshot import CompanyScoreSnapshotTable
+from entity.job import JobTable
+from service.analytics import pillar_max_scores
+from service.jobs import enqueue, find_pending, job_handler
+
+try:
+	from reportlab.lib.pagesizes import A4
+	from reportlab.pdfbase import pdfmetrics
+	from reportlab.pdfbase.ttfonts import TTFont
+	from reportlab.pdfgen import canvas
+except ImportError:  # pragma: no cover - reportlab is optional
+	canvas = None
+
+try:
+	from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # pragma: no cover - Pillow is optional
+	Image = None
+
+CERTIFICATE_DIR = Path(
+	os.getenv(
+		"CERTIFICATE_DIR",
+		str(Path(__file__).resolve().parents[2] / "artifacts" / "certificates"),
+	)
+)
+CERTIFICATE_FONT = os.getenv("CERTIFICATE_FONT")
+# Bump when the layout changes so cached certificates are re-rendered.
+TEMPLATE_VERSION = "1"
+FORMATS = ("pdf", "png")
+
+# Mirrors the level table on the frontend certificate page.
+LEVELS = (
+	(600, "Level 1: Emerging"),
+	(700, "Level 2: Developing"),
+	(800, "Level 3: Performing"),
+	(900, "Level 4: Excellence"),
+	(None, "Level 5: World-Class"),
+)
+
+
+def assessment_level(overall_score: float) -> str:
+	for upper, label in LEVELS:
+		if upper is None or overall_score < upper:
+			return label
+	return LEVELS[-1][1]
+
+
+def certificate_data(db: Session, company: CompanyTable) -> dict | None:
+	"""Everything printed on the certificate, or None if the company has no results."""
+	snapshot = (
+		db.query(CompanyScoreSnapshotTable)
+		.filter(CompanyScoreSnapshotTable.company_id == company.id)
+		.first()
+	)
+	if snapshot is None or snapshot.submitted_at is None:
+		return None
+	scores = snapshot.pillar_scores or {}
+	pillars = []
+	for pillar, maximum in pillar_max_scores(db):
+		score = float(scores.get(pillar.key, 0.0))
+		pillars.append(
+			{
+				"key": pillar.key,
+				"name": pillar.name,
+				"max_score": round(maximum, 2),
+				"score": round(score, 2),
+				"percent": round(score / maximum * 100, 2) if maximum else 0.0,
+			}
+		)
+	return {
+		"template": TEMPLATE_VERSION,
+		"company_id": company.id,
+		"company_name": company.company_name,
+		"address": company.address,
+		"type_company": company.type_company,
+		"number_of_employees": company.Number_of_employees,
+		"round_assessment": company.round_assessment,
+		"assessment_round": company.current_round,
+		"date_assessment": company.date_assessment.date().isoformat() if company.date_assessment else None,
+		"overall_score": round(snapshot.overall_score, 2),
+		"max_score": round(snapshot.max_score, 2),
+		"star_count": snapshot.star_count,
+		"level": assessment_level(snapshot.overall_score),
+		"pillars": pillars,
+	}
+
+
+def certificate_version(data: dict) -> str:
+	return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def certificate_path(company_id: int, version: str, file_format: str = "pdf") -> Path:
+	return CERTIFICATE_DIR / str(company_id) / f"{version}.{file_format}"
+
+
+def _lines(data: dict) -> list[tuple[int, str]]:
+	"""Certificate text as (font size, line) pairs, top to bottom."""
+	lines = [
+		(10, "HICM Assessment"),
+		(20, "Certificate of Assessment"),
+		(16, data["company_name"]),
+		(10, ""),
+	]
+	for label, key in (
+		("Address", "address"),
+		("Industry", "type_company"),
+		("Employees", "number_of_employees"),
+		("Assessment date", "date_assessment"),
+		("Assessment round", "round_assessment"),
+	):
+		if data.get(key) not in (None, ""):
+			lines.append((11, f"{label}: {data[key]}"))
+	lines.append((10, ""))
+	for pillar in data["pillars"]:
+		lines.append(
+			(11, f"{pillar['name']}: {pillar['score']:.2f} / {pillar['max_score']:.2f} ({pillar['percent']:.2f}%)")
+		)
+	lines.extend(
+		[
+			(10, ""),
+			(14, f"Total score: {data['overall_score']:.2f} / {data['max_score']:.2f}"),
+			(14, f"Stars: {'*' * data['star_count']}{'-' * (5 - data['star_count'])} ({data['star_count']}/5)"),
+			(14, data["level"]),
+		]
+	)
+	return lines
+
+
+def _render_pdf_reportlab(data: dict, target: Path) -> None:
+	font = "Helvetica"
+	if CERTIFICATE_FONT:
+		pdfmetrics.registerFont(TTFont("CertificateFont", CERTIFICATE_FONT))
+		font = "CertificateFont"
+	width, height = A4
+	pdf = canvas.Canvas(str(target), pagesize=A4)
+	pdf.setTitle(f"HICM certificate - {data['company_name']}")
+	y = height - 72
+	for size, line in _lines(data):
+		pdf.setFont(font, size)
+		if size >= 16:
+			pdf.drawCentredString(width / 2, y, line)
+		else:
+			pdf.drawString(72, y, line)
+		y -= size + 8
+	pdf.showPage()
+	pdf.save()
+
+
+def _pdf_text(value: str) -> str:
+	value = value.encode("latin-1", "replace").decode("latin-1")
+	return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _render_pdf_builtin(data: dict, target: Path) -> None:
+	"""Write a one-page A4 PDF using only the standard Helvetica font."""
+	commands = ["BT"]
+	y = 770
+	for size, line in _lines(data):
+		commands.append(f"/F1 {size} Tf 1 0 0 1 72 {y} Tm ({_pdf_text(line)}) Tj")
+		y -= size + 8
+	commands.append("ET")
+	stream = zlib.compress("\n".join(commands).encode("latin-1"))
+
+	objects = [
+		b"<< /Type /Catalog /Pages 2 0 R >>",
+		b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+		b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+		b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+		b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+		b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream",
+	]
+	output = bytearray(b"%PDF-1.4\n")
+	offsets = []
+	for number, body in enumerate(objects, start=1):
+		offsets.append(len(output))
+		output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+	xref = len(output)
+	output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+	for offset in offsets:
+		output += b"%010d 00000 n \n" % offset
+	output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+	target.write_bytes(bytes(output))
+
+
+def _render_png(data: dict, target: Path) -> None:
+	image = Image.new("RGB", (1240, 1754), "white")
+	draw = ImageDraw.Draw(image)
+	y = 150
+	for size, line in _lines(data):
+		try:
+			font = ImageFont.truetype(CERTIFICATE_FONT, size * 3) if CERTIFICATE_FONT else ImageFont.load_default(size * 3)
+		except (OSError, TypeError):
+			font = ImageFont.load_default()
+		draw.text((150, y), line, fill="black", font=font)
+		y += (size + 8) * 3
+	image.save(target, format="PNG", optimize=True)
+
+
+def png_supported() -> bool:
+	return Image is not None
+
+
+def render_certificate(db: Session, company: CompanyTable, file_format: str = "pdf") -> tuple[Path, str] | None:
+	"""Return the cached certificate for ``company``, rendering it if scores changed."""
+	data = certificate_data(db, company)
+	if data is None:
+		return None
+	version = certificate_version(data)
+	target = certificate_path(company.id, version, file_format)
+	if target.exists():
+		return target, version
+
+	target.parent.mkdir(parents=True, exist_ok=True)
+	partial = target.with_suffix(f".{os.getpid()}.tmp")
+	if file_format == "png":
+		if Image is None:
+			raise RuntimeError("PNG certificates need Pillow installed")
+		_render_png(data, partial)
+	elif canvas is not None:
+		_render_pdf_reportlab(data, partial)
+	else:
+		_render_pdf_builtin(data, partial)
+	partial.replace(target)
+
+	for stale in target.parent.glob(f"*.{file_format}"):
+		if stale != target:
+			stale.unlink(missing_ok=True)
+	return target, version
+
+
+def cached_certificate(db: Session, company: CompanyTable, file_format: str = "pdf") -> tuple[Path | None, str | None]:
+	"""The current version and its file if already rendered, without rendering."""
+	data = certificate_data(db, company)
+	if data is None:
+		return None, None
+	version = certificate_version(data)
+	target = certificate_path(company.id, version, file_format)
+	return (target if target.exists() else None), version
+
+
+def request_render(db: Session, company_id: int, file_format: str = "pdf", created_by: int | None = None):
+	"""Enqueue a render unless one for the same company and format is already pending."""
+	payload = {"company_id": company_id, "format": file_format}
+	return find_pending(db, "render_certificate", payload) or enqueue(
+		db, "render_certificate", payload, created_by=created_by
+	)
+
+
+@job_handler("render_certificate")
+def render_certificate_job(db: Session, payload: dict) -> dict:
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.id == int(payload["company_id"]), CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if company is None:
+		return {"skipped": "company not found"}
+	rendered = render_certificate(db, company, payload.get("format", "pdf"))
+	if rendered is None:
+		return {"skipped": "no submitted results"}
+	path, version = rendered
+	return {"version": version, "bytes": path.stat().st_size}
+
+
+@job_handler("render_certificates")
+def render_certificates_job(db: Session, payload: dict) -> dict:
+	"""Fan out one render job per submitted company so workers share the batch."""
+	file_format = payload.get("format", "pdf")
+	pending = {
+		int(job.payload.get("company_id"))
+		for job in db.query(JobTable).filter(
+			JobTable.kind == "render_certificate", JobTable.status == "queued"
+		)
+		if job.payload.get("format", "pdf") == file_format
+	}
+	enqueued = 0
+	for (company_id,) in (
+		db.query(CompanyScoreSnapshotTable.company_id)
+		.filter(CompanyScoreSnapshotTable.submitted_at.isnot(None))
+		.order_by(CompanyScoreSnapshotTable.company_id.asc())
+	):
+		if company_id not in pending:
+			enqueue(db, "render_certificate", {"company_id": company_id, "format": file_format})
+			enqueued += 1
+	return {"enqueued": enqueued, "already_pending": len(pending)}
@@ -0,0 +1,267 @@
+"""Garbage-collect evidence files that no live evidence row points at.
+
+Files end up orphaned when an upload fails between writing the file and
+committing its row, when ``delete_evidence`` could not remove the object,
+or when a direct upload is never completed. Evidence rows of a deleted
+company assessment also live on, which keeps their files and blocks
+archival of the assessment; those rows are tombstoned first.
+
+The scan lists each backend's ``evidence/`` and ``originals/evidence/``
+keys in sorted order and looks up one batch of keys at a time, so memory
+stays bounded by the batch size however many files there are. A file is
+only removed once it is older than the grace period, which never drops
+below the lifetime of an upload ticket (upload plus completion window).
+``--check-rows`` also walks the live rows by id and reports those whose
+file is missing.
+
+Usage (from backend/):
+
+	python -m service.evidence_gc [--grace-hours 24] [--batch-size 1000] [--dry-run] [--check-rows]
+"""
+
+import argparse
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import and_, exists, func, or_
+from sqlalchemy.orm import Session
+
+from entity.company_assessment import CompanyAssessmentTable
+from entity.evidence import EvidenceTable
+from service.jobs import job_handler
+from service.storage import (
+	STORAGE_BACKEND,
+	UPLOAD_URL_EXPIRES_SECONDS,
+	ObjectInfo,
+	StorageBackend,
+	get_storage,
+	stored_key,
+)
+
+EVIDENCE_GC_GRACE_HOURS = float(os.getenv("EVIDENCE_GC_GRACE_HOURS", "24"))
+EVIDENCE_GC_BATCH_SIZE = int(os.getenv("EVIDENCE_GC_BATCH_SIZE", "1000"))
+EVIDENCE_PREFIX = "evidence/"
+ORIGINALS_PREFIX = "originals/"
+MISSING_SAMPLE_SIZE = 100
+
+logger = logging.getLogger("hicm.evidence")
+
+
+def _cutoff(grace_hours: float) -> datetime:
+	# A ticket's file may be completed up to twice the URL lifetime after issue.
+	grace = max(timedelta(hours=grace_hours), timedelta(seconds=2 * UPLOAD_URL_EXPIRES_SECONDS))
+	return datetime.utcnow() - grace
+
+
+def _detached(cutoff: datetime):
+	"""Live evidence rows with no live (or recently deleted) company assessment."""
+	return and_(
+		EvidenceTable.delete_at.is_(None),
+		~exists().where(
+			CompanyAssessmentTable.id == EvidenceTable.company_assessment_id,
+			or_(CompanyAssessmentTable.delete_at.is_(None), CompanyAssessmentTable.delete_at >= cutoff),
+		),
+	)
+
+
+def tombstone_detached(db: Session, cutoff: datetime, batch_size: int, dry_run: bool = False) -> int:
+	"""Soft-delete evidence of assessments deleted before ``cutoff``; commits per batch."""
+	condition = _detached(cutoff)
+	if dry_run:
+		return db.query(func.count(EvidenceTable.id)).filter(condition).scalar()
+	tombstoned = 0
+	while True:
+		ids = [
+			evidence_id
+			for (evidence_id,) in db.query(EvidenceTable.id)
+			.filter(condition)
+			.order_by(EvidenceTable.id.asc())
+			.limit(batch_size)
+		]
+		if not ids:
+			return tombstoned
+		now = datetime.utcnow()
+		tombstoned += (
+			db.query(EvidenceTable)
+			.filter(EvidenceTable.id.in_(ids), condition)
+			.update({EvidenceTable.delete_at: now, EvidenceTable.updated_at: now}, synchronize_session=False)
+		)
+		db.commit()
+
+
+def _backend_filter(backend: StorageBackend):
+	if backend.name == "local":
+		# Rows written before storage backends existed have no backend and are local.
+		return or_(EvidenceTable.storage_backend == "local", EvidenceTable.storage_backend.is_(None))
+	return EvidenceTable.storage_backend == backend.name
+
+
+def referenced_keys(db: Session, backend: StorageBackend, keys: list[str]) -> set[str]:
+	"""Which of ``keys`` (evidence keys, not originals) a live row in ``backend`` points at."""
+	matches = [EvidenceTable.file_path.in_(keys)]
+	if backend.name == "local":
+		# Legacy rows hold an absolute path ending in the flat evidence/<name> key.
+		matches += [
+			EvidenceTable.file_path.endswith(f"/{key}", autoescape=True) for key in keys if key.count("/") == 1
+		]
+	rows = db.query(EvidenceTable.file_path).filter(
+		EvidenceTable.delete_at.is_(None),
+		_backend_filter(backend),
+		or_(*matches),
+	)
+	return {stored_key(file_path) for (file_path,) in rows}
+
+
+def _batches(objects: Iterator[ObjectInfo], batch_size: int) -> Iterator[list[ObjectInfo]]:
+	batch: list[ObjectInfo] = []
+	for info in objects:
+		batch.append(info)
+		if len(batch) >= batch_size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+def collect_orphans(
+	db: Session,
+	backend: StorageBackend,
+	cutoff: datetime,
+	batch_size: int,
+	dry_run: bool = False,
+) -> dict:
+	"""Delete ``backend`` files older than ``cutoff`` that no live row references."""
+	report = {"files": 0, "bytes": 0, "orphans": 0, "orphan_bytes": 0, "reclaimed_bytes": 0, "errors": 0}
+	for prefix in (EVIDENCE_PREFIX, ORIGINALS_PREFIX + EVIDENCE_PREFIX):
+		for batch in _batches(backend.iter_objects(prefix), batch_size):
+			report["files"] += len(batch)
+			report["bytes"] += sum(info.size for info in batch)
+			candidates = [info for info in batch if info.modified_at is None or info.modified_at < cutoff]
+			if not candidates:
+				continue
+			# A kept original belongs to the evidence key it was copied from.
+			evidence_keys = {info.key: info.key.removeprefix(ORIGINALS_PREFIX) for info in candidates}
+			live = referenced_keys(db, backend, sorted(set(evidence_keys.values())))
+			# End the read transaction so a long scan doesn't hold a snapshot open.
+			db.rollback()
+			for info in candidates:
+				if evidence_keys[info.key] in live:
+					continue
+				report["orphans"] += 1
+				report["orphan_bytes"] += info.size
+				if dry_run:
+					continue
+				try:
+					backend.delete(info.key)
+				except Exception:
+					report["errors"] += 1
+					logger.warning("Could not delete orphaned evidence object %s", info.key, exc_info=True)
+					continue
+				report["reclaimed_bytes"] += info.size
+	return report
+
+
+def find_missing(db: Session, backend: StorageBackend, batch_size: int) -> dict:
+	"""Live rows in ``backend`` whose file no longer exists, by id in batches."""
+	missing, sample, last_id = 0, [], 0
+	while True:
+		rows = (
+			db.query(EvidenceTable.id, EvidenceTable.file_path)
+			.filter(
+				EvidenceTable.id > last_id,
+				EvidenceTable.delete_at.is_(None),
+				EvidenceTable.file_path.isnot(None),
+				_backend_filter(backend),
+			)
+			.order_by(EvidenceTable.id.asc())
+			.limit(batch_size)
+			.all()
+		)
+		db.rollback()
+		if not rows:
+			return {"missing": missing, "missing_ids": sample}
+		for evidence_id, file_path in rows:
+			if backend.stat(stored_key(file_path)) is None:
+				missing += 1
+				if len(sample) < MISSING_SAMPLE_SIZE:
+					sample.append(evidence_id)
+		last_id = rows[-1][0]
+
+
+def backend_names(db: Session) -> list[str]:
+	"""The default backend plus every backend an evidence row was stored in."""
+	names = {"local", STORAGE_BACKEND}
+	names.update(name for (name,) in db.query(EvidenceTable.storage_backend).distinct() if name)
+	db.rollback()
+	return sorted(names)
+
+
+def collect_evidence_garbage(
+	db: Session,
+	grace_hours: float = EVIDENCE_GC_GRACE_HOURS,
+	batch_size: int = EVIDENCE_GC_BATCH_SIZE,
+	dry_run: bool = False,
+	check_rows: bool = False,
+) -> dict:
+	cutoff = _cutoff(grace_hours)
+	report = {
+		"cutoff": cutoff.isoformat(),
+		"dry_run": dry_run,
+		"rows_tombstoned": tombstone_detached(db, cutoff, batch_size, dry_run),
+		"backends": {},
+	}
+	for name in backend_names(db):
+		backend = get_storage(name)
+		backend_report = collect_orphans(db, backend, cutoff, batch_size, dry_run)
+		if check_rows:
+			backend_report.update(find_missing(db, backend, batch_size))
+		report["backends"][name] = backend_report
+	report["reclaimed_bytes"] = sum(item["reclaimed_bytes"] for item in report["backends"].values())
+	return report
+
+
+@job_handler("collect_evidence_garbage")
+def collect_evidence_garbage_job(db: Session, payload: dict) -> dict:
+	return collect_evidence_garbage(
+		db,
+		grace_hours=float(payload.get("grace_hours", EVIDENCE_GC_GRACE_HOURS)),
+		batch_size=int(payload.get("batch_size", EVIDENCE_GC_BATCH_SIZE)),
+		dry_run=bool(payload.get("dry_run", False)),
+		check_rows=bool(payload.get("check_rows", False)),
+	)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--grace-hours", type=float, default=EVIDENCE_GC_GRACE_HOURS)
+	parser.add_argument("--batch-size", type=int, default=EVIDENCE_GC_BATCH_SIZE)
+	parser.add_argument("--dry-run", action="store_true")
+	parser.add_argument("--check-rows", action="store_true", help="also report live rows whose file is missing")
+	args = parser.parse_args()
+
+	from database.database import SessionLocal
+
+	session = SessionLocal()
+	try:
+		report = collect_evidence_garbage(session, args.grace_hours, args.batch_size, args.dry_run, args.check_rows)
+	finally:
+		session.close()
+
+	print(f"cutoff {report['cutoff']}{' (dry run)' if report['dry_run'] else ''}")
+	print(f"{'rows tombstoned':<20} {report['rows_tombstoned']:>10}")
+	for name, item in report["backends"].items():
+		print(
+			f"{name:<20} {item['files']:>10} files {item['bytes']:>14} bytes"
+			f" {item['orphans']:>8} orphans {item['orphan_bytes']:>14} orphan bytes"
+			f" {item['reclaimed_bytes']:>14} reclaimed"
+		)
+		if item["errors"]:
+			print(f"{'':<20} {item['errors']:>10} objects could not be deleted")
+		if "missing" in item:
+			print(f"{'':<20} {item['missing']:>10} rows missing their file {item['missing_ids']}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,204 @@
+"""Optional size optimisation of uploaded evidence, run by the job worker.
+
+With ``EVIDENCE_OPTIMIZE=1`` every new evidence file gets an
+``optimize_evidence`` job, so the work spreads over however many
+``python worker.py`` processes are running instead of the API workers:
+
+* JPEG, PNG and WebP images larger than ``EVIDENCE_IMAGE_MAX_DIMENSION`` are
+  downscaled, and all of them are re-encoded (JPEG at
+  ``EVIDENCE_JPEG_QUALITY``, PNG/WebP losslessly). Needs Pillow.
+* PDFs are rewritten losslessly by pikepdf: streams recompressed, objects
+  packed into object streams, and the file linearised so the first page
+  shows before the rest downloads. Needs pikepdf.
+
+A file is only replaced when the result is smaller, and keeps its key and
+format, so URLs don't change. Files under ``EVIDENCE_OPTIMIZE_MIN_BYTES``
+are left alone. With ``EVIDENCE_KEEP_ORIGINALS=1`` the original is copied
+to ``originals/<key>`` in the same backend first.
+
+Queue jobs for evidence uploaded before this was enabled::
+
+	python -m service.evidence_ingest --backfill
+"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import closing
+from datetime import datetime
+from typing import BinaryIO
+
+from sqlalchemy.orm import Session
+
+from entity.evidence import EvidenceTable
+from service.jobs import enqueue, job_handler
+from service.storage import CHUNK_SIZE, get_storage, stored_key
+
+try:
+	from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow is optional
+	Image = None
+
+try:
+	import pikepdf
+except ImportError:  # pragma: no cover - pikepdf is optional
+	pikepdf = None
+
+EVIDENCE_OPTIMIZE = os.getenv("EVIDENCE_OPTIMIZE", "0") == "1"
+EVIDENCE_KEEP_ORIGINALS = os.getenv("EVIDENCE_KEEP_ORIGINALS", "0") == "1"
+EVIDENCE_OPTIMIZE_MIN_BYTES = int(os.getenv("EVIDENCE_OPTIMIZE_MIN_BYTES", str(256 * 1024)))
+EVIDENCE_IMAGE_MAX_DIMENSION = int(os.getenv("EVIDENCE_IMAGE_MAX_DIMENSION", "2560"))
+EVIDENCE_JPEG_QUALITY = int(os.getenv("EVIDENCE_JPEG_QUALITY", "85"))
+BACKFILL_BATCH_SIZE = 500
+
+IMAGE_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+logger = logging.getLogger("hicm.evidence")
+
+
+def request_optimization(db: Session, evidence: EvidenceTable) -> None:
+	"""Queue ``evidence`` for optimisation in the caller's transaction, when enabled."""
+	if EVIDENCE_OPTIMIZE:
+		enqueue(db, "optimize_evidence", {"evidence_id": evidence.id})
+
+
+def _optimize_image(source: BinaryIO, target: BinaryIO) -> str | None:
+	"""Write a downscaled/re-encoded copy of ``source``; returns its content type or None to skip."""
+	if Image is None:
+		return None
+	try:
+		with Image.open(source) as image:
+			image_format = image.format
+			if image_format not in IMAGE_FORMATS or getattr(image, "is_animated", False):
+				return None
+			# Phone photos are often stored sideways with an EXIF rotation.
+			image = ImageOps.exif_transpose(image)
+			image.thumbnail((EVIDENCE_IMAGE_MAX_DIMENSION, EVIDENCE_IMAGE_MAX_DIMENSION), Image.LANCZOS)
+			if image_format == "JPEG":
+				if image.mode not in ("RGB", "L", "CMYK"):
+					image = image.convert("RGB")
+				image.save(target, "JPEG", quality=EVIDENCE_JPEG_QUALITY, optimize=True, progressive=True)
+			elif image_format == "PNG":
+				image.save(target, "PNG", optimize=True)
+			else:
+				image.save(target, "WEBP", lossless=True, method=6)
+	except (Image.DecompressionBombError, OSError, SyntaxError, ValueError) as error:
+		logger.info("Skipping image that Pillow can't rewrite: %s", error)
+		return None
+	return IMAGE_FORMATS[image_format]
+
+
+def _optimize_pdf(source: BinaryIO, target: BinaryIO) -> str | None:
+	if pikepdf is None:
+		return None
+	try:
+		with pikepdf.open(source) as pdf:
+			pdf.remove_unreferenced_resources()
+			pdf.save(
+				target,
+				linearize=True,
+				compress_streams=True,
+				recompress_flate=True,
+				object_stream_mode=pikepdf.ObjectStreamMode.generate,
+			)
+	except pikepdf.PdfError as error:
+		logger.info("Skipping PDF that pikepdf can't rewrite: %s", error)
+		return None
+	return "application/pdf"
+
+
+def optimize_file(source: BinaryIO, target: BinaryIO) -> str | None:
+	"""Dispatch on the file's magic bytes; returns the content type written to ``target``."""
+	head = source.read(8)
+	source.seek(0)
+	if head.startswith(b"%PDF"):
+		return _optimize_pdf(source, target)
+	return _optimize_image(source, target)
+
+
+def optimize_evidence(db: Session, evidence_id: int) -> dict:
+	evidence = (
+		db.query(EvidenceTable)
+		.filter(EvidenceTable.id == evidence_id, EvidenceTable.delete_at.is_(None))
+		.first()
+	)
+	if evidence is None:
+		return {"skipped": "evidence not found"}
+	if evidence.optimized_at is not None:
+		return {"skipped": "already optimized"}
+	key = stored_key(evidence.file_path)
+	if not key:
+		return {"skipped": "no file"}
+	backend = get_storage(evidence.storage_backend or "local")
+	info = backend.stat(key)
+	if info is None:
+		return {"skipped": "file missing"}
+
+	result = {"key": key, "original_bytes": info.size, "stored_bytes": info.size}
+	if info.size >= EVIDENCE_OPTIMIZE_MIN_BYTES:
+		# Spooled to temp files, so large scans don't sit in the worker's memory.
+		with tempfile.TemporaryFile() as original, tempfile.TemporaryFile() as optimized:
+			with closing(backend.open(key)) as stream:
+				shutil.copyfileobj(stream, original, CHUNK_SIZE)
+			original.seek(0)
+			content_type = optimize_file(original, optimized)
+			optimized_bytes = optimized.tell()
+			db.refresh(evidence)
+			if evidence.delete_at is not None:
+				return {"skipped": "evidence deleted"}
+			if content_type and 0 < optimized_bytes < info.size:
+				if EVIDENCE_KEEP_ORIGINALS:
+					original.seek(0)
+					backend.save(f"originals/{key}", original, content_type)
+				optimized.seek(0)
+				backend.save(key, optimized, content_type)
+				result["stored_bytes"] = optimized_bytes
+				result["content_type"] = content_type
+
+	evidence.optimized_at = datetime.utcnow()
+	return result
+
+
+@job_handler("optimize_evidence")
+def optimize_evidence_job(db: Session, payload: dict) -> dict:
+	return optimize_evidence(db, int(payload["evidence_id"]))
+
+
+def backfill(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+	"""Queue a job for every live, not yet optimised evidence row; commits per batch."""
+	queued = 0
+	last_id = 0
+	while True:
+		ids = [
+			evidence_id
+			for (evidence_id,) in db.query(EvidenceTable.id)
+			.filter(
+				EvidenceTable.id > last_id,
+				EvidenceTable.delete_at.is_(None),
+				EvidenceTable.optimized_at.is_(None),
+			)
+			.order_by(EvidenceTable.id.asc())
+			.limit(batch_size)
+		]
+		if not ids:
+			return queued
+		for evidence_id in ids:
+			enqueue(db, "optimize_evidence", {"evidence_id": evidence_id})
+		db.commit()
+		queued += len(ids)
+		last_id = ids[-1]
+
+
+if __name__ == "__main__":
+	if "--backfill" not in sys.argv:
+		raise SystemExit("Usage: python -m service.evidence_ingest --backfill")
+
+	from database.database import SessionLocal
+
+	session = SessionLocal()
+	try:
+		print(f"Queued {backfill(session)} optimize_evidence jobs")
+	finally:
+		session.close()
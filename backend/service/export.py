@@ -0,0 +1,386 @@
+"""Streaming export of every company answer with its auditor score.
+
+One row per company x question, read through a single server-side cursor
+(``yield_per``) and encoded incrementally as CSV or XLSX, so memory stays
+flat however many companies are exported. The export opens its own read
+session because the response body is produced after the request's
+dependencies have been torn down.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from sqlalchemy import and_, exists, func, literal, select
+from sqlalchemy.orm import aliased
+
+from database.database import ReadSessionLocal
+from entity.assessment import AssessmentTable
+from entity.auditor_score import AuditorScoreTable
+from entity.company import CompanyTable
+from entity.company_assessment import CompanyAssessmentTable
+from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.company_submit import CompanySubmitTable
+from entity.evaluation_criteria import EvaluationCriteriaTable
+from entity.pillars import PillarsTable
+from entity.point import PointTable
+from service.scoring import map_point_to_score
+
+EXPORT_BATCH_SIZE = 2000
+# Excel's per-sheet row limit, header row included.
+XLSX_MAX_ROWS = 1_048_576
+
+# Control characters are not allowed in XML even when escaped.
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+COLUMNS = (
+	"company_id",
+	"company_name",
+	"type_company",
+	"number_of_employees",
+	"round_assessment",
+	"assessment_round",
+	"pillar_key",
+	"pillar_name",
+	"assessment_id",
+	"question",
+	"company_answer",
+	"company_point",
+	"company_score",
+	"performance_results",
+	"auditor_id",
+	"auditor_answer",
+	"auditor_point",
+	"auditor_score",
+	"pillar_score",
+)
+
+
+def export_statement(
+	round_assessment: str | None = None,
+	pillar_key: str | None = None,
+	submitted_only: bool = True,
+	assessment_round: int | None = None,
+):
+	"""Rows for one assessment round per company.
+
+	That is ``assessment_round`` when given; otherwise the latest submitted
+	round with ``submitted_only``, or the open round (drafts included)
+	without it. A company that has moved on to a new round keeps exporting
+	its last submitted answers until it submits again.
+	"""
+	company_criteria = aliased(EvaluationCriteriaTable)
+	company_point = aliased(PointTable)
+	auditor_criteria = aliased(EvaluationCriteriaTable)
+	auditor_point = aliased(PointTable)
+
+	# Latest live auditor score per answer.
+	ranked_scores = (
+		select(
+			AuditorScoreTable.company_assessment_id,
+			AuditorScoreTable.auditor_id,
+			AuditorScoreTable.evaluation_criteria_id,
+			func.row_number()
+			.over(
+				partition_by=AuditorScoreTable.company_assessment_id,
+				order_by=(AuditorScoreTable.updated_at.desc(), AuditorScoreTable.id.desc()),
+			)
+			.label("rank"),
+		)
+		.where(AuditorScoreTable.delete_at.is_(None))
+		.subquery()
+	)
+
+	latest_submit = None
+	if assessment_round is not None:
+		export_round = literal(assessment_round)
+	elif submitted_only:
+		latest_submit = (
+			select(
+				CompanySubmitTable.company_id,
+				func.max(CompanySubmitTable.assessment_round).label("assessment_round"),
+			)
+			.where(CompanySubmitTable.delete_at.is_(None))
+			.group_by(CompanySubmitTable.company_id)
+			.subquery()
+		)
+		export_round = latest_submit.c.assessment_round
+	else:
+		export_round = CompanyTable.current_round
+
+	statement = (
+		select(
+			CompanyTable.id,
+			CompanyTable.company_name,
+			CompanyTable.type_company,
+			CompanyTable.Number_of_employees,
+			CompanyTable.round_assessment,
+			export_round,
+			PillarsTable.key,
+			PillarsTable.name,
+			AssessmentTable.id,
+			AssessmentTable.title,
+			company_criteria.name,
+			company_point.score,
+			CompanyAssessmentTable.performance_results,
+			ranked_scores.c.auditor_id,
+			auditor_criteria.name,
+			auditor_point.score,
+			CompanyAssessmentResultTable.score,
+		)
+		.select_from(CompanyTable)
+	)
+	if latest_submit is not None:
+		statement = statement.join(latest_submit, latest_submit.c.company_id == CompanyTable.id)
+	statement = (
+		# Every company x every live question; unanswered questions get empty answer columns.
+		statement.join(AssessmentTable, AssessmentTable.delete_at.is_(None))
+		.join(PillarsTable, PillarsTable.id == AssessmentTable.pillar_id)
+		.outerjoin(
+			CompanyAssessmentTable,
+			and_(
+				CompanyAssessmentTable.company_id == CompanyTable.id,
+				CompanyAssessmentTable.assessment_id == AssessmentTable.id,
+				CompanyAssessmentTable.assessment_round == export_round,
+				CompanyAssessmentTable.delete_at.is_(None),
+			),
+		)
+		.outerjoin(company_criteria, company_criteria.id == CompanyAssessmentTable.evaluation_criteria_id)
+		.outerjoin(company_point, company_point.id == company_criteria.point_id)
+		.outerjoin(
+			ranked_scores,
+			and_(
+				ranked_scores.c.company_assessment_id == CompanyAssessmentTable.id,
+				ranked_scores.c.rank == 1,
+			),
+		)
+		.outerjoin(auditor_criteria, auditor_criteria.id == ranked_scores.c.evaluation_criteria_id)
+		.outerjoin(auditor_point, auditor_point.id == auditor_criteria.point_id)
+		.outerjoin(
+			CompanyAssessmentResultTable,
+			and_(
+				CompanyAssessmentResultTable.company_id == CompanyTable.id,
+				CompanyAssessmentResultTable.pillar_id == PillarsTable.id,
+				CompanyAssessmentResultTable.assessment_round == export_round,
+				CompanyAssessmentResultTable.delete_at.is_(None),
+			),
+		)
+		.where(CompanyTable.delete_at.is_(None), PillarsTable.delete_at.is_(None))
+		.order_by(CompanyTable.id.asc(), PillarsTable.id.asc(), AssessmentTable.id.asc())
+	)
+	if submitted_only and latest_submit is None:
+		statement = statement.where(
+			exists().where(
+				CompanySubmitTable.company_id == CompanyTable.id,
+				CompanySubmitTable.assessment_round == export_round,
+				CompanySubmitTable.delete_at.is_(None),
+			)
+		)
+	if round_assessment is not None:
+		statement = statement.where(CompanyTable.round_assessment == round_assessment)
+	if pillar_key is not None:
+		statement = statement.where(PillarsTable.key == pillar_key)
+	return statement
+
+
+def iter_export_rows(**filters) -> Iterator[tuple]:
+	"""Yield export rows from a dedicated read session, ``EXPORT_BATCH_SIZE`` at a time."""
+	db = ReadSessionLocal()
+	try:
+		result = db.execute(
+			export_statement(**filters),
+			execution_options={"yield_per": EXPORT_BATCH_SIZE},
+		)
+		for row in result:
+			(
+				company_id, company_name, type_company, employees, round_assessment, export_round,
+				pillar_key, pillar_name, assessment_id, question,
+				company_answer, company_point, performance_results,
+				auditor_id, auditor_answer, auditor_point, pillar_score,
+			) = row
+			yield (
+				company_id,
+				company_name,
+				type_company,
+				employees,
+				round_assessment,
+				export_round,
+				pillar_key,
+				pillar_name,
+				assessment_id,
+				question,
+				company_answer,
+				company_point,
+				map_point_to_score(company_point) if company_point is not None else None,
+				performance_results,
+				auditor_id,
+				auditor_answer,
+				auditor_point,
+				map_point_to_score(auditor_point) if auditor_point is not None else None,
+				round(pillar_score, 2) if pillar_score is not None else None,
+			)
+	finally:
+		db.close()
+
+
+def stream_csv(rows: Iterable[tuple], batch_size: int = 500) -> Iterator[bytes]:
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	# BOM so Excel opens the UTF-8 (Thai) text correctly.
+	buffer.write("\ufeff")
+	writer.writerow(COLUMNS)
+	pending = 0
+	for row in rows:
+		writer.writerow(row)
+		pending += 1
+		if pending >= batch_size:
+			yield buffer.getvalue().encode("utf-8")
+			buffer.seek(0)
+			buffer.truncate()
+			pending = 0
+	yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+	"""Write-only, non-seekable file that hands written bytes back in chunks."""
+
+	def __init__(self) -> None:
+		self._chunks: list[bytes] = []
+
+	def writable(self) -> bool:
+		return True
+
+	def write(self, data) -> int:
+		self._chunks.append(bytes(data))
+		return len(data)
+
+	def drain(self) -> bytes:
+		data = b"".join(self._chunks)
+		self._chunks.clear()
+		return data
+
+
+def _column_letter(index: int) -> str:
+	letters = ""
+	index += 1
+	while index:
+		index, remainder = divmod(index - 1, 26)
+		letters = chr(65 + remainder) + letters
+	return letters
+
+
+def _xlsx_row(number: int, values: Iterable) -> str:
+	cells = []
+	for index, value in enumerate(values):
+		if value is None:
+			continue
+		reference = f"{_column_letter(index)}{number}"
+		if isinstance(value, bool):
+			cells.append(f'<c r="{reference}" t="b"><v>{int(value)}</v></c>')
+		elif isinstance(value, (int, float)):
+			cells.append(f'<c r="{reference}"><v>{value}</v></c>')
+		else:
+			text = escape(_XML_ILLEGAL.sub("", str(value)))
+			cells.append(f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+	return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+_SHEET_HEADER = (
+	'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+	'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+	'<sheetData>'
+)
+_SHEET_FOOTER = "</sheetData></worksheet>"
+
+
+def stream_xlsx(rows: Iterable[tuple], batch_size: int = 500) -> Iterator[bytes]:
+	"""Write a minimal XLSX (inline strings, no styles), starting a new sheet at Excel's row limit."""
+	sink = _ChunkSink()
+	archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+	sheets = 0
+	sheet = None
+	row_number = 0
+	pending = 0
+
+	def open_sheet():
+		nonlocal sheets, row_number
+		sheets += 1
+		handle = archive.open(f"xl/worksheets/sheet{sheets}.xml", mode="w", force_zip64=True)
+		handle.write(_SHEET_HEADER.encode("utf-8"))
+		handle.write(_xlsx_row(1, COLUMNS).encode("utf-8"))
+		row_number = 1
+		return handle
+
+	sheet = open_sheet()
+	for row in rows:
+		if row_number >= XLSX_MAX_ROWS:
+			sheet.write(_SHEET_FOOTER.encode("utf-8"))
+			sheet.close()
+			sheet = open_sheet()
+		row_number += 1
+		sheet.write(_xlsx_row(row_number, row).encode("utf-8"))
+		pending += 1
+		if pending >= batch_size:
+			pending = 0
+			chunk = sink.drain()
+			if chunk:
+				yield chunk
+	sheet.write(_SHEET_FOOTER.encode("utf-8"))
+	sheet.close()
+
+	sheet_entries = "".join(
+		f'<sheet name="Results {index}" sheetId="{index}" r:id="rId{index}"/>'
+		for index in range(1, sheets + 1)
+	)
+	archive.writestr(
+		"xl/workbook.xml",
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+		'<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+		'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+		f"<sheets>{sheet_entries}</sheets></workbook>",
+	)
+	relationships = "".join(
+		f'<Relationship Id="rId{index}" '
+		'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+		f'Target="worksheets/sheet{index}.xml"/>'
+		for index in range(1, sheets + 1)
+	)
+	archive.writestr(
+		"xl/_rels/workbook.xml.rels",
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+		'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+		f"{relationships}</Relationships>",
+	)
+	archive.writestr(
+		"_rels/.rels",
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+		'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+		'<Relationship Id="rId1" '
+		'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+		'Target="xl/workbook.xml"/></Relationships>',
+	)
+	overrides = "".join(
+		f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+		'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+		for index in range(1, sheets + 1)
+	)
+	archive.writestr(
+		"[Content_Types].xml",
+		'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+		'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+		'<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+		'<Default Extension="xml" ContentType="application/xml"/>'
+		'<Override PartName="/xl/workbook.xml" '
+		'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+		f"{overrides}</Types>",
+	)
+	archive.close()
+	yield sink.drain()
+
+
+def export_filename(file_format: str) -> str:
+	return f"hicm-results-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{file_format}"
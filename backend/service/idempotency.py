@@ -0,0 +1,253 @@
+"""Stored responses for requests sent with an ``Idempotency-Key`` header.
+
+The first request with a key claims a row in ``idempotency_keys``; when it
+finishes, its status, headers and body are written to that row and to a
+bounded in-process cache. A retry with the same key and the same request
+fingerprint gets the stored response back without running the endpoint.
+Keys are scoped per user and expire after ``IDEMPOTENCY_TTL_SECONDS``.
+
+Expired rows are purged with the ``purge_idempotency_keys`` job or::
+
+	python -m service.idempotency --purge
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from entity.idempotency_key import IdempotencyKeyTable
+from service.jobs import job_handler
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# A claim older than this belongs to a request that died; a retry may take it over.
+IDEMPOTENCY_CLAIM_SECONDS = float(os.getenv("IDEMPOTENCY_CLAIM_SECONDS", "60"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# Larger responses are not stored; their key is released so a retry runs again.
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", "262144"))
+
+CLAIMED = "claimed"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+
+
+@dataclass
+class StoredResponse:
+	fingerprint: str
+	status_code: int
+	headers: list[tuple[str, str]]
+	body: bytes
+	expires_at: float
+
+
+@dataclass
+class ClaimResult:
+	outcome: str
+	row_id: int | None = None
+	response: StoredResponse | None = None
+
+
+class ResponseCache:
+	"""LRU of finished responses by ``(user_id, key)``, dropping entries past their expiry."""
+
+	def __init__(self, max_entries: int) -> None:
+		self.max_entries = max_entries
+		self._entries: OrderedDict[tuple[int, str], StoredResponse] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, user_id: int, key: str) -> StoredResponse | None:
+		with self._lock:
+			entry = self._entries.get((user_id, key))
+			if entry is None:
+				return None
+			if entry.expires_at <= time.time():
+				del self._entries[(user_id, key)]
+				return None
+			self._entries.move_to_end((user_id, key))
+			return entry
+
+	def put(self, user_id: int, key: str, response: StoredResponse) -> None:
+		if self.max_entries <= 0:
+			return
+		with self._lock:
+			self._entries[(user_id, key)] = response
+			self._entries.move_to_end((user_id, key))
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+
+response_cache = ResponseCache(IDEMPOTENCY_CACHE_SIZE)
+
+
+def _stored_response(row: IdempotencyKeyTable) -> StoredResponse:
+	return StoredResponse(
+		fingerprint=row.fingerprint or "",
+		status_code=row.status_code,
+		headers=[(name, value) for name, value in row.response_headers or []],
+		body=row.response_body or b"",
+		expires_at=time.time() + max((row.expires_at - datetime.utcnow()).total_seconds(), 0),
+	)
+
+
+def _take_over(db: Session, row: IdempotencyKeyTable, method: str, path: str, now: datetime) -> bool:
+	"""Re-claim an expired row or an abandoned claim, unless another retry got there first."""
+	taken = (
+		db.query(IdempotencyKeyTable)
+		.filter(
+			IdempotencyKeyTable.id == row.id,
+			IdempotencyKeyTable.created_at == row.created_at,
+		)
+		.update(
+			{
+				IdempotencyKeyTable.method: method,
+				IdempotencyKeyTable.path: path,
+				IdempotencyKeyTable.fingerprint: None,
+				IdempotencyKeyTable.status_code: None,
+				IdempotencyKeyTable.response_headers: None,
+				IdempotencyKeyTable.response_body: None,
+				IdempotencyKeyTable.created_at: now,
+				IdempotencyKeyTable.expires_at: now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+			},
+			synchronize_session=False,
+		)
+	)
+	db.commit()
+	return taken == 1
+
+
+def claim(user_id: int, key: str, method: str, path: str) -> ClaimResult:
+	"""Claim ``key`` for a new request, or return the finished response to replay."""
+	cached = response_cache.get(user_id, key)
+	if cached is not None:
+		return ClaimResult(REPLAY, response=cached)
+
+	db = SessionLocal()
+	try:
+		now = datetime.utcnow()
+		row = IdempotencyKeyTable(
+			user_id=user_id,
+			key=key,
+			method=method,
+			path=path,
+			created_at=now,
+			expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+		)
+		db.add(row)
+		try:
+			db.commit()
+			return ClaimResult(CLAIMED, row_id=row.id)
+		except IntegrityError:
+			db.rollback()
+
+		existing = (
+			db.query(IdempotencyKeyTable)
+			.filter(IdempotencyKeyTable.user_id == user_id, IdempotencyKeyTable.key == key)
+			.first()
+		)
+		if existing is None:
+			# Purged between the insert and the lookup; the caller retries as in-progress.
+			return ClaimResult(IN_PROGRESS)
+		if existing.expires_at <= now:
+			if _take_over(db, existing, method, path, now):
+				return ClaimResult(CLAIMED, row_id=existing.id)
+			return ClaimResult(IN_PROGRESS)
+		if existing.status_code is not None:
+			stored = _stored_response(existing)
+			response_cache.put(user_id, key, stored)
+			return ClaimResult(REPLAY, response=stored)
+		if existing.created_at <= now - timedelta(seconds=IDEMPOTENCY_CLAIM_SECONDS):
+			if _take_over(db, existing, method, path, now):
+				return ClaimResult(CLAIMED, row_id=existing.id)
+		return ClaimResult(IN_PROGRESS)
+	finally:
+		db.close()
+
+
+def complete(
+	row_id: int,
+	user_id: int,
+	key: str,
+	fingerprint: str,
+	status_code: int,
+	headers: list[tuple[str, str]],
+	body: bytes,
+) -> None:
+	"""Store the finished response for the claim ``row_id`` and cache it."""
+	db = SessionLocal()
+	try:
+		expires_at = datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+		db.query(IdempotencyKeyTable).filter(IdempotencyKeyTable.id == row_id).update(
+			{
+				IdempotencyKeyTable.fingerprint: fingerprint,
+				IdempotencyKeyTable.status_code: status_code,
+				IdempotencyKeyTable.response_headers: [list(header) for header in headers],
+				IdempotencyKeyTable.response_body: body,
+				IdempotencyKeyTable.expires_at: expires_at,
+			},
+			synchronize_session=False,
+		)
+		db.commit()
+	finally:
+		db.close()
+	response_cache.put(
+		user_id,
+		key,
+		StoredResponse(
+			fingerprint=fingerprint,
+			status_code=status_code,
+			headers=headers,
+			body=body,
+			expires_at=time.time() + IDEMPOTENCY_TTL_SECONDS,
+		),
+	)
+
+
+def release(row_id: int) -> None:
+	"""Drop an unfinished claim so the next retry runs the request again."""
+	db = SessionLocal()
+	try:
+		db.query(IdempotencyKeyTable).filter(
+			IdempotencyKeyTable.id == row_id,
+			IdempotencyKeyTable.status_code.is_(None),
+		).delete(synchronize_session=False)
+		db.commit()
+	finally:
+		db.close()
+
+
+def purge_expired(db: Session) -> int:
+	"""Delete expired keys; the caller commits."""
+	return (
+		db.query(IdempotencyKeyTable)
+		.filter(IdempotencyKeyTable.expires_at < datetime.utcnow())
+		.delete(synchronize_session=False)
+	)
+
+
+@job_handler("purge_idempotency_keys")
+def purge_idempotency_keys_job(db: Session, payload: dict) -> dict:
+	return {"deleted": purge_expired(db)}
+
+
+if __name__ == "__main__":
+	if "--purge" not in sys.argv:
+		raise SystemExit("Usage: python -m service.idempotency --purge")
+
+	session = SessionLocal()
+	try:
+		deleted = purge_expired(session)
+		session.commit()
+	finally:
+		session.close()
+	print(f"Deleted {deleted} expired idempotency keys")
@@ -0,0 +1,312 @@
+"""Persistent job queue stored in the ``jobs`` table.
+
+Jobs are enqueued inside the caller's transaction, so they exist only if
+the request's own writes commit. Workers (``python worker.py``) claim one
+job at a time with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of
+worker processes on the box can share the table without a broker. A
+handler's writes and the job's ``succeeded`` status commit together;
+failures are retried with exponential backoff up to ``max_attempts``.
+
+Handlers may run more than once (e.g. after a worker is killed mid-job and
+its lock expires), so they should be idempotent.
+"""
+
+import importlib
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from entity.job import JobTable
+
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+# Running jobs whose lock is older than this are assumed orphaned and requeued.
+JOB_LOCK_TIMEOUT_SECONDS = float(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "900"))
+# How often a worker renews the lock of the job it is running; kept well under the timeout.
+JOB_HEARTBEAT_SECONDS = min(
+	float(os.getenv("JOB_HEARTBEAT_SECONDS", "60")), JOB_LOCK_TIMEOUT_SECONDS / 3
+)
+
+logger = logging.getLogger("hicm.jobs")
+
+# Modules whose @job_handler functions the API and worker both register.
+JOB_MODULES = (
+	"service.analytics",
+	"service.archival",
+	"service.certificates",
+	"service.evidence_gc",
+	"service.evidence_ingest",
+	"service.idempotency",
+	"service.progress",
+	"service.scoring",
+)
+
+JobHandler = Callable[[Session, dict], Any]
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+	"""Register ``func(db, payload)`` as the handler for jobs of ``kind``."""
+
+	def register(func: JobHandler) -> JobHandler:
+		_handlers[kind] = func
+		return func
+
+	return register
+
+
+def load_handlers() -> None:
+	for module in JOB_MODULES:
+		importlib.import_module(module)
+
+
+def registered_kinds() -> list[str]:
+	return sorted(_handlers)
+
+
+def enqueue(
+	db: Session,
+	kind: str,
+	payload: dict | None = None,
+	run_after: datetime | None = None,
+	max_attempts: int = 3,
+	created_by: int | None = None,
+) -> JobTable:
+	"""Add a job in the caller's transaction; it becomes visible on commit."""
+	job = JobTable(
+		kind=kind,
+		payload=payload or {},
+		status="queued",
+		max_attempts=max_attempts,
+		run_after=run_after or datetime.utcnow(),
+		created_by=created_by,
+	)
+	db.add(job)
+	db.flush()
+	return job
+
+
+def find_pending(db: Session, kind: str, payload: dict) -> JobTable | None:
+	"""A queued job of ``kind`` with exactly ``payload``, if any."""
+	pending = (
+		db.query(JobTable)
+		.filter(JobTable.kind == kind, JobTable.status == "queued")
+		.order_by(JobTable.id.asc())
+		.limit(500)
+		.all()
+	)
+	return next((job for job in pending if job.payload == payload), None)
+
+
+def requeue_stale(db: Session) -> int:
+	cutoff = datetime.utcnow() - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)
+	count = (
+		db.query(JobTable)
+		.filter(JobTable.status == "running", JobTable.locked_at < cutoff)
+		.update(
+			{"status": "queued", "locked_at": None, "locked_by": None, "last_error": "lock expired"},
+			synchronize_session=False,
+		)
+	)
+	db.commit()
+	return count
+
+
+def claim_next(db: Session, worker_id: str, kinds: list[str] | None = None) -> int | None:
+	"""Mark the oldest runnable job as running and return its id."""
+	query = (
+		db.query(JobTable)
+		.filter(JobTable.status == "queued", JobTable.run_after <= datetime.utcnow())
+		.order_by(JobTable.run_after.asc(), JobTable.id.asc())
+		.with_for_update(skip_locked=True)
+	)
+	if kinds:
+		query = query.filter(JobTable.kind.in_(kinds))
+	job = query.first()
+	if job is None:
+		db.rollback()
+		return None
+	job.status = "running"
+	job.attempts += 1
+	job.locked_at = datetime.utcnow()
+	job.locked_by = worker_id
+	db.commit()
+	return job.id
+
+
+def heartbeat(session_factory: Callable[[], Session], job_id: int, worker_id: str) -> bool:
+	"""Renew ``worker_id``'s lock on a running job; False once the job was requeued to someone else."""
+	db = session_factory()
+	try:
+		renewed = (
+			db.query(JobTable)
+			.filter(JobTable.id == job_id, JobTable.status == "running", JobTable.locked_by == worker_id)
+			.update({"locked_at": datetime.utcnow()}, synchronize_session=False)
+		)
+		db.commit()
+		return renewed == 1
+	finally:
+		db.close()
+
+
+class _Heartbeat:
+	"""Renew a job's lock from a background thread while its handler runs."""
+
+	def __init__(self, session_factory: Callable[[], Session], job_id: int, worker_id: str) -> None:
+		self.session_factory = session_factory
+		self.job_id = job_id
+		self.worker_id = worker_id
+		self._stopped = threading.Event()
+		self._thread = threading.Thread(target=self._run, name=f"job-{job_id}-heartbeat", daemon=True)
+
+	def _run(self) -> None:
+		while not self._stopped.wait(JOB_HEARTBEAT_SECONDS):
+			try:
+				if not heartbeat(self.session_factory, self.job_id, self.worker_id):
+					logger.warning("Job %s lost its lock while running", self.job_id)
+					return
+			except Exception:
+				logger.warning("Could not renew the lock of job %s", self.job_id, exc_info=True)
+
+	def __enter__(self) -> "_Heartbeat":
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self._stopped.set()
+		self._thread.join()
+
+
+def _still_owned(db: Session, job: JobTable, worker_id: str) -> bool:
+	# Row lock, so a concurrent requeue_stale can't slip in before the outcome commits.
+	db.refresh(job, with_for_update=True)
+	return job.status == "running" and job.locked_by == worker_id
+
+
+def run_job(session_factory: Callable[[], Session], job_id: int, worker_id: str) -> str:
+	"""Run a job claimed by ``worker_id`` and record the outcome; returns the final status.
+
+	A job requeued and claimed elsewhere meanwhile (its lock expired) is left
+	to its new owner: this run's outcome is discarded and "lost" returned.
+	"""
+	db = session_factory()
+	try:
+		job = db.get(JobTable, job_id)
+		handler = _handlers.get(job.kind)
+		try:
+			if handler is None:
+				raise LookupError(f"No handler registered for job kind {job.kind!r}")
+			with _Heartbeat(session_factory, job_id, worker_id):
+				result = handler(db, dict(job.payload or {}))
+			if not _still_owned(db, job, worker_id):
+				db.rollback()
+				logger.warning("Job %s finished after losing its lock; discarding the outcome", job_id)
+				return "lost"
+			job.status = "succeeded"
+			job.result = json.loads(json.dumps(result, default=str)) if result is not None else None
+			job.last_error = None
+			job.locked_at = None
+			job.finished_at = datetime.utcnow()
+			db.commit()
+			return job.status
+		except Exception:
+			error = traceback.format_exc(limit=5)
+			db.rollback()
+			logger.exception("Job %s (%s) failed", job_id, job.kind)
+	finally:
+		db.close()
+
+	return _record_failure(session_factory, job_id, worker_id, error)
+
+
+def _record_failure(session_factory: Callable[[], Session], job_id: int, worker_id: str, error: str) -> str:
+	db = session_factory()
+	try:
+		job = db.get(JobTable, job_id)
+		if not _still_owned(db, job, worker_id):
+			db.rollback()
+			return "lost"
+		job.last_error = error
+		job.locked_at = None
+		if job.attempts >= job.max_attempts:
+			job.status = "failed"
+			job.finished_at = datetime.utcnow()
+		else:
+			job.status = "queued"
+			job.run_after = datetime.utcnow() + timedelta(
+				seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+			)
+		db.commit()
+		return job.status
+	finally:
+		db.close()
+
+
+def retry(db: Session, job: JobTable) -> JobTable:
+	"""Put a failed job back in the queue with a fresh attempt budget."""
+	job.status = "queued"
+	job.attempts = 0
+	job.run_after = datetime.utcnow()
+	job.finished_at = None
+	job.locked_at = None
+	job.locked_by = None
+	return job
+
+
+def queue_depth(db: Session) -> dict[str, int]:
+	return dict(db.query(JobTable.status, func.count(JobTable.id)).group_by(JobTable.status).all())
+
+
+class Worker:
+	"""Claim and run jobs until stopped; one job at a time per worker."""
+
+	def __init__(
+		self,
+		session_factory: Callable[[], Session],
+		kinds: list[str] | None = None,
+		worker_id: str | None = None,
+	) -> None:
+		self.session_factory = session_factory
+		self.kinds = kinds
+		self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+		self._stopped = threading.Event()
+
+	def stop(self) -> None:
+		self._stopped.set()
+
+	def run_once(self) -> bool:
+		"""Run one job if one is ready; returns False when the queue is empty."""
+		db = self.session_factory()
+		try:
+			job_id = claim_next(db, self.worker_id, self.kinds)
+		finally:
+			db.close()
+		if job_id is None:
+			return False
+		status = run_job(self.session_factory, job_id, self.worker_id)
+		logger.info("Job %s finished with status %s", job_id, status)
+		return True
+
+	def run_forever(self) -> None:
+		last_sweep = 0.0
+		while not self._stopped.is_set():
+			now = datetime.utcnow().timestamp()
+			if now - last_sweep >= 60:
+				db = self.session_factory()
+				try:
+					requeued = requeue_stale(db)
+					if requeued:
+						logger.warning("Requeued %s jobs with expired locks", requeued)
+				finally:
+					db.close()
+				last_sweep = now
+			if not self.run_once():
+				self._stopped.wait(JOB_POLL_SECONDS)
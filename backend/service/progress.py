@@ -0,0 +1,188 @@
+"""Per-company progress counters for the open assessment round.
+
+``company_progress`` holds how many questions a company has answered (in
+total and per pillar), how many live questions there are, and when it
+submitted. The writers keep it current in their own transaction:
+
+* auto-save applies the answered delta (``record_answers``),
+* the summary submit stamps ``submitted_at`` (``record_submit``),
+* questionnaire builder/import changes refresh every row's totals
+  (``refresh_totals``),
+* opening a new round resets the counts (``reset_round``).
+
+"Answered" keeps the meaning the status endpoint always had: live answers
+of the open round that have a criterion selected.
+
+Recount every company and fix drift (also available as the
+``rebuild_progress`` job)::
+
+	python -m service.progress --rebuild
+"""
+
+import sys
+from datetime import datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from entity.assessment import AssessmentTable
+from entity.company import CompanyTable
+from entity.company_assessment import CompanyAssessmentTable
+from entity.company_progress import CompanyProgressTable
+from entity.company_submit import CompanySubmitTable
+from service.jobs import job_handler
+
+
+def question_totals(db: Session) -> tuple[int, dict[str, int]]:
+	"""Live question count overall and per pillar."""
+	by_pillar = {
+		str(pillar_id): count
+		for pillar_id, count in db.query(AssessmentTable.pillar_id, func.count(AssessmentTable.id))
+		.filter(AssessmentTable.delete_at.is_(None))
+		.group_by(AssessmentTable.pillar_id)
+		.all()
+	}
+	return sum(by_pillar.values()), by_pillar
+
+
+def count_progress(db: Session, company: CompanyTable) -> dict:
+	"""Recount ``company``'s progress from its answers; the values of a progress row."""
+	answered_by_pillar = {
+		str(pillar_id): count
+		for pillar_id, count in db.query(AssessmentTable.pillar_id, func.count(CompanyAssessmentTable.id))
+		.join(AssessmentTable, AssessmentTable.id == CompanyAssessmentTable.assessment_id)
+		.filter(
+			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.assessment_round == company.current_round,
+			CompanyAssessmentTable.delete_at.is_(None),
+			CompanyAssessmentTable.evaluation_criteria_id.isnot(None),
+		)
+		.group_by(AssessmentTable.pillar_id)
+		.all()
+	}
+	submitted_at = (
+		db.query(func.max(CompanySubmitTable.created_at))
+		.filter(
+			CompanySubmitTable.company_id == company.id,
+			CompanySubmitTable.assessment_round == company.current_round,
+			CompanySubmitTable.delete_at.is_(None),
+		)
+		.scalar()
+	)
+	total, total_by_pillar = question_totals(db)
+	return {
+		"assessment_round": company.current_round,
+		"answered": sum(answered_by_pillar.values()),
+		"answered_by_pillar": answered_by_pillar,
+		"total_questions": total,
+		"total_by_pillar": total_by_pillar,
+		"submitted_at": submitted_at,
+	}
+
+
+def get_progress(db: Session, company: CompanyTable, for_update: bool = False) -> CompanyProgressTable:
+	"""``company``'s progress row, created from a recount if it is missing or from an older round.
+
+	``for_update`` locks the row so concurrent auto-saves apply their deltas
+	one after another.
+	"""
+	query = db.query(CompanyProgressTable).filter(CompanyProgressTable.company_id == company.id)
+	if for_update:
+		query = query.with_for_update()
+	progress = query.first()
+	if progress is None:
+		progress = CompanyProgressTable(company_id=company.id, **count_progress(db, company))
+		try:
+			with db.begin_nested():
+				db.add(progress)
+		except IntegrityError:
+			# Another request created it first.
+			progress = query.one()
+	elif progress.assessment_round != company.current_round:
+		_apply(progress, count_progress(db, company))
+	return progress
+
+
+def _apply(progress: CompanyProgressTable, values: dict) -> None:
+	for key, value in values.items():
+		setattr(progress, key, value)
+	progress.updated_at = datetime.utcnow()
+
+
+def record_answers(progress: CompanyProgressTable, pillar_id: int, delta: int) -> None:
+	"""Add ``delta`` answered questions in ``pillar_id`` (negative when answers are cleared)."""
+	progress.updated_at = datetime.utcnow()
+	if not delta:
+		return
+	answered_by_pillar = dict(progress.answered_by_pillar or {})
+	key = str(pillar_id)
+	answered_by_pillar[key] = max(0, answered_by_pillar.get(key, 0) + delta)
+	# Reassigned rather than mutated so the JSON column is flagged dirty.
+	progress.answered_by_pillar = answered_by_pillar
+	progress.answered = max(0, (progress.answered or 0) + delta)
+
+
+def record_submit(progress: CompanyProgressTable, submitted_at: datetime) -> None:
+	progress.submitted_at = submitted_at
+	progress.updated_at = datetime.utcnow()
+
+
+def reset_round(db: Session, company: CompanyTable) -> None:
+	"""Zero ``company``'s counts for the round it just opened."""
+	progress = get_progress(db, company)
+	_apply(progress, count_progress(db, company))
+
+
+def refresh_totals(db: Session) -> int:
+	"""Write the current live question totals to every progress row; returns rows updated."""
+	db.flush()
+	total, total_by_pillar = question_totals(db)
+	result = db.execute(
+		update(CompanyProgressTable).values(
+			total_questions=total,
+			total_by_pillar=total_by_pillar,
+			updated_at=datetime.utcnow(),
+		)
+	)
+	return result.rowcount or 0
+
+
+def rebuild_progress(db: Session) -> dict:
+	"""Recount every live company, fixing rows that drifted; the caller commits."""
+	companies = db.query(CompanyTable).filter(CompanyTable.delete_at.is_(None)).all()
+	rows = {row.company_id: row for row in db.query(CompanyProgressTable).all()}
+	created = fixed = 0
+	drifted: list[int] = []
+	for company in companies:
+		values = count_progress(db, company)
+		progress = rows.get(company.id)
+		if progress is None:
+			db.add(CompanyProgressTable(company_id=company.id, **values))
+			created += 1
+			continue
+		if any(getattr(progress, key) != value for key, value in values.items()):
+			_apply(progress, values)
+			fixed += 1
+			drifted.append(company.id)
+	return {"companies": len(companies), "created": created, "fixed": fixed, "drifted": drifted[:100]}
+
+
+@job_handler("rebuild_progress")
+def rebuild_progress_job(db: Session, payload: dict) -> dict:
+	return rebuild_progress(db)
+
+
+if __name__ == "__main__":
+	if "--rebuild" not in sys.argv:
+		raise SystemExit("Usage: python -m service.progress --rebuild")
+
+	from database.database import SessionLocal
+
+	session = SessionLocal()
+	try:
+		report = rebuild_progress(session)
+		session.commit()
+	finally:
+		session.close()
+	print(f"Checked {report['companies']} companies: {report['created']} created, {report['fixed']} fixed")
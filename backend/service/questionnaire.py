@@ -0,0 +1,470 @@
+"""Import and export of the whole questionnaire (pillars, questions, choices).
+
+The document format mirrors the builder::
+
+	{"pillars": [{"key": "pillar-1", "name": "...", "weight": 300,
+	              "questions": [{"id": 12, "title": "...", "detail": null,
+	                             "choices": [{"label": "...", "score": 0.25}]}]}]}
+
+CSV uses one row per choice with the columns in CSV_COLUMNS; rows sharing a
+``pillar_key`` and ``question_ref`` form one question.
+
+Choices reference points by ``score`` (``point_id`` is accepted too), so a
+file exported from one environment imports into another. Questions are
+matched by ``id`` when given, otherwise by title within the pillar.
+Existing choices are updated in place by position so that company answers
+keep pointing at the same evaluation criteria.
+"""
+
+import csv
+import io
+from datetime import datetime
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from entity.assessment import AssessmentTable
+from entity.evaluation_criteria import EvaluationCriteriaTable
+from entity.pillars import PillarsTable
+from entity.point import PointTable
+
+CSV_COLUMNS = (
+	"pillar_key",
+	"pillar_name",
+	"pillar_weight",
+	"question_ref",
+	"question_title",
+	"question_detail",
+	"choice_label",
+	"choice_score",
+)
+
+
+class ChoiceDocument(BaseModel):
+	label: str
+	score: float | None = None
+	point_id: int | None = None
+
+
+class QuestionDocument(BaseModel):
+	id: int | None = None
+	title: str
+	detail: str | None = None
+	choices: list[ChoiceDocument]
+
+
+class PillarDocument(BaseModel):
+	key: str
+	name: str
+	weight: int | None = None
+	questions: list[QuestionDocument]
+
+
+class QuestionnaireDocument(BaseModel):
+	pillars: list[PillarDocument]
+
+
+class QuestionnaireError(ValueError):
+	"""Raised with every validation problem found in an import document."""
+
+	def __init__(self, errors: list[str]) -> None:
+		super().__init__("; ".join(errors))
+		self.errors = errors
+
+
+def export_document(db: Session) -> dict:
+	"""The live questionnaire as a JSON-ready document, in three queries."""
+	pillars = (
+		db.query(PillarsTable)
+		.filter(PillarsTable.delete_at.is_(None))
+		.order_by(PillarsTable.id.asc())
+		.all()
+	)
+	assessments = (
+		db.query(AssessmentTable)
+		.filter(AssessmentTable.delete_at.is_(None))
+		.order_by(AssessmentTable.id.asc())
+		.all()
+	)
+	choices = (
+		db.query(EvaluationCriteriaTable, PointTable.score)
+		.outerjoin(PointTable, PointTable.id == EvaluationCriteriaTable.point_id)
+		.filter(EvaluationCriteriaTable.delete_at.is_(None))
+		.order_by(EvaluationCriteriaTable.id.asc())
+		.all()
+	)
+	choices_by_assessment: dict[int, list[dict]] = {}
+	for criteria, score in choices:
+		choices_by_assessment.setdefault(criteria.assessment_id, []).append(
+			{"label": criteria.name, "score": score, "point_id": criteria.point_id}
+		)
+	questions_by_pillar: dict[int, list[dict]] = {}
+	for assessment in assessments:
+		questions_by_pillar.setdefault(assessment.pillar_id, []).append(
+			{
+				"id": assessment.id,
+				"title": assessment.title,
+				"detail": assessment.description,
+				"choices": choices_by_assessment.get(assessment.id, []),
+			}
+		)
+	return {
+		"exported_at": datetime.utcnow().isoformat(),
+		"pillars": [
+			{
+				"key": pillar.key,
+				"name": pillar.name,
+				"weight": pillar.weight,
+				"questions": questions_by_pillar.get(pillar.id, []),
+			}
+			for pillar in pillars
+		],
+	}
+
+
+def document_to_csv(document: dict) -> str:
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(CSV_COLUMNS)
+	for pillar in document["pillars"]:
+		for question in pillar["questions"]:
+			for choice in question["choices"] or [{"label": "", "score": None}]:
+				writer.writerow(
+					(
+						pillar["key"],
+						pillar["name"],
+						pillar["weight"] if pillar["weight"] is not None else "",
+						question["id"],
+						question["title"],
+						question["detail"] or "",
+						choice["label"],
+						choice["score"] if choice["score"] is not None else "",
+					)
+				)
+	return "\ufeff" + buffer.getvalue()
+
+
+def csv_to_document(text: str) -> dict:
+	reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+	required = ("pillar_key", "question_title", "choice_label", "choice_score")
+	missing = [column for column in required if column not in (reader.fieldnames or [])]
+	if missing:
+		raise QuestionnaireError([f"CSV is missing columns: {', '.join(missing)}"])
+
+	pillars: dict[str, dict] = {}
+	questions: dict[tuple[str, str], dict] = {}
+	for line, row in enumerate(reader, start=2):
+		key = (row.get("pillar_key") or "").strip()
+		pillar = pillars.get(key)
+		if pillar is None:
+			weight = (row.get("pillar_weight") or "").strip()
+			pillar = pillars[key] = {
+				"key": key,
+				"name": (row.get("pillar_name") or "").strip() or key,
+				"weight": weight or None,
+				"questions": [],
+			}
+		ref = (row.get("question_ref") or "").strip() or (row.get("question_title") or "").strip()
+		question = questions.get((key, ref))
+		if question is None:
+			question_id = (row.get("question_ref") or "").strip()
+			question = questions[(key, ref)] = {
+				"id": int(question_id) if question_id.isdigit() else None,
+				"title": (row.get("question_title") or "").strip(),
+				"detail": (row.get("question_detail") or "").strip() or None,
+				"choices": [],
+			}
+			pillar["questions"].append(question)
+		label = (row.get("choice_label") or "").strip()
+		score = (row.get("choice_score") or "").strip()
+		if label or score:
+			question["choices"].append({"label": label, "score": score or None})
+	return {"pillars": list(pillars.values())}
+
+
+def parse_document(raw: dict) -> QuestionnaireDocument:
+	try:
+		return QuestionnaireDocument.model_validate(raw)
+	except ValidationError as error:
+		raise QuestionnaireError(
+			[f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()]
+		) from error
+
+
+class ImportPlan:
+	"""Validated changes for an import, applied with ``apply`` or returned as a diff."""
+
+	def __init__(self) -> None:
+		self.new_pillars: list[PillarDocument] = []
+		self.pillar_updates: list[dict] = []
+		self.new_questions: list[tuple[str, QuestionDocument, list[int]]] = []
+		self.question_updates: list[dict] = []
+		self.question_deletes: list[int] = []
+		self.choice_updates: list[dict] = []
+		self.choice_inserts: list[dict] = []
+		self.choice_deletes: list[int] = []
+		self.changes: list[dict] = []
+		self.unchanged_questions = 0
+
+	def summary(self) -> dict:
+		return {
+			"pillars_created": len(self.new_pillars),
+			"pillars_updated": len(self.pillar_updates),
+			"questions_created": len(self.new_questions),
+			"questions_updated": sum(1 for change in self.changes if change["action"] == "update"),
+			"questions_deleted": len(self.question_deletes),
+			"questions_unchanged": self.unchanged_questions,
+			"choices_created": len(self.choice_inserts) + sum(len(points) for _, _, points in self.new_questions),
+			"choices_updated": len(self.choice_updates),
+			"choices_deleted": len(self.choice_deletes),
+		}
+
+
+def plan_import(db: Session, document: QuestionnaireDocument, replace: bool = False) -> ImportPlan:
+	"""Validate ``document`` against the database and work out every change.
+
+	With ``replace``, live questions of the imported pillars that are not in
+	the document are deleted; pillars missing from the document are left alone.
+	"""
+	errors: list[str] = []
+	points = db.query(PointTable).filter(PointTable.delete_at.is_(None)).all()
+	point_by_score = {round(point.score, 4): point.id for point in points}
+	point_ids = {point.id for point in points}
+
+	def resolve_point(where: str, choice: ChoiceDocument) -> int | None:
+		if choice.point_id is not None:
+			if choice.point_id not in point_ids:
+				errors.append(f"{where}: point_id {choice.point_id} does not exist")
+			return choice.point_id
+		if choice.score is None:
+			errors.append(f"{where}: choice needs a score or point_id")
+			return None
+		point_id = point_by_score.get(round(choice.score, 4))
+		if point_id is None:
+			errors.append(f"{where}: no point with score {choice.score}")
+		return point_id
+
+	pillars = {
+		pillar.key: pillar
+		for pillar in db.query(PillarsTable).filter(PillarsTable.delete_at.is_(None))
+	}
+	pillar_ids = [pillar.id for pillar in pillars.values()]
+	assessments = (
+		db.query(AssessmentTable)
+		.filter(AssessmentTable.pillar_id.in_(pillar_ids), AssessmentTable.delete_at.is_(None))
+		.order_by(AssessmentTable.id.asc())
+		.all()
+	) if pillar_ids else []
+	criteria_rows = (
+		db.query(EvaluationCriteriaTable)
+		.filter(
+			EvaluationCriteriaTable.assessment_id.in_([assessment.id for assessment in assessments]),
+			EvaluationCriteriaTable.delete_at.is_(None),
+		)
+		.order_by(EvaluationCriteriaTable.id.asc())
+		.all()
+	) if assessments else []
+	criteria_by_assessment: dict[int, list[EvaluationCriteriaTable]] = {}
+	for criteria in criteria_rows:
+		criteria_by_assessment.setdefault(criteria.assessment_id, []).append(criteria)
+	assessments_by_pillar: dict[int, list[AssessmentTable]] = {}
+	for assessment in assessments:
+		assessments_by_pillar.setdefault(assessment.pillar_id, []).append(assessment)
+
+	plan = ImportPlan()
+	seen_keys: set[str] = set()
+	for pillar_index, pillar_doc in enumerate(document.pillars):
+		where = f"pillars[{pillar_index}] ({pillar_doc.key})"
+		if not pillar_doc.key.strip():
+			errors.append(f"pillars[{pillar_index}]: key is required")
+			continue
+		if pillar_doc.key in seen_keys:
+			errors.append(f"{where}: duplicate pillar key")
+			continue
+		seen_keys.add(pillar_doc.key)
+
+		existing_pillar = pillars.get(pillar_doc.key)
+		existing_questions = assessments_by_pillar.get(existing_pillar.id, []) if existing_pillar else []
+		by_id = {assessment.id: assessment for assessment in existing_questions}
+		by_title: dict[str, AssessmentTable] = {}
+		for assessment in existing_questions:
+			by_title.setdefault(assessment.title, assessment)
+
+		if existing_pillar is None:
+			plan.new_pillars.append(pillar_doc)
+			plan.changes.append({"action": "create_pillar", "pillar_key": pillar_doc.key})
+		elif existing_pillar.name != pillar_doc.name or existing_pillar.weight != pillar_doc.weight:
+			plan.pillar_updates.append(
+				{"id": existing_pillar.id, "name": pillar_doc.name, "weight": pillar_doc.weight}
+			)
+			plan.changes.append(
+				{
+					"action": "update_pillar",
+					"pillar_key": pillar_doc.key,
+					"before": {"name": existing_pillar.name, "weight": existing_pillar.weight},
+					"after": {"name": pillar_doc.name, "weight": pillar_doc.weight},
+				}
+			)
+
+		matched: set[int] = set()
+		seen_titles: set[str] = set()
+		for question_index, question in enumerate(pillar_doc.questions):
+			question_where = f"{where}.questions[{question_index}]"
+			if not question.title.strip():
+				errors.append(f"{question_where}: title is required")
+			if not question.choices:
+				errors.append(f"{question_where}: at least one choice is required")
+			if question.id is None and question.title in seen_titles:
+				errors.append(f"{question_where}: duplicate title {question.title!r} without an id")
+			seen_titles.add(question.title)
+
+			point_ids_for_choices = [
+				resolve_point(f"{question_where}.choices[{choice_index}]", choice)
+				for choice_index, choice in enumerate(question.choices)
+			]
+			for choice_index, choice in enumerate(question.choices):
+				if not choice.label.strip():
+					errors.append(f"{question_where}.choices[{choice_index}]: label is required")
+			if not question.title.strip():
+				continue
+
+			if question.id is not None:
+				existing = by_id.get(question.id)
+				if existing is None:
+					errors.append(f"{question_where}: question id {question.id} is not in pillar {pillar_doc.key}")
+					continue
+			else:
+				existing = by_title.get(question.title)
+				if existing is not None and existing.id in matched:
+					existing = None
+			if existing is None:
+				plan.new_questions.append((pillar_doc.key, question, point_ids_for_choices))
+				plan.changes.append(
+					{"action": "create", "pillar_key": pillar_doc.key, "title": question.title}
+				)
+				continue
+
+			matched.add(existing.id)
+			changed_fields: dict[str, dict] = {}
+			if existing.title != question.title or (existing.description or None) != (question.detail or None):
+				plan.question_updates.append(
+					{"id": existing.id, "title": question.title, "description": question.detail}
+				)
+				changed_fields["question"] = {
+					"before": {"title": existing.title, "detail": existing.description},
+					"after": {"title": question.title, "detail": question.detail},
+				}
+
+			current = criteria_by_assessment.get(existing.id, [])
+			before = [(criteria.name, criteria.point_id) for criteria in current]
+			after = [(choice.label, point_id) for choice, point_id in zip(question.choices, point_ids_for_choices)]
+			if before != after:
+				for position, (label, point_id) in enumerate(after):
+					if position < len(current):
+						if before[position] != (label, point_id):
+							plan.choice_updates.append(
+								{"id": current[position].id, "name": label, "point_id": point_id}
+							)
+					else:
+						plan.choice_inserts.append(
+							{"assessment_id": existing.id, "name": label, "point_id": point_id}
+						)
+				plan.choice_deletes.extend(criteria.id for criteria in current[len(after):])
+				changed_fields["choices"] = {
+					"before": [label for label, _ in before],
+					"after": [label for label, _ in after],
+				}
+
+			if changed_fields:
+				plan.changes.append(
+					{
+						"action": "update",
+						"pillar_key": pillar_doc.key,
+						"assessment_id": existing.id,
+						"title": question.title,
+						**changed_fields,
+					}
+				)
+			else:
+				plan.unchanged_questions += 1
+
+		if replace:
+			for assessment in existing_questions:
+				if assessment.id not in matched:
+					plan.question_deletes.append(assessment.id)
+					plan.choice_deletes.extend(
+						criteria.id for criteria in criteria_by_assessment.get(assessment.id, [])
+					)
+					plan.changes.append(
+						{
+							"action": "delete",
+							"pillar_key": pillar_doc.key,
+							"assessment_id": assessment.id,
+							"title": assessment.title,
+						}
+					)
+
+	if errors:
+		raise QuestionnaireError(errors)
+	return plan
+
+
+def apply_plan(db: Session, plan: ImportPlan) -> None:
+	"""Write ``plan`` with bulk statements; the caller commits once."""
+	now = datetime.utcnow()
+	pillar_ids = {
+		pillar.key: pillar.id
+		for pillar in db.query(PillarsTable).filter(PillarsTable.delete_at.is_(None))
+	}
+	if plan.new_pillars:
+		created = db.execute(
+			insert(PillarsTable).returning(PillarsTable.id, PillarsTable.key, sort_by_parameter_order=True),
+			[
+				{"key": pillar.key, "name": pillar.name, "weight": pillar.weight, "created_at": now, "updated_at": now}
+				for pillar in plan.new_pillars
+			],
+		).all()
+		pillar_ids.update({key: pillar_id for pillar_id, key in created})
+	if plan.pillar_updates:
+		db.execute(update(PillarsTable), [{**row, "updated_at": now} for row in plan.pillar_updates])
+
+	if plan.new_questions:
+		assessment_ids = db.execute(
+			insert(AssessmentTable).returning(AssessmentTable.id, sort_by_parameter_order=True),
+			[
+				{
+					"pillar_id": pillar_ids[pillar_key],
+					"title": question.title,
+					"description": question.detail,
+					"created_at": now,
+					"updated_at": now,
+				}
+				for pillar_key, question, _ in plan.new_questions
+			],
+		).scalars().all()
+		for assessment_id, (_, question, point_ids) in zip(assessment_ids, plan.new_questions):
+			plan.choice_inserts.extend(
+				{"assessment_id": assessment_id, "name": choice.label, "point_id": point_id}
+				for choice, point_id in zip(question.choices, point_ids)
+			)
+	if plan.question_updates:
+		db.execute(update(AssessmentTable), [{**row, "updated_at": now} for row in plan.question_updates])
+	if plan.question_deletes:
+		db.execute(
+			update(AssessmentTable),
+			[{"id": assessment_id, "delete_at": now, "updated_at": now} for assessment_id in plan.question_deletes],
+		)
+
+	if plan.choice_updates:
+		db.execute(update(EvaluationCriteriaTable), [{**row, "updated_at": now} for row in plan.choice_updates])
+	if plan.choice_deletes:
+		db.execute(
+			update(EvaluationCriteriaTable),
+			[{"id": criteria_id, "delete_at": now, "updated_at": now} for criteria_id in plan.choice_deletes],
+		)
+	if plan.choice_inserts:
+		db.execute(
+			insert(EvaluationCriteriaTable),
+			[{**row, "created_at": now, "updated_at": now} for row in plan.choice_inserts],
+		)
@@ -0,0 +1,69 @@
+"""Assessment rounds.
+
+``companies.current_round`` is the round a company is answering; every
+answer, evidence file, submit, result and auditor score carries the
+``assessment_round`` it belongs to. Opening the next round leaves earlier
+rounds untouched, so they stay available to auditors and exports.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.partitioning import ensure_round_partitions
+from entity.company import CompanyTable
+from entity.company_assessment import CompanyAssessmentTable
+from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.company_submit import CompanySubmitTable
+from service.progress import reset_round
+
+
+def start_next_round(db: Session, company: CompanyTable, label: str | None = None) -> int:
+	"""Open ``company``'s next round in the caller's transaction and return its number."""
+	next_round = (company.current_round or 1) + 1
+	# Partitions must exist before the first answer of the round is written.
+	ensure_round_partitions(db.connection(), next_round)
+	company.current_round = next_round
+	if label is not None:
+		company.round_assessment = label
+	db.add(company)
+	reset_round(db, company)
+	return next_round
+
+
+def round_history(db: Session, company: CompanyTable) -> list[dict]:
+	"""Answer counts, first submit time and total score for each of ``company``'s rounds."""
+	answered = dict(
+		db.query(CompanyAssessmentTable.assessment_round, func.count(CompanyAssessmentTable.id))
+		.filter(
+			CompanyAssessmentTable.company_id == company.id,
+			CompanyAssessmentTable.delete_at.is_(None),
+			CompanyAssessmentTable.evaluation_criteria_id.isnot(None),
+		)
+		.group_by(CompanyAssessmentTable.assessment_round)
+		.all()
+	)
+	submitted = dict(
+		db.query(CompanySubmitTable.assessment_round, func.min(CompanySubmitTable.created_at))
+		.filter(CompanySubmitTable.company_id == company.id, CompanySubmitTable.delete_at.is_(None))
+		.group_by(CompanySubmitTable.assessment_round)
+		.all()
+	)
+	scores = dict(
+		db.query(CompanyAssessmentResultTable.assessment_round, func.sum(CompanyAssessmentResultTable.score))
+		.filter(
+			CompanyAssessmentResultTable.company_id == company.id,
+			CompanyAssessmentResultTable.delete_at.is_(None),
+		)
+		.group_by(CompanyAssessmentResultTable.assessment_round)
+		.all()
+	)
+	return [
+		{
+			"assessment_round": number,
+			"current": number == company.current_round,
+			"answered": answered.get(number, 0),
+			"submitted_at": submitted.get(number),
+			"score": round(scores[number], 2) if scores.get(number) is not None else None,
+		}
+		for number in range(1, (company.current_round or 1) + 1)
+	]
@@ -0,0 +1,183 @@
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from entity.assessment import AssessmentTable
+from entity.company import CompanyTable
+from entity.company_assessment import CompanyAssessmentTable
+from entity.company_assessment_result import CompanyAssessmentResultTable
+from entity.evaluation_criteria import EvaluationCriteriaTable
+from entity.pillars import PillarsTable
+from entity.point import PointTable
+from service.analytics import refresh_company_snapshot, star_count
+from service.jobs import job_handler
+
+
+class PillarScore(BaseModel):
+	key: str
+	name: str
+	weight: float | None = None
+	score: float
+	max_score: float
+
+
+class CompanyScore(BaseModel):
+	overall_score: float
+	max_score: float
+	star_count: int
+	pillars: list[PillarScore]
+
+
+def map_point_to_score(point_score: float) -> float:
+	lookup = {
+		0.0: 0.0,
+		0.25: 5.0,
+		0.5: 10.0,
+		0.75: 15.0,
+		1.0: 20.0,
+	}
+	return lookup.get(round(point_score, 2), 0.0)
+
+
+def score_company(db: Session, company: CompanyTable) -> CompanyScore:
+	"""Recalculate and store ``company``'s results for its open round; the caller commits."""
+	pillars = (
+		db.query(PillarsTable)
+		.filter(PillarsTable.delete_at.is_(None))
+		.order_by(PillarsTable.id.asc())
+		.all()
+	)
+
+	results: list[PillarScore] = []
+	for pillar in pillars:
+		assessments = (
+			db.query(AssessmentTable)
+			.filter(
+				AssessmentTable.pillar_id == pillar.id,
+				AssessmentTable.delete_at.is_(None),
+			)
+			.all()
+		)
+		assessment_ids = [assessment.id for assessment in assessments]
+		if not assessment_ids:
+			results.append(
+				PillarScore(
+					key=pillar.key,
+					name=pillar.name,
+					weight=pillar.weight,
+					score=0.0,
+					max_score=float(pillar.weight or 0),
+				)
+			)
+			continue
+
+		company_rows = (
+			db.query(CompanyAssessmentTable)
+			.filter(
+				CompanyAssessmentTable.company_id == company.id,
+				CompanyAssessmentTable.assessment_round == company.current_round,
+				CompanyAssessmentTable.assessment_id.in_(assessment_ids),
+				CompanyAssessmentTable.delete_at.is_(None),
+			)
+			.all()
+		)
+		criteria_by_assessment = {
+			row.assessment_id: row.evaluation_criteria_id
+			for row in company_rows
+			if row.evaluation_criteria_id
+		}
+		criteria_ids = list(criteria_by_assessment.values())
+		criteria_rows = (
+			db.query(EvaluationCriteriaTable)
+			.filter(
+				EvaluationCriteriaTable.id.in_(criteria_ids),
+				EvaluationCriteriaTable.delete_at.is_(None),
+			)
+			.all()
+		) if criteria_ids else []
+		criteria_to_point = {row.id: row.point_id for row in criteria_rows if row.point_id}
+		point_ids = list(criteria_to_point.values())
+		point_rows = (
+			db.query(PointTable)
+			.filter(PointTable.id.in_(point_ids), PointTable.delete_at.is_(None))
+			.all()
+		) if point_ids else []
+		point_scores = {row.id: row.score for row in point_rows}
+
+		raw_score = 0.0
+		for assessment_id in assessment_ids:
+			criteria_id = criteria_by_assessment.get(assessment_id)
+			if not criteria_id:
+				continue
+			point_id = criteria_to_point.get(criteria_id)
+			if not point_id:
+				continue
+			point_score = point_scores.get(point_id)
+			if point_score is None:
+				continue
+			raw_score += map_point_to_score(point_score)
+
+		max_raw = float(len(assessment_ids) * 20)
+		weight = float(pillar.weight or 0)
+		if weight > 0 and max_raw > 0:
+			weighted_score = (raw_score / max_raw) * weight
+			max_score = weight
+		else:
+			weighted_score = raw_score
+			max_score = max_raw
+
+		result_row = (
+			db.query(CompanyAssessmentResultTable)
+			.filter(
+				CompanyAssessmentResultTable.company_id == company.id,
+				CompanyAssessmentResultTable.assessment_round == company.current_round,
+				CompanyAssessmentResultTable.pillar_id == pillar.id,
+				CompanyAssessmentResultTable.delete_at.is_(None),
+			)
+			.first()
+		)
+		if result_row:
+			result_row.score = weighted_score
+			db.add(result_row)
+		else:
+			db.add(
+				CompanyAssessmentResultTable(
+					company_id=company.id,
+					assessment_round=company.current_round,
+					pillar_id=pillar.id,
+					score=weighted_score,
+				)
+			)
+
+		results.append(
+			PillarScore(
+				key=pillar.key,
+				name=pillar.name,
+				weight=pillar.weight,
+				score=round(weighted_score, 2),
+				max_score=round(max_score, 2),
+			)
+		)
+
+	refresh_company_snapshot(db, company)
+
+	overall_score = round(sum(item.score for item in results), 2)
+	max_score = round(sum(item.max_score for item in results), 2)
+	return CompanyScore(
+		overall_score=overall_score,
+		max_score=max_score,
+		star_count=star_count(overall_score, max_score),
+		pillars=results,
+	)
+
+
+@job_handler("rescore_company")
+def rescore_company_job(db: Session, payload: dict) -> dict:
+	company = (
+		db.query(CompanyTable)
+		.filter(CompanyTable.id == int(payload["company_id"]), CompanyTable.delete_at.is_(None))
+		.first()
+	)
+	if company is None:
+		return {"skipped": "company not found"}
+	score = score_company(db, company)
+	return {"overall_score": score.overall_score, "star_count": score.star_count}
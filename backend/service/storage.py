@@ -0,0 +1,352 @@
+"""Pluggable storage for evidence files.
+
+``STORAGE_BACKEND`` picks where new files go:
+
+* ``local`` (default): files live under ``UPLOAD_DIR`` and are served by
+  the API from ``/uploads``. Its "presigned" upload URL points back at the
+  API (``PUT /api/company/evidence/uploads/{token}``), so the same client
+  flow works in development.
+* ``s3``: any S3-compatible store (AWS S3, or MinIO via ``S3_ENDPOINT_URL``)
+  in ``S3_BUCKET``; needs boto3. Clients PUT straight to the bucket and
+  downloads use presigned GET URLs unless ``S3_PUBLIC_BASE_URL`` is set.
+
+Objects are addressed by key (``evidence/<company>/<round>/<uuid>_<name>``);
+each evidence row remembers its backend, so switching ``STORAGE_BACKEND``
+keeps older files reachable.
+
+Upload tokens are HMAC-signed with SECRET_KEY, carry everything needed to
+record the evidence row, and expire after ``UPLOAD_URL_EXPIRES_SECONDS``.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from auth.auth import SECRET_KEY
+
+try:
+	import boto3
+	from botocore.config import Config
+	from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover - boto3 is optional
+	boto3 = None
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", str(Path(__file__).resolve().parents[2] / "uploads")))
+UPLOAD_URL_EXPIRES_SECONDS = int(os.getenv("UPLOAD_URL_EXPIRES_SECONDS", "900"))
+EVIDENCE_MAX_BYTES = int(os.getenv("EVIDENCE_MAX_BYTES", str(50 * 1024 * 1024)))
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_REGION = os.getenv("S3_REGION")
+S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL")
+S3_DOWNLOAD_URL_EXPIRES_SECONDS = int(os.getenv("S3_DOWNLOAD_URL_EXPIRES_SECONDS", "3600"))
+
+CHUNK_SIZE = 1024 * 1024
+LOCAL_UPLOAD_PATH = "/api/company/evidence/uploads/{token}"
+
+
+class StorageError(Exception):
+	pass
+
+
+@dataclass
+class ObjectInfo:
+	key: str
+	size: int
+	content_type: str | None = None
+	# UTC, naive like the rest of the schema; only filled in by iter_objects.
+	modified_at: datetime | None = None
+
+
+@dataclass
+class PresignedUpload:
+	url: str
+	method: str = "PUT"
+	headers: dict[str, str] = field(default_factory=dict)
+
+
+class StorageBackend(ABC):
+	"""What the evidence endpoints need from a store; keys are ``/``-separated paths."""
+
+	name = ""
+
+	@abstractmethod
+	def save(self, key: str, fileobj: BinaryIO, content_type: str | None = None) -> int:
+		"""Store ``fileobj`` under ``key`` and return the bytes written."""
+
+	@abstractmethod
+	def open(self, key: str) -> BinaryIO:
+		"""A readable stream of ``key``'s bytes; the caller closes it."""
+
+	@abstractmethod
+	def stat(self, key: str) -> ObjectInfo | None:
+		"""Size (and content type, if known) of ``key``, or None when it doesn't exist."""
+
+	@abstractmethod
+	def delete(self, key: str) -> None:
+		"""Remove ``key``; missing objects are not an error."""
+
+	@abstractmethod
+	def iter_objects(self, prefix: str, start_after: str = "") -> Iterator[ObjectInfo]:
+		"""Objects whose key starts with ``prefix``, in ascending key order, after ``start_after``."""
+
+	@abstractmethod
+	def url(self, key: str) -> str:
+		"""Where a browser can download ``key``."""
+
+	@abstractmethod
+	def presign_upload(self, key: str, token: str, content_type: str | None) -> PresignedUpload:
+		"""A URL the client PUTs the file to; ``token`` is the signed upload token."""
+
+
+class LocalStorage(StorageBackend):
+	name = "local"
+
+	def __init__(self, root: Path) -> None:
+		self.root = root
+
+	def path(self, key: str) -> Path:
+		path = (self.root / key).resolve()
+		if self.root.resolve() not in path.parents:
+			raise StorageError(f"Key escapes the upload directory: {key}")
+		return path
+
+	@contextmanager
+	def writer(self, key: str) -> Iterator[BinaryIO]:
+		"""Write to a temporary file that replaces ``key`` only if the block succeeds."""
+		path = self.path(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		partial = path.with_name(f".{path.name}.part")
+		try:
+			with partial.open("wb") as buffer:
+				yield buffer
+			partial.replace(path)
+		finally:
+			partial.unlink(missing_ok=True)
+
+	def save(self, key: str, fileobj: BinaryIO, content_type: str | None = None) -> int:
+		with self.writer(key) as buffer:
+			shutil.copyfileobj(fileobj, buffer, CHUNK_SIZE)
+			return buffer.tell()
+
+	def open(self, key: str) -> BinaryIO:
+		return self.path(key).open("rb")
+
+	def stat(self, key: str) -> ObjectInfo | None:
+		try:
+			return ObjectInfo(key=key, size=self.path(key).stat().st_size)
+		except FileNotFoundError:
+			return None
+
+	def delete(self, key: str) -> None:
+		try:
+			self.path(key).unlink()
+		except FileNotFoundError:
+			pass
+
+	def iter_objects(self, prefix: str, start_after: str = "") -> Iterator[ObjectInfo]:
+		# Walks one directory at a time; entries sort as "<name>/" for
+		# directories so the keys come out in plain string order, like S3.
+		directory, _, name_prefix = prefix.rpartition("/")
+		key_prefix = f"{directory}/" if directory else ""
+		yield from self._walk(self.root / directory, key_prefix, name_prefix, start_after)
+
+	def _walk(self, directory: Path, key_prefix: str, name_prefix: str, start_after: str) -> Iterator[ObjectInfo]:
+		try:
+			with os.scandir(directory) as scan:
+				entries = sorted(
+					(entry.name + "/" if entry.is_dir(follow_symlinks=False) else entry.name, entry)
+					for entry in scan
+					if entry.name.startswith(name_prefix)
+				)
+		except FileNotFoundError:
+			return
+		for sort_name, entry in entries:
+			key = key_prefix + sort_name
+			if entry.is_dir(follow_symlinks=False):
+				# Skip whole directories that sort before the resume point.
+				if key <= start_after and not start_after.startswith(key):
+					continue
+				yield from self._walk(Path(entry.path), key, "", start_after)
+			elif key > start_after and entry.is_file(follow_symlinks=False):
+				try:
+					stat = entry.stat(follow_symlinks=False)
+				except FileNotFoundError:
+					continue
+				yield ObjectInfo(key=key, size=stat.st_size, modified_at=datetime.utcfromtimestamp(stat.st_mtime))
+
+	def url(self, key: str) -> str:
+		return f"/uploads/{key}"
+
+	def presign_upload(self, key: str, token: str, content_type: str | None) -> PresignedUpload:
+		headers = {"Content-Type": content_type} if content_type else {}
+		return PresignedUpload(url=LOCAL_UPLOAD_PATH.format(token=token), headers=headers)
+
+
+class S3Storage(StorageBackend):
+	name = "s3"
+
+	def __init__(self, bucket: str, endpoint_url: str | None = None, region: str | None = None) -> None:
+		if boto3 is None:
+			raise StorageError("STORAGE_BACKEND=s3 needs boto3 (pip install boto3)")
+		if not bucket:
+			raise StorageError("STORAGE_BACKEND=s3 needs S3_BUCKET")
+		self.bucket = bucket
+		# MinIO and most S3 stand-ins only route path-style requests.
+		config = Config(signature_version="s3v4", s3={"addressing_style": "path" if endpoint_url else "auto"})
+		self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region, config=config)
+
+	def save(self, key: str, fileobj: BinaryIO, content_type: str | None = None) -> int:
+		extra = {"ContentType": content_type} if content_type else {}
+		counter = _CountingReader(fileobj)
+		self.client.upload_fileobj(counter, self.bucket, key, ExtraArgs=extra)
+		return counter.count
+
+	def open(self, key: str) -> BinaryIO:
+		return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
+	def stat(self, key: str) -> ObjectInfo | None:
+		try:
+			head = self.client.head_object(Bucket=self.bucket, Key=key)
+		except ClientError as error:
+			if error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+				return None
+			raise
+		return ObjectInfo(key=key, size=head["ContentLength"], content_type=head.get("ContentType"))
+
+	def delete(self, key: str) -> None:
+		self.client.delete_object(Bucket=self.bucket, Key=key)
+
+	def iter_objects(self, prefix: str, start_after: str = "") -> Iterator[ObjectInfo]:
+		params = {"Bucket": self.bucket, "Prefix": prefix}
+		if start_after:
+			params["StartAfter"] = start_after
+		for page in self.client.get_paginator("list_objects_v2").paginate(**params):
+			for item in page.get("Contents", []):
+				modified_at = item["LastModified"].astimezone(timezone.utc).replace(tzinfo=None)
+				yield ObjectInfo(key=item["Key"], size=item["Size"], modified_at=modified_at)
+
+	def url(self, key: str) -> str:
+		if S3_PUBLIC_BASE_URL:
+			return f"{S3_PUBLIC_BASE_URL.rstrip('/')}/{key}"
+		return self.client.generate_presigned_url(
+			"get_object",
+			Params={"Bucket": self.bucket, "Key": key},
+			ExpiresIn=S3_DOWNLOAD_URL_EXPIRES_SECONDS,
+		)
+
+	def presign_upload(self, key: str, token: str, content_type: str | None) -> PresignedUpload:
+		params = {"Bucket": self.bucket, "Key": key}
+		headers = {}
+		if content_type:
+			# Signed into the URL, so the PUT must send the same Content-Type.
+			params["ContentType"] = content_type
+			headers["Content-Type"] = content_type
+		url = self.client.generate_presigned_url("put_object", Params=params, ExpiresIn=UPLOAD_URL_EXPIRES_SECONDS)
+		return PresignedUpload(url=url, headers=headers)
+
+
+class _CountingReader:
+	def __init__(self, fileobj: BinaryIO) -> None:
+		self.fileobj = fileobj
+		self.count = 0
+
+	def read(self, size: int = -1) -> bytes:
+		data = self.fileobj.read(size)
+		self.count += len(data)
+		return data
+
+
+_backends: dict[str, StorageBackend] = {}
+
+
+def get_storage(name: str | None = None) -> StorageBackend:
+	"""The backend called ``name`` (rows store it), or the configured default."""
+	name = name or STORAGE_BACKEND
+	backend = _backends.get(name)
+	if backend is None:
+		if name == "local":
+			backend = LocalStorage(UPLOAD_DIR)
+		elif name == "s3":
+			backend = S3Storage(S3_BUCKET, S3_ENDPOINT_URL, S3_REGION)
+		else:
+			raise StorageError(f"Unknown storage backend: {name}")
+		_backends[name] = backend
+	return backend
+
+
+def evidence_key(company_id: int, assessment_round: int, file_name: str) -> str:
+	safe_name = os.path.basename(file_name.replace("\\", "/")).strip() or "file"
+	return f"evidence/{company_id}/{assessment_round}/{uuid.uuid4().hex}_{safe_name}"
+
+
+def stored_key(file_path: str | None) -> str | None:
+	"""The storage key for an evidence ``file_path``.
+
+	Older rows hold an absolute path under ``uploads/evidence``; those map to
+	``evidence/<file name>`` in the local backend.
+	"""
+	if not file_path:
+		return None
+	if os.path.isabs(file_path):
+		file_name = Path(file_path).name
+		return f"evidence/{file_name}" if file_name else None
+	return file_path
+
+
+def evidence_url(file_path: str | None, backend: str | None = None) -> str | None:
+	key = stored_key(file_path)
+	if not key:
+		return None
+	return get_storage(backend or "local").url(key)
+
+
+def _b64encode(data: bytes) -> str:
+	return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+	return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _upload_signature(payload: bytes) -> bytes:
+	# A key of its own, so an upload token can never pass as an access token.
+	signing_key = hmac.new(SECRET_KEY.encode("utf-8"), b"evidence-upload", hashlib.sha256).digest()
+	return hmac.new(signing_key, payload, hashlib.sha256).digest()
+
+
+def sign_upload(claims: dict) -> str:
+	payload = json.dumps(
+		{**claims, "exp": int(time.time() + UPLOAD_URL_EXPIRES_SECONDS)}, separators=(",", ":")
+	).encode("utf-8")
+	return f"{_b64encode(payload)}.{_b64encode(_upload_signature(payload))}"
+
+
+def verify_upload(token: str, grace_seconds: float = 0) -> dict | None:
+	"""The claims of a valid upload token, or None once it is ``grace_seconds`` past expiry.
+
+	Completing an upload gets a grace period: a slow PUT may finish after the
+	URL it started on has expired.
+	"""
+	try:
+		payload_b64, signature_b64 = token.split(".", 1)
+		payload = _b64decode(payload_b64)
+		if not hmac.compare_digest(_upload_signature(payload), _b64decode(signature_b64)):
+			return None
+		claims = json.loads(payload)
+	except (ValueError, TypeError):
+		return None
+	if claims.get("exp", 0) + grace_seconds < time.time():
+		return None
+	return claims
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from database.database import engine
+
+# "local" broadcasts inside this process only; "postgres" fans out through
+# LISTEN/NOTIFY so every worker's subscribers see every event.
+SUBMISSION_EVENTS_BACKEND = os.getenv("SUBMISSION_EVENTS_BACKEND", "local")
+SUBMISSION_EVENTS_QUEUE_SIZE = int(os.getenv("SUBMISSION_EVENTS_QUEUE_SIZE", "100"))
+NOTIFY_CHANNEL = "submission_events"
+
+logger = logging.getLogger("hicm.events")
+
+
+class Subscriber:
+	def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int) -> None:
+		self.loop = loop
+		self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+		self.dropped = 0
+
+	def offer(self, payload: dict) -> None:
+		# Slow clients lose their oldest events rather than holding memory.
+		if self.queue.full():
+			self.queue.get_nowait()
+			self.dropped += 1
+		self.queue.put_nowait(payload)
+
+
+class SubmissionEventBroadcaster:
+	"""Fan submission events out to per-client bounded queues."""
+
+	def __init__(self, queue_size: int = SUBMISSION_EVENTS_QUEUE_SIZE) -> None:
+		self.queue_size = queue_size
+		self._subscribers: set[Subscriber] = set()
+		self._lock = threading.Lock()
+		self._sequence = 0
+
+	def subscribe(self) -> Subscriber:
+		subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+		with self._lock:
+			self._subscribers.add(subscriber)
+		return subscriber
+
+	def unsubscribe(self, subscriber: Subscriber) -> None:
+		with self._lock:
+			self._subscribers.discard(subscriber)
+
+	@property
+	def subscriber_count(self) -> int:
+		return len(self._subscribers)
+
+	def publish(self, payload: dict) -> None:
+		"""Deliver ``payload`` to every subscriber; safe to call from any thread."""
+		with self._lock:
+			self._sequence += 1
+			payload = {**payload, "id": self._sequence}
+			subscribers = list(self._subscribers)
+		for subscriber in subscribers:
+			try:
+				subscriber.loop.call_soon_threadsafe(subscriber.offer, payload)
+			except RuntimeError:
+				# The subscriber's loop has closed; it will unsubscribe itself.
+				pass
+
+
+broadcaster = SubmissionEventBroadcaster()
+
+
+def notify_submission(db: Session, event_type: str, company_id: int, **extra) -> None:
+	"""Queue an event that is published only if ``db``'s transaction commits.
+
+	Call before ``db.commit()``.
+	"""
+	payload = {
+		"type": event_type,
+		"company_id": company_id,
+		"at": datetime.utcnow().isoformat(),
+		**extra,
+	}
+	if SUBMISSION_EVENTS_BACKEND == "postgres":
+		# NOTIFY is transactional: listeners receive it on commit, never on rollback.
+		db.execute(
+			text("SELECT pg_notify(:channel, :payload)"),
+			{"channel": NOTIFY_CHANNEL, "payload": json.dumps(payload)},
+		)
+		return
+
+	db.info.setdefault(_PENDING_KEY, []).append(payload)
+	if not event.contains(db, "after_commit", _publish_pending):
+		event.listen(db, "after_commit", _publish_pending)
+		event.listen(db, "after_soft_rollback", _discard_pending)
+
+
+_PENDING_KEY = "pending_submission_events"
+
+
+def _publish_pending(session: Session) -> None:
+	for payload in session.info.pop(_PENDING_KEY, []):
+		broadcaster.publish(payload)
+
+
+def _discard_pending(session: Session, previous_transaction) -> None:
+	session.info.pop(_PENDING_KEY, None)
+
+
+class _NotifyListener(threading.Thread):
+	def __init__(self) -> None:
+		super().__init__(name="submission-events-listener", daemon=True)
+		self._stopped = threading.Event()
+
+	def stop(self) -> None:
+		self._stopped.set()
+
+	def run(self) -> None:
+		while not self._stopped.is_set():
+			try:
+				self._listen()
+			except Exception:
+				logger.exception("Submission event listener failed; reconnecting")
+				self._stopped.wait(5)
+
+	def _listen(self) -> None:
+		raw = engine.raw_connection()
+		try:
+			connection = raw.driver_connection
+			connection.autocommit = True
+			cursor = connection.cursor()
+			cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+			while not self._stopped.is_set():
+				if callable(getattr(connection, "notifies", None)):
+					# psycopg 3
+					for notify in connection.notifies(timeout=5, stop_after=1):
+						broadcaster.publish(json.loads(notify.payload))
+					continue
+				# psycopg2
+				if select.select([connection], [], [], 5) == ([], [], []):
+					continue
+				connection.poll()
+				while connection.notifies:
+					notify = connection.notifies.pop(0)
+					broadcaster.publish(json.loads(notify.payload))
+		finally:
+			raw.invalidate()
+
+
+_listener: _NotifyListener | None = None
+
+
+def start_listener() -> None:
+	global _listener
+	if SUBMISSION_EVENTS_BACKEND != "postgres" or _listener is not None:
+		return
+	_listener = _NotifyListener()
+	_listener.start()
+
+
+def stop_listener() -> None:
+	global _listener
+	if _listener is not None:
+		_listener.stop()
+		_listener = None
+
+
+def format_sse(payload: dict) -> str:
+	return f"id: {payload['id']}\nevent: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+
+
+HEARTBEAT_SECONDS = 15.0
+
+
+async def stream_events(subscriber: Subscriber, is_disconnected):
+	"""Yield SSE frames for ``subscriber`` until the client disconnects."""
+	yield "retry: 5000\n\n"
+	try:
+		while not await is_disconnected():
+			try:
+				payload = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+			except asyncio.TimeoutError:
+				yield ": keep-alive\n\n"
+				continue
+			yield format_sse(payload)
+	finally:
+		broadcaster.unsubscribe(subscriber)
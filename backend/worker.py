@@ -0,0 +1,43 @@
+"""Background job worker.
+
+Run from backend/ next to the API (as many processes as the box allows)::
+
+	python worker.py
+	python worker.py --kinds rescore_company --once
+"""
+
+import argparse
+import logging
+import signal
+
+from database.database import SessionLocal
+from database.migrate import migrate
+from service.jobs import Worker, load_handlers, registered_kinds
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--kinds", nargs="*", help="Only run jobs of these kinds")
+	parser.add_argument("--once", action="store_true", help="Drain ready jobs and exit")
+	parser.add_argument("--skip-migrate", action="store_true")
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+	if not args.skip_migrate:
+		migrate()
+	load_handlers()
+	logging.getLogger("hicm.jobs").info("Worker handling %s", ", ".join(args.kinds or registered_kinds()))
+
+	worker = Worker(SessionLocal, kinds=args.kinds)
+	if args.once:
+		while worker.run_once():
+			pass
+		return
+
+	signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+	signal.signal(signal.SIGINT, lambda *_: worker.stop())
+	worker.run_forever()
+
+
+if __name__ == "__main__":
+	main()